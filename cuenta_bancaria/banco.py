@@ -0,0 +1,310 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from cuenta_bancaria import CuentaBancaria, Punto
+from lotes import Operacion, ResultadoLote, asientos, planificar
+from salidas import Evento, Salida, SalidaConsola
+
+
+@contextmanager
+def _bloqueadas(cuentas: Iterable[CuentaBancaria]) -> Iterator[List[CuentaBancaria]]:
+    """Toma los cerrojos de las cuentas en el orden global y los suelta al salir"""
+    cuentas = sorted(cuentas, key=CuentaBancaria._orden_cerrojo)
+    tomados: List[CuentaBancaria] = []
+    try:
+        for cuenta in cuentas:
+            cuenta._cerrojo.acquire()
+            tomados.append(cuenta)
+        yield cuentas
+    finally:
+        for cuenta in reversed(tomados):
+            cuenta._cerrojo.release()
+
+
+def _registros_por_diario(lote: List[Operacion], aplicar: List[int],
+                          cuentas: Dict[str, CuentaBancaria]) -> Dict[object, List[Tuple[str, str, float, str]]]:
+    """
+    Registros del diario de las operaciones aplicadas, agrupados por el
+    diario de cada cuenta. Una transferencia entre cuentas con diarios
+    distintos deja su débito en uno y su crédito en el otro.
+    """
+    por_diario: Dict[object, List[Tuple[str, str, float, str]]] = {}
+    for i in aplicar:
+        tipo, numero, monto, destino = lote[i]
+        diario = cuentas[numero]._diario
+        if tipo != 'TRANSFERENCIA':
+            if diario is not None:
+                por_diario.setdefault(diario, []).append((tipo, numero, monto, ''))
+            continue
+        diario_destino = cuentas[destino]._diario
+        if diario is not None and diario is diario_destino:
+            por_diario.setdefault(diario, []).append(('TRANSFERENCIA', numero, monto, destino))
+            continue
+        if diario is not None:
+            por_diario.setdefault(diario, []).append(('TRANSFERENCIA_EXTERNA', numero, monto, destino))
+        if diario_destino is not None:
+            por_diario.setdefault(diario_destino, []).append(('TRANSFERENCIA_RECIBIDA', destino, monto, numero))
+    return por_diario
+
+
+def _volver_fallidas(puntos: List[Punto], fallas: List[Tuple[object, Exception]]) -> None:
+    """
+    Devuelve a su punto las cuentas cuyo diario falló: lo que anotaron no
+    es durable. Las de los demás diarios quedan como están, igual que sus
+    registros.
+    """
+    fallidos = {id(diario) for diario, _ in fallas}
+    CuentaBancaria._volver([punto for punto in puntos if id(punto[0]._diario) in fallidos])
+
+
+class Banco:
+    """
+    Registro de cuentas bancarias seguro para usar desde varios hilos.
+
+    Cada cuenta tiene su propio cerrojo, así las operaciones sobre cuentas
+    distintas no se esperan entre sí; el cerrojo del banco sólo protege el
+    alta y la baja de cuentas. Las transferencias toman los cerrojos de
+    las dos cuentas en orden de número de cuenta, lo que evita los
+    bloqueos mutuos.
+
+    Attributes:
+        _cuentas (Dict[str, CuentaBancaria]): Cuentas por número de cuenta
+        _cerrojo (threading.Lock): Cerrojo del registro de cuentas
+        salida (Salida): Salida de los eventos del banco y de las cuentas que abre
+    """
+
+    def __init__(self, salida: Optional[Salida] = None):
+        """
+        Inicializa un banco sin cuentas.
+        
+        Args:
+            salida (Optional[Salida]): Salida de los eventos. Por defecto, SalidaConsola.
+        """
+        self._cuentas: Dict[str, CuentaBancaria] = {}
+        self._cerrojo = threading.Lock()
+        self.salida = SalidaConsola() if salida is None else salida
+
+    def agregar(self, cuenta: CuentaBancaria) -> CuentaBancaria:
+        """
+        Registra una cuenta ya creada.
+
+        Args:
+            cuenta (CuentaBancaria): Cuenta a registrar
+
+        Returns:
+            CuentaBancaria: La misma cuenta
+
+        Raises:
+            TypeError: Si no es una CuentaBancaria
+            ValueError: Si ya hay una cuenta con ese número
+        """
+        if not isinstance(cuenta, CuentaBancaria):
+            raise TypeError("Sólo se pueden registrar objetos CuentaBancaria")
+        with self._cerrojo:
+            if cuenta.num_cuenta in self._cuentas:
+                raise ValueError(f"Ya existe la cuenta {cuenta.num_cuenta}")
+            self._cuentas[cuenta.num_cuenta] = cuenta
+        return cuenta
+
+    def abrir_cuenta(self, num_cuenta: str, nombre_titular: str,
+                     balance: Union[int, float] = 0) -> CuentaBancaria:
+        """
+        Crea y registra una cuenta nueva, con la salida del banco.
+
+        Args:
+            num_cuenta (str): Número único de la cuenta
+            nombre_titular (str): Nombre del titular
+            balance (Union[int, float], optional): Balance inicial. Por defecto 0.
+
+        Returns:
+            CuentaBancaria: La cuenta creada
+
+        Raises:
+            TypeError: Si el balance no es un número
+            ValueError: Si el balance es negativo o ya existe la cuenta
+        """
+        return self.agregar(CuentaBancaria(num_cuenta, nombre_titular, balance, self.salida))
+
+    def cerrar_cuenta(self, num_cuenta: str) -> CuentaBancaria:
+        """
+        Quita una cuenta del registro.
+
+        Args:
+            num_cuenta (str): Número de la cuenta
+
+        Returns:
+            CuentaBancaria: La cuenta quitada
+
+        Raises:
+            ValueError: Si no existe la cuenta
+        """
+        with self._cerrojo:
+            try:
+                return self._cuentas.pop(num_cuenta)
+            except KeyError:
+                raise ValueError(f"No existe la cuenta {num_cuenta}") from None
+
+    def cuenta(self, num_cuenta: str) -> CuentaBancaria:
+        """
+        Busca una cuenta por su número.
+
+        Args:
+            num_cuenta (str): Número de la cuenta
+
+        Returns:
+            CuentaBancaria: La cuenta
+
+        Raises:
+            ValueError: Si no existe la cuenta
+        """
+        # La lectura de un dict es atómica: no hace falta el cerrojo del banco
+        try:
+            return self._cuentas[num_cuenta]
+        except KeyError:
+            raise ValueError(f"No existe la cuenta {num_cuenta}") from None
+
+    def depositar(self, num_cuenta: str, monto: Union[int, float]) -> bool:
+        """
+        Deposita dinero en una cuenta del banco.
+
+        Raises:
+            TypeError: Si el monto no es un número
+            ValueError: Si el monto no es positivo o no existe la cuenta
+        """
+        return self.cuenta(num_cuenta).depositar(monto)
+
+    def retirar(self, num_cuenta: str, monto: Union[int, float]) -> bool:
+        """
+        Retira dinero de una cuenta del banco.
+
+        Raises:
+            TypeError: Si el monto no es un número
+            ValueError: Si el monto no es positivo, excede el balance o no existe la cuenta
+        """
+        return self.cuenta(num_cuenta).retirar(monto)
+
+    def transferir(self, origen: str, destino: str, monto: Union[int, float]) -> bool:
+        """
+        Transfiere dinero entre dos cuentas del banco de forma atómica:
+        nadie ve el débito sin el crédito.
+
+        Args:
+            origen (str): Número de la cuenta de origen
+            destino (str): Número de la cuenta de destino
+            monto (Union[int, float]): Cantidad a transferir
+
+        Returns:
+            bool: True si la transferencia fue exitosa
+
+        Raises:
+            TypeError: Si el monto no es un número
+            ValueError: Si el monto no es positivo, excede el balance, alguna
+                cuenta no existe o ambas son la misma
+        """
+        return self.cuenta(origen).transferir(monto, self.cuenta(destino))
+
+    def aplicar_lote(self, operaciones: Iterable[Tuple], politica: str = 'todo_o_nada') -> ResultadoLote:
+        """
+        Aplica un lote de operaciones sobre varias cuentas de forma atómica.
+        
+        Se toman una vez los cerrojos de todas las cuentas del lote (en el
+        orden global), se valida el lote completo, los balances se calculan
+        como sumas acumuladas por cuenta y el historial de cada cuenta se
+        escribe de una vez: nadie ve el lote aplicado a medias.
+        
+        Args:
+            operaciones (Iterable[Tuple]): Operacion o (tipo, cuenta, monto[, destino]),
+                con tipo 'DEPOSITO', 'RETIRO' o 'TRANSFERENCIA' (entre cuentas del banco)
+            politica (str, optional): Una de lotes.POLITICAS. Por defecto 'todo_o_nada'.
+            
+        Returns:
+            ResultadoLote: Operaciones aplicadas, rechazadas y balance final de cada cuenta
+            
+        Raises:
+            ValueError: Si la política no es válida, o con 'todo_o_nada' si alguna
+                operación es inválida o deja alguna cuenta en negativo
+            OSError: Si falla algún diario; las cuentas de ese diario quedan como antes del lote
+        """
+        lote = [Operacion(*operacion) for operacion in operaciones]
+        cuentas: Dict[str, CuentaBancaria] = {}
+        with self._cerrojo:
+            for operacion in lote:
+                for numero in (operacion.cuenta, operacion.destino):
+                    # Los números inválidos (incluso no hashables) los rechaza la validación
+                    if isinstance(numero, str) and numero in self._cuentas:
+                        cuentas[numero] = self._cuentas[numero]
+        
+        pendientes = {}
+        fallas: List[Tuple[object, Exception]] = []
+        with _bloqueadas(cuentas.values()):
+            puntos = [cuenta._punto() for cuenta in cuentas.values()]
+            balances = {numero: cuenta.balance for numero, cuenta in cuentas.items()}
+            aplicar, rechazadas = planificar(lote, balances, politica)
+            if aplicar:
+                for diario in {cuenta._diario for cuenta in cuentas.values()} - {None}:
+                    diario.verificar()
+                nanosegundos = time.time_ns()
+                try:
+                    for numero, asientos_cuenta in asientos(lote, aplicar, balances).items():
+                        cuentas[numero]._asentar(asientos_cuenta, nanosegundos)
+                except BaseException:
+                    # Todavía no se anotó nada: el lote se deshace entero
+                    CuentaBancaria._volver(puntos)
+                    raise
+                # Un registro por operación, todos los de cada diario en una sola anotación
+                for diario, registros in _registros_por_diario(lote, aplicar, cuentas).items():
+                    try:
+                        pendientes[diario] = diario.anotar_lote(registros, nanosegundos)
+                    except Exception as error:
+                        fallas.append((diario, error))
+                _volver_fallidas(puntos, fallas)
+            balances = {numero: cuenta.balance for numero, cuenta in cuentas.items()}
+        for diario, secuencia in pendientes.items():
+            try:
+                diario.confirmar(secuencia)
+            except Exception as error:
+                fallas.append((diario, error))
+        if fallas:
+            _volver_fallidas(puntos, fallas)
+            raise fallas[0][1]
+        
+        if self.salida.activa:
+            self.salida.emitir(Evento('LOTE', '', {'aplicadas': len(aplicar), 'total': len(lote),
+                                                   'cuentas': len(balances)}))
+        return ResultadoLote(len(aplicar), rechazadas, balances)
+
+    def balance_total(self) -> float:
+        """
+        Suma de los balances de todas las cuentas, tomada con todas las
+        cuentas bloqueadas (en orden) para que ninguna transferencia quede
+        contada a medias.
+
+        Returns:
+            float: Balance total del banco
+        """
+        with self._cerrojo:
+            cuentas = list(self._cuentas.values())
+        with _bloqueadas(cuentas):
+            return sum(cuenta.balance for cuenta in cuentas)
+
+    def __len__(self) -> int:
+        return len(self._cuentas)
+
+    def __contains__(self, num_cuenta: str) -> bool:
+        return num_cuenta in self._cuentas
+
+    def __iter__(self) -> Iterator[CuentaBancaria]:
+        with self._cerrojo:
+            cuentas = list(self._cuentas.values())
+        return iter(cuentas)
+
+    def __str__(self) -> str:
+        """
+        Representación en string del banco.
+
+        Returns:
+            str: Cantidad de cuentas y balance total
+        """
+        return f"Banco con {len(self)} cuentas | Balance total: ${self.balance_total():,.2f}"
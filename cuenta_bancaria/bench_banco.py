@@ -0,0 +1,106 @@
+"""
+Prueba de estrés del Banco con varios hilos.
+
+Cada hilo hace transferencias al azar entre las cuentas del banco (y
+algún depósito y retiro). Para cada cantidad de hilos se informan las
+operaciones por segundo y la escala frente a un hilo, y se verifica que
+no se perdió ni se creó dinero: el balance total final debe ser el
+inicial más los depósitos menos los retiros, ningún balance puede ser
+negativo y el historial de cada cuenta debe terminar en su balance. Con
+pocas cuentas (--cuentas 2) casi todas las transferencias compiten por
+los mismos cerrojos, en ambos sentidos: si el orden de los cerrojos no
+fuera global, la prueba se colgaría.
+
+Uso:
+    python bench_banco.py --cuentas 1000 --operaciones 200000 --hilos 1 2 4 8
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from banco import Banco
+from salidas import SalidaNula
+
+BALANCE_INICIAL = 1_000
+
+
+def _trabajar(banco, numeros, operaciones, semilla, totales):
+    """Operaciones al azar de un hilo; acumula depósitos, retiros y rechazos"""
+    azar = random.Random(semilla)
+    depositado = retirado = rechazadas = 0
+    for _ in range(operaciones):
+        origen, destino = azar.sample(numeros, 2)
+        monto = azar.randint(1, 200)
+        sorteo = azar.random()
+        try:
+            if sorteo < 0.05:
+                banco.depositar(origen, monto)
+                depositado += monto
+            elif sorteo < 0.10:
+                banco.retirar(origen, monto)
+                retirado += monto
+            else:
+                banco.transferir(origen, destino, monto)
+        except ValueError:
+            rechazadas += 1
+    totales.append((depositado, retirado, rechazadas))
+
+
+def ejecutar(cuentas, operaciones, hilos, semilla=0):
+    """Corre la prueba; devuelve (segundos, rechazadas, errores de consistencia)"""
+    # Sin salida: se mide sólo el banco
+    banco = Banco(SalidaNula())
+    numeros = [f"{i:06d}" for i in range(cuentas)]
+    for numero in numeros:
+        banco.abrir_cuenta(numero, f"Titular {numero}", BALANCE_INICIAL)
+
+    totales = []
+    trabajadores = [threading.Thread(target=_trabajar,
+                                     args=(banco, numeros, operaciones // hilos, semilla + i, totales))
+                    for i in range(hilos)]
+    inicio = time.perf_counter()
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+    segundos = time.perf_counter() - inicio
+
+    depositado = sum(t[0] for t in totales)
+    retirado = sum(t[1] for t in totales)
+    errores = []
+    esperado = cuentas * BALANCE_INICIAL + depositado - retirado
+    if abs(banco.balance_total() - esperado) > 1e-6:
+        errores.append(f"balance total {banco.balance_total():,.2f}, esperado {esperado:,.2f}")
+    for cuenta in banco:
+        if cuenta.balance < 0:
+            errores.append(f"balance negativo en {cuenta.num_cuenta}")
+        if len(cuenta._historial) and abs(cuenta._historial[-1]['balance_nuevo'] - cuenta.balance) > 1e-6:
+            errores.append(f"historial inconsistente en {cuenta.num_cuenta}")
+    return segundos, sum(t[2] for t in totales), errores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de estrés del Banco con varios hilos")
+    parser.add_argument('--cuentas', type=int, default=1000)
+    parser.add_argument('--operaciones', type=int, default=200_000)
+    parser.add_argument('--hilos', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    print(f"{'hilos':>6}{'ops/s':>14}{'escala':>9}{'rechazadas':>12}  consistencia")
+    base = None
+    fallas = 0
+    for hilos in args.hilos:
+        segundos, rechazadas, errores = ejecutar(args.cuentas, args.operaciones, hilos)
+        tasa = args.operaciones / segundos
+        base = base or tasa
+        print(f"{hilos:>6}{tasa:>14,.0f}{tasa / base:>8.2f}x{rechazadas:>12,}  {'ok' if not errores else 'FALLA'}")
+        for error in errores[:10]:
+            print(f"    {error}", file=sys.stderr)
+        fallas += bool(errores)
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Benchmark del BancoPersistente según la durabilidad.
+
+Para cada durabilidad (ninguna, lote, siempre) y cantidad de hilos mide
+las operaciones por segundo y cuántos registros entraron, en promedio, en
+cada escritura del diario (el agrupamiento del group commit). Después
+mide cuánto tarda en recuperarse el banco reaplicando todo el diario y
+cuánto desde una foto más una cola corta.
+
+Uso:
+    python bench_persistencia.py --operaciones 20000 --hilos 1 8
+"""
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from persistencia import DURABILIDADES, BancoPersistente
+from salidas import SalidaNula
+
+CUENTAS = 100
+
+
+def _trabajar(banco, operaciones, semilla):
+    azar = random.Random(semilla)
+    numeros = [f"{i:06d}" for i in range(CUENTAS)]
+    for _ in range(operaciones):
+        origen, destino = azar.sample(numeros, 2)
+        try:
+            if azar.random() < 0.2:
+                banco.depositar(origen, azar.randint(1, 100))
+            else:
+                banco.transferir(origen, destino, azar.randint(1, 100))
+        except ValueError:
+            pass
+
+
+def medir_escritura(directorio, durabilidad, operaciones, hilos):
+    """Operaciones por segundo y registros por escritura del diario"""
+    banco = BancoPersistente(directorio, durabilidad, salida=SalidaNula())
+    for i in range(CUENTAS):
+        banco.abrir_cuenta(f"{i:06d}", f"Titular {i}", 1_000)
+    registros, escrituras = banco._diario.ultima, banco._diario.escrituras
+    trabajadores = [threading.Thread(target=_trabajar, args=(banco, operaciones // hilos, i))
+                    for i in range(hilos)]
+    inicio = time.perf_counter()
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+    segundos = time.perf_counter() - inicio
+    registros = banco._diario.ultima - registros
+    escrituras = banco._diario.escrituras - escrituras
+    banco.cerrar()
+    return operaciones / segundos, registros / max(escrituras, 1)
+
+
+def medir_recuperacion(directorio):
+    """Segundos para abrir el banco y registros reaplicados"""
+    inicio = time.perf_counter()
+    banco = BancoPersistente(directorio, 'ninguna', salida=SalidaNula())
+    segundos = time.perf_counter() - inicio
+    reaplicados = banco.reaplicados
+    banco.cerrar()
+    return segundos, reaplicados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Operaciones por segundo del banco persistente")
+    parser.add_argument('--operaciones', type=int, default=20_000)
+    parser.add_argument('--hilos', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--directorio', help="carpeta donde crear los bancos (por defecto, una temporal)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(dir=args.directorio) as base:
+        print(f"{'durabilidad':<13}{'hilos':>6}{'ops/s':>12}{'registros/escritura':>22}")
+        for durabilidad in DURABILIDADES:
+            for hilos in args.hilos:
+                directorio = tempfile.mkdtemp(prefix=f"{durabilidad}-{hilos}-", dir=base)
+                tasa, agrupados = medir_escritura(directorio, durabilidad, args.operaciones, hilos)
+                print(f"{durabilidad:<13}{hilos:>6}{tasa:>12,.0f}{agrupados:>22.1f}")
+
+        # Recuperación: diario completo y foto más una cola de 1% de las operaciones
+        directorio = tempfile.mkdtemp(prefix="recuperacion-", dir=base)
+        medir_escritura(directorio, 'ninguna', args.operaciones, 1)
+        segundos, reaplicados = medir_recuperacion(directorio)
+        print(f"\nRecuperación sin foto: {segundos * 1000:.1f} ms ({reaplicados:,} registros)")
+        banco = BancoPersistente(directorio, 'ninguna', salida=SalidaNula())
+        banco.fotografiar()
+        _trabajar(banco, args.operaciones // 100, 0)
+        banco.cerrar()
+        segundos, reaplicados = medir_recuperacion(directorio)
+        print(f"Recuperación con foto: {segundos * 1000:.1f} ms ({reaplicados:,} registros)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,13 @@
-from datetime import datetime
-from typing import List, Dict, Optional, Union
+import math
+import threading
+from typing import Iterable, List, Dict, Optional, Sequence, Tuple, Union
+
+from libro_mayor import MONTO_MAXIMO, LibroMayor
+from lotes import Asientos, Operacion, ResultadoLote, asientos, planificar
+from salidas import Evento, Salida, SalidaConsola
+
+# (cuenta, largo del historial, balance): estado al que se vuelve si el diario falla
+Punto = Tuple['CuentaBancaria', int, float]
 
 
 class CuentaBancaria:
@@ -10,10 +18,14 @@ class CuentaBancaria:
         _num_cuenta (str): Número único de la cuenta
         _nombre_titular (str): Nombre del titular de la cuenta
         _balance (float): Balance actual de la cuenta
-        _historial (List[Dict]): Historial de transacciones
+        _historial (LibroMayor): Historial de transacciones en columnas compactas
+        _cerrojo (threading.RLock): Cerrojo propio de la cuenta
+        _diario (Optional[Diario]): Registro durable de las operaciones, si la cuenta lo tiene
+        salida (Salida): Adónde van los eventos de las operaciones (por defecto, la consola)
     """
     
-    def __init__(self, num_cuenta: str, nombre_titular: str, balance: Union[int, float] = 0):
+    def __init__(self, num_cuenta: str, nombre_titular: str, balance: Union[int, float] = 0,
+                 salida: Optional[Salida] = None):
         """
         Inicializa una nueva cuenta bancaria.
         
@@ -21,6 +33,7 @@ class CuentaBancaria:
             num_cuenta (str): Número único de la cuenta
             nombre_titular (str): Nombre del titular
             balance (Union[int, float], optional): Balance inicial. Por defecto 0.
+            salida (Optional[Salida]): Salida de los eventos. Por defecto, SalidaConsola.
             
         Raises:
             TypeError: Si el balance no es un número
@@ -29,7 +42,12 @@ class CuentaBancaria:
         self._num_cuenta = num_cuenta
         self._nombre_titular = nombre_titular
         self._balance = self._validar_balance_inicial(balance)
-        self._historial: List[Dict] = []
+        self._historial = LibroMayor()
+        # Protege _balance y _historial; reentrante para las operaciones compuestas
+        self._cerrojo = threading.RLock()
+        # Registro de escritura anticipada (persistencia.Diario) o None
+        self._diario = None
+        self.salida = SalidaConsola() if salida is None else salida
 
     def _validar_balance_inicial(self, balance: Union[int, float]) -> float:
         """
@@ -43,31 +61,142 @@ class CuentaBancaria:
             
         Raises:
             TypeError: Si el balance no es un número
-            ValueError: Si el balance es negativo
+            ValueError: Si el balance es negativo, no es finito o supera MONTO_MAXIMO
         """
         if not isinstance(balance, (int, float)):
             raise TypeError("El balance debe ser un número")
         if balance < 0:
             raise ValueError("El balance inicial no puede ser negativo")
+        if not balance <= MONTO_MAXIMO:
+            raise ValueError(f"El balance inicial debe ser finito y no mayor que {MONTO_MAXIMO:,}")
         return float(balance)
 
-    def _registrar_transaccion(self, tipo: str, monto: float, balance_anterior: float) -> None:
+    def _registrar_transaccion(self, tipo: str, monto: float, balance_anterior: float,
+                               balance_nuevo: float, nanosegundos: Optional[int] = None) -> None:
         """
         Registra una transacción en el historial.
         
         Args:
-            tipo (str): Tipo de transacción (DEPOSITO, RETIRO, TRANSFERENCIA)
+            tipo (str): Tipo de transacción (DEPOSITO, RETIRO, TRANSFERENCIA, TRANSFERENCIA_RECIBIDA)
             monto (float): Monto de la transacción
             balance_anterior (float): Balance antes de la transacción
+            balance_nuevo (float): Balance después de la transacción
+            nanosegundos (Optional[int]): Hora de la transacción. Por defecto, la actual.
+            
+        Raises:
+            ValueError: Si algún monto no entra en el historial (no se registra nada)
+        """
+        self._historial.registrar(tipo, monto, balance_anterior, balance_nuevo, nanosegundos)
+
+    def _verificar_diario(self) -> None:
+        """
+        Comprueba, antes de tocar el balance, que el diario (si la cuenta
+        tiene uno) siga aceptando registros.
+        
+        Raises:
+            OSError: Si una escritura anterior del diario falló
+        """
+        if self._diario is not None:
+            self._diario.verificar()
+
+    def _punto(self) -> Punto:
+        """
+        Estado actual de la cuenta, para volver a él con _volver. Requiere
+        tener el cerrojo.
+        
+        Returns:
+            Punto: (cuenta, largo del historial, balance)
+        """
+        return self, len(self._historial), self._balance
+
+    @staticmethod
+    def _volver(puntos: Sequence[Punto]) -> None:
+        """
+        Deshace lo hecho en cada cuenta desde su punto, cuando el registro
+        de la operación no llegó al diario. Las transacciones posteriores
+        también se descartan: se anotaron después en el mismo diario, así
+        que tampoco son durables (y cada una, al fallar, vuelve a su punto).
+        """
+        for cuenta, largo, balance in puntos:
+            with cuenta._cerrojo:
+                if len(cuenta._historial) > largo:
+                    cuenta._historial.truncar(largo)
+                    cuenta._balance = balance
+
+    def _anotar(self, operacion: str, monto: float, destino: str = '',
+                puntos: Sequence[Punto] = ()) -> Optional[int]:
+        """
+        Anota la última transacción en el diario, si la cuenta tiene uno.
+        Requiere tener el cerrojo: así el diario respeta el orden de las
+        operaciones de cada cuenta. Si el diario falla, las cuentas vuelven
+        a sus puntos.
+        
+        Returns:
+            Optional[int]: Número de secuencia del registro, o None sin diario
+        """
+        if self._diario is None:
+            return None
+        try:
+            return self._diario.anotar(operacion, self._num_cuenta, monto, destino,
+                                       nanosegundos=self._historial.hora(-1))
+        except BaseException:
+            CuentaBancaria._volver(puntos)
+            raise
+
+    def _anotar_lote(self, registros: List[Tuple[str, str, float, str]],
+                     puntos: Sequence[Punto] = ()) -> Optional[int]:
+        """
+        Anota de una vez los registros de un lote, con la hora del último
+        asiento. Requiere tener el cerrojo. Si el diario falla, las cuentas
+        vuelven a sus puntos.
+        
+        Returns:
+            Optional[int]: Secuencia del último registro, o None sin diario o sin registros
         """
-        transaccion = {
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'tipo': tipo,
-            'monto': monto,
-            'balance_anterior': balance_anterior,
-            'balance_nuevo': self._balance
-        }
-        self._historial.append(transaccion)
+        if self._diario is None or not registros:
+            return None
+        try:
+            return self._diario.anotar_lote(registros, nanosegundos=self._historial.hora(-1))
+        except BaseException:
+            CuentaBancaria._volver(puntos)
+            raise
+
+    def _asentar(self, asientos_cuenta: Asientos, nanosegundos: Optional[int] = None) -> float:
+        """
+        Escribe los asientos de un lote en el historial de una vez y deja el
+        balance final. Requiere tener el cerrojo.
+        
+        Returns:
+            float: Nuevo balance
+            
+        Raises:
+            ValueError: Si algún balance no entra en el historial (la cuenta no cambia)
+        """
+        tipos, montos, anteriores, nuevos = asientos_cuenta
+        self._historial.registrar_lote(tipos, montos, anteriores, nuevos, nanosegundos)
+        self._balance = nuevos[-1]
+        return self._balance
+
+    def _emitir(self, tipo: str, **datos) -> None:
+        """
+        Entrega un evento a la salida; con una salida inactiva ni se crea.
+        """
+        salida = self.salida
+        if salida.activa:
+            salida.emitir(Evento(tipo, self._num_cuenta, datos))
+
+    def _confirmar(self, secuencia: Optional[int], puntos: Sequence[Punto] = ()) -> None:
+        """
+        Espera a que el registro anotado sea durable, fuera del cerrojo para
+        que otras operaciones se sumen a la misma escritura. Si la escritura
+        falla, las cuentas vuelven a sus puntos: la operación no ocurrió.
+        """
+        if secuencia is not None and self._diario is not None:
+            try:
+                self._diario.confirmar(secuencia)
+            except BaseException:
+                CuentaBancaria._volver(puntos)
+                raise
 
     @property
     def balance(self) -> float:
@@ -101,38 +230,94 @@ class CuentaBancaria:
 
     def generar_balance(self) -> float:
         """
-        Muestra el balance actual en consola.
+        Emite el balance actual (por defecto, lo muestra en consola).
         
         Returns:
             float: Balance actual
         """
-        print(f"Balance actual: ${self._balance:,.2f}")
-        return self._balance
+        balance = self._balance
+        self._emitir('BALANCE', balance=balance)
+        return balance
 
-    def depositar(self, monto: Union[int, float]) -> bool:
+    def _validar_monto(self, monto: Union[int, float], operacion: str) -> None:
         """
-        Deposita dinero en la cuenta.
+        Valida el monto de una operación.
         
         Args:
-            monto (Union[int, float]): Cantidad a depositar
-            
-        Returns:
-            bool: True si el depósito fue exitoso
+            monto (Union[int, float]): Monto a validar
+            operacion (str): Operación, para el mensaje de error ("depositar", "retirar"...)
             
         Raises:
             TypeError: Si el monto no es un número
-            ValueError: Si el monto no es positivo
+            ValueError: Si el monto no es positivo, no es finito o supera MONTO_MAXIMO
         """
         if not isinstance(monto, (int, float)):
             raise TypeError("El monto debe ser un número")
         
         if monto <= 0:
-            raise ValueError("El monto a depositar debe ser positivo")
+            raise ValueError(f"El monto a {operacion} debe ser positivo")
+        
+        if not math.isfinite(monto) or monto > MONTO_MAXIMO:
+            raise ValueError(f"El monto a {operacion} debe ser finito y no mayor que {MONTO_MAXIMO:,}")
+
+    def _acreditar(self, monto: Union[int, float], tipo: str, nanosegundos: Optional[int] = None) -> float:
+        """
+        Suma el monto al balance y lo registra. Requiere tener el cerrojo.
+        
+        Returns:
+            float: Nuevo balance
+            
+        Raises:
+            ValueError: Si el nuevo balance no entra en el historial (la cuenta no cambia)
+        """
+        balance_anterior = self._balance
+        balance_nuevo = balance_anterior + monto
+        self._registrar_transaccion(tipo, monto, balance_anterior, balance_nuevo, nanosegundos)
+        self._balance = balance_nuevo
+        return balance_nuevo
+
+    def _debitar(self, monto: Union[int, float], tipo: str, mensaje_fondos: str,
+                 nanosegundos: Optional[int] = None) -> float:
+        """
+        Resta el monto del balance y lo registra. Requiere tener el cerrojo.
+        
+        Returns:
+            float: Nuevo balance
+            
+        Raises:
+            ValueError: Si el monto excede el balance (con mensaje_fondos)
+        """
+        if monto > self._balance:
+            raise ValueError(mensaje_fondos)
         
         balance_anterior = self._balance
-        self._balance += monto
-        self._registrar_transaccion('DEPOSITO', monto, balance_anterior)
-        print(f"Depósito exitoso. Nuevo balance: ${self._balance:,.2f}")
+        balance_nuevo = balance_anterior - monto
+        self._registrar_transaccion(tipo, monto, balance_anterior, balance_nuevo, nanosegundos)
+        self._balance = balance_nuevo
+        return balance_nuevo
+
+    def depositar(self, monto: Union[int, float]) -> bool:
+        """
+        Deposita dinero en la cuenta.
+        
+        Args:
+            monto (Union[int, float]): Cantidad a depositar
+            
+        Returns:
+            bool: True si el depósito fue exitoso
+            
+        Raises:
+            TypeError: Si el monto no es un número
+            ValueError: Si el monto no es positivo o supera MONTO_MAXIMO
+        """
+        self._validar_monto(monto, "depositar")
+        with self._cerrojo:
+            self._verificar_diario()
+            puntos = [self._punto()]
+            balance = self._acreditar(monto, 'DEPOSITO')
+            secuencia = self._anotar('DEPOSITO', monto, puntos=puntos)
+        self._confirmar(secuencia, puntos)
+        self._emitir('DEPOSITO', monto=monto, balance=balance)
         return True
 
     def retirar(self, monto: Union[int, float]) -> bool:
@@ -147,59 +332,137 @@ class CuentaBancaria:
             
         Raises:
             TypeError: Si el monto no es un número
-            ValueError: Si el monto no es positivo o excede el balance
+            ValueError: Si el monto no es positivo, supera MONTO_MAXIMO o excede el balance
         """
-        if not isinstance(monto, (int, float)):
-            raise TypeError("El monto debe ser un número")
-        
-        if monto <= 0:
-            raise ValueError("El monto a retirar debe ser positivo")
-        
-        if monto > self._balance:
-            raise ValueError("Fondos insuficientes")
-        
-        balance_anterior = self._balance
-        self._balance -= monto
-        self._registrar_transaccion('RETIRO', monto, balance_anterior)
-        print(f"Retiro exitoso. Nuevo balance: ${self._balance:,.2f}")
+        self._validar_monto(monto, "retirar")
+        with self._cerrojo:
+            self._verificar_diario()
+            puntos = [self._punto()]
+            balance = self._debitar(monto, 'RETIRO', "Fondos insuficientes")
+            secuencia = self._anotar('RETIRO', monto, puntos=puntos)
+        self._confirmar(secuencia, puntos)
+        self._emitir('RETIRO', monto=monto, balance=balance)
         return True
 
-    def transferir(self, monto: Union[int, float], cuenta_destino: Optional[str] = None) -> bool:
+    def _orden_cerrojo(self) -> tuple:
+        """
+        Clave del orden global en que se toman los cerrojos de dos cuentas.
+        
+        Returns:
+            tuple: (número de cuenta, id del objeto)
+        """
+        return (self._num_cuenta, id(self))
+
+    def transferir(self, monto: Union[int, float],
+                   cuenta_destino: Optional[Union[str, 'CuentaBancaria']] = None) -> bool:
         """
-        Transfiere dinero de la cuenta (simula transferencia).
+        Transfiere dinero de la cuenta.
+        
+        Si el destino es otra CuentaBancaria, el débito y el crédito son
+        atómicos: se toman los cerrojos de ambas cuentas siempre en el mismo
+        orden (por número de cuenta), así dos transferencias cruzadas no se
+        bloquean mutuamente. Si es un número de cuenta (o nada) se simula
+        una transferencia a una cuenta externa.
         
         Args:
             monto (Union[int, float]): Cantidad a transferir
-            cuenta_destino (Optional[str]): Cuenta de destino (opcional)
+            cuenta_destino (Optional[Union[str, CuentaBancaria]]): Cuenta de destino (opcional)
             
         Returns:
             bool: True si la transferencia fue exitosa
             
         Raises:
             TypeError: Si el monto no es un número
-            ValueError: Si el monto no es positivo o excede el balance
+            ValueError: Si el monto no es positivo, excede el balance o el
+                destino es la misma cuenta
         """
-        if not isinstance(monto, (int, float)):
-            raise TypeError("El monto debe ser un número")
+        self._validar_monto(monto, "transferir")
+        mensaje_fondos = "Fondos insuficientes para la transferencia"
         
-        if monto <= 0:
-            raise ValueError("El monto a transferir debe ser positivo")
+        if isinstance(cuenta_destino, CuentaBancaria):
+            if cuenta_destino is self:
+                raise ValueError("La cuenta de destino debe ser distinta de la de origen")
+            primera, segunda = sorted((self, cuenta_destino), key=CuentaBancaria._orden_cerrojo)
+            destino = cuenta_destino.num_cuenta
+            with primera._cerrojo, segunda._cerrojo:
+                self._verificar_diario()
+                cuenta_destino._verificar_diario()
+                puntos = [self._punto()]
+                puntos_destino = [cuenta_destino._punto()]
+                balance = self._debitar(monto, 'TRANSFERENCIA', mensaje_fondos)
+                try:
+                    cuenta_destino._acreditar(monto, 'TRANSFERENCIA_RECIBIDA', self._historial.hora(-1))
+                except BaseException:
+                    CuentaBancaria._volver(puntos)
+                    raise
+                if self._diario is not None and self._diario is cuenta_destino._diario:
+                    # Un solo registro para ambas cuentas: el diario nunca ve medio movimiento
+                    puntos += puntos_destino
+                    secuencia = self._anotar('TRANSFERENCIA', monto, destino, puntos)
+                    secuencia_destino = None
+                else:
+                    # Diarios distintos (o uno solo): cada cuenta anota su mitad en el
+                    # suyo y, si ese diario falla, sólo esa mitad se deshace
+                    secuencia = self._anotar('TRANSFERENCIA_EXTERNA', monto, destino,
+                                             puntos + puntos_destino)
+                    secuencia_destino = cuenta_destino._anotar('TRANSFERENCIA_RECIBIDA', monto,
+                                                               self._num_cuenta, puntos_destino)
+            cuenta_destino._confirmar(secuencia_destino, puntos_destino)
+        else:
+            with self._cerrojo:
+                self._verificar_diario()
+                puntos = [self._punto()]
+                balance = self._debitar(monto, 'TRANSFERENCIA', mensaje_fondos)
+                secuencia = self._anotar('TRANSFERENCIA_EXTERNA', monto, cuenta_destino or '', puntos)
+            destino = cuenta_destino or ''
+        self._confirmar(secuencia, puntos)
         
-        if monto > self._balance:
-            raise ValueError("Fondos insuficientes para la transferencia")
+        self._emitir('TRANSFERENCIA', monto=monto, destino=destino, balance=balance)
+        return True
+
+    def aplicar_lote(self, operaciones: Iterable[Tuple], politica: str = 'todo_o_nada') -> ResultadoLote:
+        """
+        Aplica un lote de operaciones con una sola toma del cerrojo.
         
-        balance_anterior = self._balance
-        self._balance -= monto
-        self._registrar_transaccion('TRANSFERENCIA', monto, balance_anterior)
+        El lote se valida completo antes de tocar la cuenta; los balances
+        se calculan como sumas acumuladas y el historial se escribe de una
+        vez. Las transferencias de un lote son siempre a cuentas externas.
         
-        destino = cuenta_destino if cuenta_destino else "cuenta externa"
-        print(f"Transferencia exitosa de ${monto:,.2f} a {destino}")
-        print(f"Nuevo balance: ${self._balance:,.2f}")
-        return True
+        Args:
+            operaciones (Iterable[Tuple]): (tipo, monto) o ('TRANSFERENCIA', monto, destino),
+                con tipo 'DEPOSITO', 'RETIRO' o 'TRANSFERENCIA'
+            politica (str, optional): Una de lotes.POLITICAS. Por defecto 'todo_o_nada'.
+            
+        Returns:
+            ResultadoLote: Operaciones aplicadas, rechazadas y balance final
+            
+        Raises:
+            ValueError: Si la política no es válida, o con 'todo_o_nada' si alguna
+                operación es inválida o deja la cuenta en negativo
+        """
+        lote = [Operacion(operacion[0], self._num_cuenta, *operacion[1:]) for operacion in operaciones]
+        with self._cerrojo:
+            balances = {self._num_cuenta: self._balance}
+            aplicar, rechazadas = planificar(lote, balances, politica, externas=True)
+            secuencia = None
+            puntos = [self._punto()]
+            if aplicar:
+                self._verificar_diario()
+                self._asentar(asientos(lote, aplicar, balances)[self._num_cuenta])
+                secuencia = self._anotar_lote([
+                    ('TRANSFERENCIA_EXTERNA' if lote[i].tipo == 'TRANSFERENCIA' else lote[i].tipo,
+                     self._num_cuenta, lote[i].monto, lote[i].destino or '')
+                    for i in aplicar], puntos)
+            balance = self._balance
+        self._confirmar(secuencia, puntos)
+        
+        self._emitir('LOTE', aplicadas=len(aplicar), total=len(lote), balance=balance)
+        return ResultadoLote(len(aplicar), rechazadas, {self._num_cuenta: balance})
 
     def consultar_historial(self, ultimas_n: Optional[int] = None) -> List[Dict]:
         """
-        Consulta el historial de transacciones.
+        Consulta el historial de transacciones y lo emite (por defecto, lo
+        muestra en consola).
         
         Args:
             ultimas_n (Optional[int]): Número de transacciones más recientes a mostrar
@@ -207,17 +470,11 @@ class CuentaBancaria:
         Returns:
             List[Dict]: Lista de transacciones
         """
-        if not self._historial:
-            print("No hay transacciones registradas")
-            return []
-        
-        transacciones = self._historial[-ultimas_n:] if ultimas_n else self._historial
-        
-        print(f"\n--- Historial de transacciones ---")
-        for i, trans in enumerate(transacciones, 1):
-            print(f"{i}. [{trans['timestamp']}] {trans['tipo']}: ${trans['monto']:,.2f} "
-                  f"(Balance: ${trans['balance_anterior']:,.2f} → ${trans['balance_nuevo']:,.2f})")
+        # El diccionario de cada transacción (y su fecha) se arma recién acá
+        with self._cerrojo:
+            transacciones = self._historial[-ultimas_n:] if ultimas_n else self._historial[:]
         
+        self._emitir('HISTORIAL', transacciones=transacciones)
         return transacciones
 
     def __str__(self) -> str:
@@ -0,0 +1,219 @@
+import time
+from array import array
+from datetime import datetime
+from itertools import repeat
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+# Códigos de los tipos de transacción (un byte por transacción)
+TIPOS = ('DEPOSITO', 'RETIRO', 'TRANSFERENCIA', 'TRANSFERENCIA_RECIBIDA')
+CODIGOS = {tipo: codigo for codigo, tipo in enumerate(TIPOS)}
+
+# Los montos se guardan en punto fijo: enteros en diezmilésimos
+ESCALA = 10_000
+
+# Mayor monto (o balance) que entra en 64 bits en punto fijo
+MONTO_MAXIMO = (2 ** 63 - 1) // ESCALA
+_LIMITE_FIJO = MONTO_MAXIMO * ESCALA
+
+FORMATO_FECHA = '%Y-%m-%d %H:%M:%S'
+
+
+def a_punto_fijo(monto: Union[int, float]) -> int:
+    """
+    Convierte un monto a punto fijo.
+
+    Args:
+        monto (Union[int, float]): Monto en unidades
+
+    Returns:
+        int: Monto en diezmilésimos
+
+    Raises:
+        ValueError: Si el monto no es finito o su valor absoluto supera MONTO_MAXIMO
+    """
+    try:
+        fijo = round(monto * ESCALA)
+    except (OverflowError, ValueError):
+        raise ValueError(f"Monto no finito: {monto}") from None
+    if not -_LIMITE_FIJO <= fijo <= _LIMITE_FIJO:
+        raise ValueError(f"Monto fuera de rango: {monto} (el máximo es {MONTO_MAXIMO:,})")
+    return fijo
+
+
+class LibroMayor:
+    """
+    Historial de transacciones en columnas compactas.
+
+    Cada transacción ocupa 33 bytes repartidos en arreglos tipados (hora
+    en nanosegundos desde la época, código del tipo y montos en punto
+    fijo) en lugar de un diccionario con la fecha ya formateada. La fecha
+    se formatea recién cuando se consulta una transacción, y cada
+    consulta devuelve el mismo diccionario que guardaba el historial
+    anterior.
+    """
+
+    __slots__ = ('_nanosegundos', '_tipos', '_montos', '_anteriores', '_nuevos')
+
+    def __init__(self):
+        self._nanosegundos = array('q')
+        self._tipos = array('b')
+        self._montos = array('q')
+        self._anteriores = array('q')
+        self._nuevos = array('q')
+
+    def registrar(self, tipo: str, monto: Union[int, float], balance_anterior: Union[int, float],
+                  balance_nuevo: Union[int, float], nanosegundos: Optional[int] = None) -> None:
+        """
+        Agrega una transacción.
+
+        Args:
+            tipo (str): Tipo de transacción (uno de TIPOS)
+            monto (Union[int, float]): Monto de la transacción
+            balance_anterior (Union[int, float]): Balance antes de la transacción
+            balance_nuevo (Union[int, float]): Balance después de la transacción
+            nanosegundos (Optional[int]): Hora de la transacción. Por defecto, la actual.
+
+        Raises:
+            ValueError: Si el tipo no es uno de TIPOS o algún monto no entra
+                en punto fijo (el libro queda como estaba)
+        """
+        try:
+            codigo = CODIGOS[tipo]
+        except KeyError:
+            raise ValueError(f"Tipo de transacción desconocido: {tipo}") from None
+        # Todo se convierte antes de agregar: las columnas nunca quedan desparejas
+        fila = (a_punto_fijo(monto), a_punto_fijo(balance_anterior), a_punto_fijo(balance_nuevo))
+        self._nanosegundos.append(time.time_ns() if nanosegundos is None else nanosegundos)
+        self._tipos.append(codigo)
+        self._montos.append(fila[0])
+        self._anteriores.append(fila[1])
+        self._nuevos.append(fila[2])
+
+    def registrar_lote(self, tipos: Sequence[str], montos: Sequence[float], anteriores: Sequence[float],
+                       nuevos: Sequence[float], nanosegundos: Optional[int] = None) -> None:
+        """
+        Agrega muchas transacciones de una vez, todas con la misma hora.
+
+        Args:
+            tipos (Sequence[str]): Tipo de cada transacción (de TIPOS)
+            montos (Sequence[float]): Monto de cada transacción
+            anteriores (Sequence[float]): Balance antes de cada transacción
+            nuevos (Sequence[float]): Balance después de cada transacción
+            nanosegundos (Optional[int]): Hora del lote. Por defecto, la actual.
+
+        Raises:
+            ValueError: Si algún tipo no es uno de TIPOS o algún monto no entra
+                en punto fijo (el libro queda como estaba)
+        """
+        try:
+            codigos = [CODIGOS[tipo] for tipo in tipos]
+        except KeyError as e:
+            raise ValueError(f"Tipo de transacción desconocido: {e.args[0]}") from None
+        columnas = [array('q', map(a_punto_fijo, valores)) for valores in (montos, anteriores, nuevos)]
+        hora = time.time_ns() if nanosegundos is None else nanosegundos
+        self._nanosegundos.extend(repeat(hora, len(codigos)))
+        self._tipos.fromlist(codigos)
+        for columna, valores in zip((self._montos, self._anteriores, self._nuevos), columnas):
+            columna.extend(valores)
+
+    def transaccion(self, indice: int) -> Dict:
+        """
+        Arma el diccionario de una transacción.
+
+        Args:
+            indice (int): Posición de la transacción (admite negativos)
+
+        Returns:
+            Dict: timestamp, tipo, monto, balance_anterior y balance_nuevo
+        """
+        segundos = self._nanosegundos[indice] / 1e9
+        return {
+            'timestamp': datetime.fromtimestamp(segundos).strftime(FORMATO_FECHA),
+            'tipo': TIPOS[self._tipos[indice]],
+            'monto': self._montos[indice] / ESCALA,
+            'balance_anterior': self._anteriores[indice] / ESCALA,
+            'balance_nuevo': self._nuevos[indice] / ESCALA,
+        }
+
+    def hora(self, indice: int) -> int:
+        """
+        Hora de una transacción.
+
+        Args:
+            indice (int): Posición de la transacción (admite negativos)
+
+        Returns:
+            int: Nanosegundos desde la época
+        """
+        return self._nanosegundos[indice]
+
+    def truncar(self, largo: int) -> None:
+        """
+        Descarta las transacciones desde la posición largo en adelante.
+
+        Args:
+            largo (int): Cantidad de transacciones que quedan
+        """
+        for columna in self._columnas():
+            del columna[largo:]
+
+    def _columnas(self):
+        return (self._nanosegundos, self._tipos, self._montos, self._anteriores, self._nuevos)
+
+    def a_bytes(self) -> bytes:
+        """
+        Serializa las columnas tal como están en memoria (en el orden de
+        bytes de la máquina).
+
+        Returns:
+            bytes: Cantidad de transacciones seguida de cada columna
+        """
+        return len(self).to_bytes(8, 'little') + b''.join(columna.tobytes() for columna in self._columnas())
+
+    @classmethod
+    def desde_bytes(cls, datos: bytes) -> 'LibroMayor':
+        """
+        Reconstruye un libro serializado con a_bytes.
+
+        Args:
+            datos (bytes): Libro serializado
+
+        Returns:
+            LibroMayor: Libro con las mismas transacciones
+
+        Raises:
+            ValueError: Si los datos no tienen el tamaño esperado
+        """
+        libro = cls()
+        cantidad = int.from_bytes(datos[:8], 'little')
+        posicion = 8
+        for columna in libro._columnas():
+            fin = posicion + cantidad * columna.itemsize
+            if fin > len(datos):
+                raise ValueError("Libro mayor truncado")
+            columna.frombytes(datos[posicion:fin])
+            posicion = fin
+        if posicion != len(datos):
+            raise ValueError("Libro mayor con datos de más")
+        return libro
+
+    def memoria(self) -> int:
+        """
+        Bytes ocupados por las columnas.
+
+        Returns:
+            int: Tamaño de los arreglos en bytes
+        """
+        return sum(columna.buffer_info()[1] * columna.itemsize for columna in self._columnas())
+
+    def __len__(self) -> int:
+        return len(self._tipos)
+
+    def __getitem__(self, indice: Union[int, slice]) -> Union[Dict, List[Dict]]:
+        if isinstance(indice, slice):
+            return [self.transaccion(i) for i in range(*indice.indices(len(self)))]
+        return self.transaccion(indice)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self.transaccion(i)
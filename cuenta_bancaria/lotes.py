@@ -0,0 +1,272 @@
+"""
+Planificación de lotes de operaciones para CuentaBancaria y Banco.
+
+Un lote se valida completo de una vez, por columnas (tipos, montos y
+cuentas), y los balances de cada cuenta se calculan como sumas
+acumuladas de sus movimientos: el primer balance acumulado negativo es
+el primer sobregiro. Según la política, el lote se rechaza entero, se aplica hasta
+la primera operación inválida, o se omiten las inválidas. El resultado
+son los asientos de cada cuenta, listos para escribirse de una vez en
+el historial.
+"""
+from functools import partial
+from itertools import accumulate, chain, compress
+from operator import eq, lt
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from libro_mayor import MONTO_MAXIMO
+
+# todo_o_nada: cualquier operación inválida rechaza el lote entero (ValueError)
+# hasta_error: se aplica todo lo anterior a la primera operación inválida
+# omitir: se aplican todas las válidas, en orden, salteando las inválidas
+POLITICAS = ('todo_o_nada', 'hasta_error', 'omitir')
+
+TIPOS_LOTE = ('DEPOSITO', 'RETIRO', 'TRANSFERENCIA')
+_TIPOS = set(TIPOS_LOTE)
+_POSITIVO = partial(lt, 0)
+_ES_TRANSFERENCIA = partial(eq, 'TRANSFERENCIA')
+
+
+class Operacion(NamedTuple):
+    """Operación de un lote; destino sólo en las transferencias"""
+    tipo: str
+    cuenta: str
+    monto: Union[int, float]
+    destino: Optional[str] = None
+
+
+class ResultadoLote(NamedTuple):
+    """
+    Resultado de aplicar un lote.
+
+    Attributes:
+        aplicadas (int): Cantidad de operaciones aplicadas
+        rechazadas (List[Tuple[int, str]]): (posición, motivo) de las rechazadas;
+            con hasta_error, sólo la primera (las siguientes no se intentan)
+        balances (Dict[str, float]): Balance final de cada cuenta del lote
+    """
+    aplicadas: int
+    rechazadas: List[Tuple[int, str]]
+    balances: Dict[str, float]
+
+
+# (tipo del historial, monto, balance anterior, balance nuevo) de una cuenta
+Asientos = Tuple[List[str], List[float], List[float], List[float]]
+
+
+def _todos_en(columna: Iterable, validos: set) -> bool:
+    """Si todos los valores de la columna están en validos (en C, con conjuntos)"""
+    try:
+        return set(columna) <= validos
+    except TypeError:
+        # Algún valor no hashable: no es válido, se busca elemento por elemento
+        return False
+
+
+def _pertenece(valor, conjunto: set) -> bool:
+    try:
+        return valor in conjunto
+    except TypeError:
+        return False
+
+
+def _es_numero(valor) -> bool:
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def _motivo_destino(origen, destino, cuentas: set, externas: bool) -> Optional[str]:
+    """Motivo de rechazo del destino de una transferencia, o None si es válido"""
+    if destino is not None and not isinstance(destino, str):
+        return "el destino debe ser un número de cuenta"
+    if destino == origen:
+        return "la cuenta de destino debe ser distinta de la de origen"
+    if externas:
+        return None
+    if destino is None:
+        return "falta la cuenta de destino"
+    if destino not in cuentas:
+        return f"no existe la cuenta {destino}"
+    return None
+
+
+def validar(operaciones: Sequence[Operacion], cuentas: Iterable[str],
+            externas: bool = False) -> Dict[int, str]:
+    """
+    Valida todo el lote de una pasada, columna por columna.
+
+    Cada criterio se prueba primero sobre la columna entera (conjuntos,
+    map y compress, sin código Python por operación); sólo si la columna
+    tiene algún valor inválido se la recorre para saber cuáles. Un lote
+    válido, el caso común, no se recorre operación por operación.
+
+    Args:
+        operaciones (Sequence[Operacion]): Operaciones del lote
+        cuentas (Iterable[str]): Cuentas que pueden aparecer en el lote
+        externas (bool, optional): Si las transferencias pueden ir a cuentas
+            que no están en el lote (transferencias externas)
+
+    Returns:
+        Dict[int, str]: Motivo de rechazo de cada operación inválida, por posición
+            (el del primer criterio que no cumple)
+    """
+    invalidas: Dict[int, str] = {}
+    if not operaciones:
+        return invalidas
+    cuentas = set(cuentas)
+    tipos, origenes, montos, destinos = zip(*operaciones)
+
+    def marcar(columna, es_valido, motivo) -> None:
+        # Los criterios van en orden: una operación ya rechazada no se vuelve a mirar
+        for i, valor in enumerate(columna):
+            if i not in invalidas and not es_valido(valor):
+                invalidas[i] = motivo(valor)
+
+    if not _todos_en(tipos, _TIPOS):
+        marcar(tipos, lambda tipo: _pertenece(tipo, _TIPOS),
+               lambda tipo: f"tipo de operación desconocido: {tipo}")
+    numericos = _todos_en(map(type, montos), {int, float})
+    if not numericos:
+        marcar(montos, _es_numero, lambda _: "el monto debe ser un número")
+    if not (numericos and all(map(_POSITIVO, montos))):
+        marcar(montos, lambda monto: monto > 0, lambda _: "el monto debe ser positivo")
+    # inf y los montos enormes pasan el criterio anterior, pero no entran en el historial
+    if not (numericos and max(montos) <= MONTO_MAXIMO):
+        marcar(montos, lambda monto: monto <= MONTO_MAXIMO,
+               lambda _: f"el monto debe ser finito y no mayor que {MONTO_MAXIMO:,}")
+    if not _todos_en(origenes, cuentas):
+        marcar(origenes, lambda cuenta: _pertenece(cuenta, cuentas),
+               lambda cuenta: f"no existe la cuenta {cuenta}")
+
+    es_transferencia = list(map(_ES_TRANSFERENCIA, tipos))
+    destinos_validos = (_todos_en(map(type, compress(destinos, es_transferencia)), {str, type(None)})
+                        if externas else _todos_en(compress(destinos, es_transferencia), cuentas))
+    if not destinos_validos or any(map(eq, compress(origenes, es_transferencia),
+                                       compress(destinos, es_transferencia))):
+        for i in compress(range(len(tipos)), es_transferencia):
+            if i not in invalidas:
+                motivo = _motivo_destino(origenes[i], destinos[i], cuentas, externas)
+                if motivo is not None:
+                    invalidas[i] = motivo
+    return invalidas
+
+
+def _movimientos(operacion: Operacion, internas: set) -> List[Tuple[str, str, float]]:
+    """[(cuenta, tipo del historial, delta), ...] de una operación válida"""
+    tipo, cuenta, monto, destino = operacion
+    if tipo == 'DEPOSITO':
+        return [(cuenta, 'DEPOSITO', monto)]
+    if tipo == 'RETIRO':
+        return [(cuenta, 'RETIRO', -monto)]
+    movimientos = [(cuenta, 'TRANSFERENCIA', -monto)]
+    if destino in internas:
+        movimientos.append((destino, 'TRANSFERENCIA_RECIBIDA', monto))
+    return movimientos
+
+
+def _por_cuenta(operaciones: Sequence[Operacion], indices: Iterable[int],
+                internas: set) -> Dict[str, Tuple[List[int], List[str], List[float]]]:
+    """(posiciones, tipos del historial, deltas) de los movimientos de cada cuenta, en orden"""
+    grupos: Dict[str, Tuple[List[int], List[str], List[float]]] = {}
+    for i in indices:
+        tipo, cuenta, monto, destino = operaciones[i]
+        grupo = grupos.get(cuenta)
+        if grupo is None:
+            grupo = grupos[cuenta] = ([], [], [])
+        grupo[0].append(i)
+        grupo[1].append(tipo)
+        grupo[2].append(monto if tipo == 'DEPOSITO' else -monto)
+        if tipo == 'TRANSFERENCIA' and destino in internas:
+            grupo = grupos.get(destino)
+            if grupo is None:
+                grupo = grupos[destino] = ([], [], [])
+            grupo[0].append(i)
+            grupo[1].append('TRANSFERENCIA_RECIBIDA')
+            grupo[2].append(monto)
+    return grupos
+
+
+def _primer_sobregiro(operaciones: Sequence[Operacion], indices: Iterable[int],
+                      balances: Dict[str, float], internas: set) -> Optional[int]:
+    """Posición de la primera operación que deja alguna cuenta en negativo"""
+    primero = None
+    for cuenta, (posiciones, _, deltas) in _por_cuenta(operaciones, indices, internas).items():
+        # Balance acumulado después de cada movimiento de la cuenta
+        saldos = accumulate(chain([balances[cuenta]], deltas))
+        next(saldos)
+        for posicion, saldo in zip(posiciones, saldos):
+            if saldo < 0:
+                primero = posicion if primero is None else min(primero, posicion)
+                break
+    return primero
+
+
+def planificar(operaciones: Sequence[Operacion], balances: Dict[str, float],
+               politica: str = 'todo_o_nada',
+               externas: bool = False) -> Tuple[List[int], List[Tuple[int, str]]]:
+    """
+    Decide qué operaciones del lote se aplican.
+
+    Args:
+        operaciones (Sequence[Operacion]): Operaciones del lote
+        balances (Dict[str, float]): Balance actual de cada cuenta involucrada
+        politica (str, optional): Una de POLITICAS. Por defecto 'todo_o_nada'.
+        externas (bool, optional): Si se admiten transferencias a cuentas fuera del lote
+
+    Returns:
+        Tuple[List[int], List[Tuple[int, str]]]: Posiciones a aplicar, en
+        orden, y (posición, motivo) de las rechazadas
+
+    Raises:
+        ValueError: Si la política no es válida, o con todo_o_nada si alguna
+            operación es inválida o sobregira una cuenta
+    """
+    if politica not in POLITICAS:
+        raise ValueError(f"Política de lote desconocida: {politica}")
+    invalidas = validar(operaciones, balances, externas)
+    internas = set(balances)
+
+    if politica == 'omitir':
+        # Cada sobregiro omitido cambia los balances siguientes: se recorre en orden
+        saldos = dict(balances)
+        aplicar, rechazadas = [], []
+        for i, operacion in enumerate(operaciones):
+            if i in invalidas:
+                rechazadas.append((i, invalidas[i]))
+                continue
+            movimientos = _movimientos(operacion, internas)
+            if any(saldos[cuenta] + delta < 0 for cuenta, _, delta in movimientos):
+                rechazadas.append((i, "fondos insuficientes"))
+                continue
+            for cuenta, _, delta in movimientos:
+                saldos[cuenta] += delta
+            aplicar.append(i)
+        return aplicar, rechazadas
+
+    limite = min(invalidas, default=len(operaciones))
+    sobregiro = _primer_sobregiro(operaciones, range(limite), balances, internas)
+    if sobregiro is not None:
+        limite, motivo = sobregiro, "fondos insuficientes"
+    elif limite < len(operaciones):
+        motivo = invalidas[limite]
+    else:
+        return list(range(len(operaciones))), []
+
+    if politica == 'todo_o_nada':
+        raise ValueError(f"Lote rechazado, operación {limite}: {motivo}")
+    return list(range(limite)), [(limite, motivo)]
+
+
+def asientos(operaciones: Sequence[Operacion], aplicar: Iterable[int],
+             balances: Dict[str, float]) -> Dict[str, Asientos]:
+    """
+    Asientos del historial de cada cuenta para las operaciones a aplicar,
+    con los balances como sumas acumuladas.
+
+    Returns:
+        Dict[str, Asientos]: Por cuenta, (tipos, montos, anteriores, nuevos)
+    """
+    resultado = {}
+    for cuenta, (_, tipos, deltas) in _por_cuenta(operaciones, aplicar, set(balances)).items():
+        saldos = list(accumulate(chain([balances[cuenta]], deltas)))
+        resultado[cuenta] = (tipos, list(map(abs, deltas)), saldos[:-1], saldos[1:])
+    return resultado
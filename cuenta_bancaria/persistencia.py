@@ -0,0 +1,585 @@
+"""
+Persistencia del Banco: registro de escritura anticipada (diario) y fotos.
+
+Cada operación exitosa se anota en el diario, un archivo binario al que
+sólo se agregan registros (largo, crc32 y cuerpo) numerados en secuencia.
+La operación vuelve recién cuando su registro es durable; con durabilidad
+'lote' las escrituras se agrupan: el primer hilo que espera escribe y
+sincroniza (fsync) todo lo pendiente de una vez, y los que llegan mientras
+tanto esperan a la escritura siguiente. Cada tanto se guarda una foto
+binaria compacta de todas las cuentas (balances e historiales) y el
+diario empieza un segmento nuevo; al abrir el banco se carga la última
+foto válida y se reaplica sólo la cola del diario.
+"""
+import os
+import struct
+import threading
+import zlib
+from typing import Iterable, List, Optional, Tuple, Union
+
+from banco import Banco
+from cuenta_bancaria import CuentaBancaria
+from libro_mayor import LibroMayor
+from lotes import ResultadoLote
+from salidas import Salida
+
+# TRANSFERENCIA: entre dos cuentas del mismo diario (débito y crédito en un registro).
+# Entre diarios distintos, TRANSFERENCIA_EXTERNA en el de origen y
+# TRANSFERENCIA_RECIBIDA en el de destino (destino lleva la cuenta de origen).
+OPERACIONES = ('ABRIR', 'DEPOSITO', 'RETIRO', 'TRANSFERENCIA', 'TRANSFERENCIA_EXTERNA', 'CERRAR',
+               'TRANSFERENCIA_RECIBIDA')
+CODIGOS = {operacion: codigo for codigo, operacion in enumerate(OPERACIONES)}
+
+# ninguna: se escribe sin fsync (sobrevive a la caída del proceso, no del equipo)
+# lote: fsync agrupado de todo lo pendiente (group commit)
+# siempre: un fsync por operación
+DURABILIDADES = ('ninguna', 'lote', 'siempre')
+
+MAGIA_FOTO = b'CBF1'
+
+_CABECERA = struct.Struct('<II')      # largo del cuerpo, crc32 del cuerpo
+_REGISTRO = struct.Struct('<QBqd')    # secuencia, operación, nanosegundos, monto
+_TEXTO = struct.Struct('<H')
+_FOTO = struct.Struct('<4sQI')        # magia, secuencia, cantidad de cuentas
+_CUENTA = struct.Struct('<dQ')        # balance, bytes del historial
+_CRC = struct.Struct('<I')
+
+# (secuencia, operación, num_cuenta, monto, destino, nanosegundos)
+Registro = Tuple[int, str, str, float, str, int]
+
+
+# ============= FORMATO =============
+
+def _texto(texto: str) -> bytes:
+    datos = texto.encode('utf-8')
+    return _TEXTO.pack(len(datos)) + datos
+
+
+def _leer_texto(datos: bytes, posicion: int) -> Tuple[str, int]:
+    (largo,) = _TEXTO.unpack_from(datos, posicion)
+    posicion += _TEXTO.size
+    if posicion + largo > len(datos):
+        raise ValueError("Texto truncado")
+    return datos[posicion:posicion + largo].decode('utf-8'), posicion + largo
+
+
+def codificar(secuencia: int, operacion: str, num_cuenta: str, monto: float = 0.0,
+              destino: str = '', nanosegundos: int = 0) -> bytes:
+    """
+    Codifica un registro del diario.
+
+    En ABRIR, destino lleva el titular y monto el balance inicial; en las
+    transferencias, destino es la cuenta de destino.
+
+    Returns:
+        bytes: Cabecera (largo y crc32) seguida del cuerpo
+    """
+    cuerpo = (_REGISTRO.pack(secuencia, CODIGOS[operacion], nanosegundos, monto)
+              + _texto(num_cuenta) + _texto(destino))
+    return _CABECERA.pack(len(cuerpo), zlib.crc32(cuerpo)) + cuerpo
+
+
+def leer_registros(ruta: str) -> Tuple[List[Registro], int]:
+    """
+    Lee los registros de un segmento del diario hasta el primero truncado
+    o con crc inválido (una escritura que la caída dejó a medias).
+
+    Returns:
+        Tuple[List[Registro], int]: Registros válidos y bytes que ocupan
+    """
+    with open(ruta, 'rb') as archivo:
+        datos = archivo.read()
+    registros = []
+    posicion = 0
+    while posicion + _CABECERA.size <= len(datos):
+        largo, crc = _CABECERA.unpack_from(datos, posicion)
+        inicio = posicion + _CABECERA.size
+        cuerpo = datos[inicio:inicio + largo]
+        if len(cuerpo) < largo or zlib.crc32(cuerpo) != crc:
+            break
+        try:
+            secuencia, codigo, nanosegundos, monto = _REGISTRO.unpack_from(cuerpo)
+            num_cuenta, siguiente = _leer_texto(cuerpo, _REGISTRO.size)
+            destino, _ = _leer_texto(cuerpo, siguiente)
+            operacion = OPERACIONES[codigo]
+        except (struct.error, ValueError, IndexError):
+            break
+        registros.append((secuencia, operacion, num_cuenta, monto, destino, nanosegundos))
+        posicion = inicio + largo
+    return registros, posicion
+
+
+def _sincronizar_directorio(directorio: str) -> None:
+    """fsync del directorio, para que las altas y renombres sean durables"""
+    try:
+        descriptor = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def _segmentos(directorio: str) -> List[Tuple[int, str]]:
+    """[(primera secuencia, ruta), ...] de los segmentos del diario, en orden"""
+    return sorted((int(nombre[7:-4]), os.path.join(directorio, nombre))
+                  for nombre in os.listdir(directorio)
+                  if nombre.startswith('diario-') and nombre.endswith('.log'))
+
+
+def _fotos(directorio: str) -> List[Tuple[int, str]]:
+    """[(secuencia, ruta), ...] de las fotos, de la más vieja a la más nueva"""
+    return sorted((int(nombre[5:-4]), os.path.join(directorio, nombre))
+                  for nombre in os.listdir(directorio)
+                  if nombre.startswith('foto-') and nombre.endswith('.bin'))
+
+
+# ============= DIARIO =============
+
+class Diario:
+    """
+    Registro de escritura anticipada de las operaciones del banco.
+
+    Attributes:
+        directorio (str): Carpeta de los segmentos del diario
+        durabilidad (str): Una de DURABILIDADES
+        escrituras (int): Escrituras hechas (registros / escrituras = agrupamiento)
+    """
+
+    def __init__(self, directorio: str, durabilidad: str = 'lote', secuencia: int = 0):
+        """
+        Abre un segmento nuevo que empieza después de la secuencia indicada.
+
+        Args:
+            directorio (str): Carpeta de los segmentos
+            durabilidad (str, optional): Una de DURABILIDADES. Por defecto 'lote'.
+            secuencia (int, optional): Última secuencia ya registrada
+
+        Raises:
+            ValueError: Si la durabilidad no es válida
+        """
+        if durabilidad not in DURABILIDADES:
+            raise ValueError(f"Durabilidad desconocida: {durabilidad}")
+        self.directorio = directorio
+        self.durabilidad = durabilidad
+        self.escrituras = 0
+        self._condicion = threading.Condition()
+        self._pendiente = bytearray()
+        self._ultima = secuencia
+        self._durable = secuencia
+        self._escribiendo = False
+        self._fallo: Optional[BaseException] = None
+        self._archivo = None
+        self._escritos = 0
+        self._abrir_segmento(secuencia + 1)
+
+    @property
+    def ultima(self) -> int:
+        """Secuencia del último registro anotado"""
+        return self._ultima
+
+    def _abrir_segmento(self, primera: int) -> None:
+        ruta = os.path.join(self.directorio, f"diario-{primera:020d}.log")
+        self._archivo = os.open(ruta, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        # Bytes del segmento ya escritos sin error
+        self._escritos = os.fstat(self._archivo).st_size
+        _sincronizar_directorio(self.directorio)
+
+    def _escribir(self, datos: bytes, sincronizar: bool) -> None:
+        try:
+            vista = memoryview(datos)
+            while vista:
+                vista = vista[os.write(self._archivo, vista):]
+            if sincronizar:
+                os.fsync(self._archivo)
+        except BaseException as error:
+            # Parte de los datos pudo quedar escrita (o sin sincronizar):
+            # reintentar dejaría un registro roto en medio del segmento. Se
+            # intenta recortarla, ya que las cuentas deshacen esas operaciones
+            self._fallo = error
+            try:
+                os.ftruncate(self._archivo, self._escritos)
+            except OSError:
+                pass
+            raise
+        self._escritos += len(datos)
+        self.escrituras += 1
+
+    def verificar(self) -> None:
+        """
+        Comprueba que el diario siga aceptando registros. Las cuentas lo
+        llaman antes de tocar su balance.
+
+        Raises:
+            OSError: Si una escritura anterior falló; desde entonces nada es durable
+        """
+        if self._fallo is not None:
+            raise OSError(f"El diario falló y no acepta más registros: {self._fallo}") from self._fallo
+
+    def anotar(self, operacion: str, num_cuenta: str, monto: float = 0.0, destino: str = '',
+               nanosegundos: int = 0) -> int:
+        """
+        Agrega un registro a lo pendiente (con durabilidad 'siempre', lo
+        escribe y sincroniza enseguida).
+
+        Returns:
+            int: Secuencia del registro, para pasarle a confirmar
+        """
+        with self._condicion:
+            self.verificar()
+            self._ultima += 1
+            registro = codificar(self._ultima, operacion, num_cuenta, monto, destino, nanosegundos)
+            if self.durabilidad == 'siempre':
+                self._escribir(registro, sincronizar=True)
+                self._durable = self._ultima
+            else:
+                self._pendiente += registro
+            return self._ultima
+
+    def anotar_lote(self, registros: Iterable[Tuple[str, str, float, str]], nanosegundos: int = 0) -> int:
+        """
+        Agrega muchos registros con una sola toma del cerrojo.
+
+        Args:
+            registros (Iterable[Tuple[str, str, float, str]]): (operación, num_cuenta, monto, destino)
+            nanosegundos (int, optional): Hora de todos los registros
+
+        Returns:
+            int: Secuencia del último registro, para pasarle a confirmar
+        """
+        with self._condicion:
+            self.verificar()
+            datos = bytearray()
+            for operacion, num_cuenta, monto, destino in registros:
+                self._ultima += 1
+                datos += codificar(self._ultima, operacion, num_cuenta, monto, destino, nanosegundos)
+            if self.durabilidad == 'siempre':
+                self._escribir(bytes(datos), sincronizar=True)
+                self._durable = self._ultima
+            else:
+                self._pendiente += datos
+            return self._ultima
+
+    def confirmar(self, secuencia: int) -> None:
+        """
+        Espera a que el registro sea durable. Si nadie está escribiendo,
+        este hilo escribe todo lo pendiente (suyo y de los demás) con una
+        sola escritura y un solo fsync.
+
+        Raises:
+            OSError: Si la escritura falló (ésta o una anterior); los registros
+                no escritos nunca se dan por durables
+        """
+        with self._condicion:
+            while self._durable < secuencia:
+                self.verificar()
+                if self._escribiendo:
+                    self._condicion.wait()
+                    continue
+                datos, hasta = bytes(self._pendiente), self._ultima
+                self._pendiente.clear()
+                self._escribiendo = True
+                # La escritura va sin la condición tomada: mientras tanto
+                # otros hilos anotan y se suman a la escritura siguiente
+                self._condicion.release()
+                try:
+                    self._escribir(datos, sincronizar=self.durabilidad != 'ninguna')
+                finally:
+                    self._condicion.acquire()
+                    self._escribiendo = False
+                    self._condicion.notify_all()
+                self._durable = max(self._durable, hasta)
+
+    def rotar(self) -> int:
+        """
+        Escribe y sincroniza lo pendiente y empieza un segmento nuevo. Se
+        llama con todas las cuentas bloqueadas, justo antes de una foto.
+
+        Returns:
+            int: Última secuencia del segmento cerrado
+        """
+        with self._condicion:
+            while self._escribiendo:
+                self._condicion.wait()
+            self.verificar()
+            self._escribir(bytes(self._pendiente), sincronizar=True)
+            self._pendiente.clear()
+            os.close(self._archivo)
+            self._durable = self._ultima
+            self._abrir_segmento(self._ultima + 1)
+            self._condicion.notify_all()
+            return self._ultima
+
+    def cerrar(self) -> None:
+        """Escribe y sincroniza lo pendiente y cierra el segmento"""
+        with self._condicion:
+            while self._escribiendo:
+                self._condicion.wait()
+            if self._archivo is None:
+                return
+            try:
+                if self._fallo is None:
+                    self._escribir(bytes(self._pendiente), sincronizar=True)
+                    self._pendiente.clear()
+                    self._durable = self._ultima
+            finally:
+                os.close(self._archivo)
+            self._archivo = None
+            self._condicion.notify_all()
+
+
+# ============= BANCO PERSISTENTE =============
+
+class BancoPersistente(Banco):
+    """
+    Banco cuyas operaciones sobreviven a una caída.
+
+    Al crearlo se recupera el estado guardado en el directorio (última foto
+    válida más la cola del diario). Las operaciones hechas a través del
+    banco o de sus cuentas se anotan en el diario y vuelven recién cuando
+    son durables; cada fotos_cada registros se toma una foto y se borran
+    los segmentos y fotos que ya no hacen falta.
+
+    Attributes:
+        directorio (str): Carpeta del diario y las fotos
+        fotos_cada (Optional[int]): Registros entre fotos automáticas (None: sólo a pedido)
+        reaplicados (int): Registros del diario reaplicados al recuperar
+    """
+
+    def __init__(self, directorio: str, durabilidad: str = 'lote', fotos_cada: Optional[int] = None,
+                 salida: Optional[Salida] = None):
+        """
+        Abre (o crea) el banco guardado en el directorio.
+
+        Args:
+            directorio (str): Carpeta del diario y las fotos
+            durabilidad (str, optional): Una de DURABILIDADES. Por defecto 'lote'.
+            fotos_cada (Optional[int]): Registros entre fotos automáticas
+            salida (Optional[Salida]): Salida de los eventos, también para las
+                cuentas recuperadas. Por defecto, SalidaConsola.
+
+        Raises:
+            ValueError: Si la durabilidad no es válida o el diario tiene huecos
+        """
+        if durabilidad not in DURABILIDADES:
+            raise ValueError(f"Durabilidad desconocida: {durabilidad}")
+        super().__init__(salida)
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.fotos_cada = fotos_cada
+        self.reaplicados = 0
+        self._cerrojo_foto = threading.Lock()
+        self._secuencia_foto = 0
+        secuencia = self._recuperar()
+        self._diario = Diario(directorio, durabilidad, secuencia)
+        for cuenta in self._cuentas.values():
+            cuenta._diario = self._diario
+
+    # ============= RECUPERACIÓN =============
+
+    def _recuperar(self) -> int:
+        """Carga la última foto válida y reaplica el diario; devuelve la última secuencia"""
+        secuencia = 0
+        for secuencia_foto, ruta in reversed(_fotos(self.directorio)):
+            try:
+                self._cargar_foto(ruta)
+            except (OSError, ValueError, struct.error, UnicodeDecodeError):
+                # Foto a medio escribir o dañada: se prueba con la anterior
+                self._cuentas.clear()
+                continue
+            secuencia = self._secuencia_foto = secuencia_foto
+            break
+
+        for _, ruta in _segmentos(self.directorio):
+            registros, validos = leer_registros(ruta)
+            if validos < os.path.getsize(ruta):
+                # Cola de una escritura interrumpida por la caída
+                with open(ruta, 'r+b') as archivo:
+                    archivo.truncate(validos)
+            for registro in registros:
+                if registro[0] <= secuencia:
+                    continue
+                if registro[0] != secuencia + 1:
+                    raise ValueError(f"Diario con huecos: falta el registro {secuencia + 1}")
+                self._reaplicar(*registro[1:])
+                secuencia = registro[0]
+                self.reaplicados += 1
+        return secuencia
+
+    def _cargar_foto(self, ruta: str) -> None:
+        with open(ruta, 'rb') as archivo:
+            datos = archivo.read()
+        if len(datos) < _FOTO.size + _CRC.size:
+            raise ValueError("Foto truncada")
+        cuerpo, (crc,) = datos[:-_CRC.size], _CRC.unpack(datos[-_CRC.size:])
+        if zlib.crc32(cuerpo) != crc:
+            raise ValueError("Foto dañada")
+        magia, _, cantidad = _FOTO.unpack_from(cuerpo)
+        if magia != MAGIA_FOTO:
+            raise ValueError("No es una foto del banco")
+        posicion = _FOTO.size
+        for _ in range(cantidad):
+            num_cuenta, posicion = _leer_texto(cuerpo, posicion)
+            titular, posicion = _leer_texto(cuerpo, posicion)
+            balance, largo = _CUENTA.unpack_from(cuerpo, posicion)
+            posicion += _CUENTA.size
+            cuenta = CuentaBancaria(num_cuenta, titular, balance, self.salida)
+            cuenta._historial = LibroMayor.desde_bytes(cuerpo[posicion:posicion + largo])
+            posicion += largo
+            Banco.agregar(self, cuenta)
+
+    def _reaplicar(self, operacion: str, num_cuenta: str, monto: float, destino: str,
+                   nanosegundos: int) -> None:
+        """Repite una operación del diario sin imprimir ni volver a anotarla"""
+        if operacion == 'ABRIR':
+            Banco.agregar(self, CuentaBancaria(num_cuenta, destino, monto, self.salida))
+        elif operacion == 'CERRAR':
+            Banco.cerrar_cuenta(self, num_cuenta)
+        elif operacion == 'DEPOSITO':
+            self.cuenta(num_cuenta)._acreditar(monto, 'DEPOSITO', nanosegundos)
+        elif operacion == 'RETIRO':
+            self.cuenta(num_cuenta)._debitar(monto, 'RETIRO', "Fondos insuficientes", nanosegundos)
+        elif operacion == 'TRANSFERENCIA_RECIBIDA':
+            self.cuenta(num_cuenta)._acreditar(monto, 'TRANSFERENCIA_RECIBIDA', nanosegundos)
+        else:
+            self.cuenta(num_cuenta)._debitar(monto, 'TRANSFERENCIA', "Fondos insuficientes", nanosegundos)
+            if operacion == 'TRANSFERENCIA':
+                self.cuenta(destino)._acreditar(monto, 'TRANSFERENCIA_RECIBIDA', nanosegundos)
+
+    # ============= OPERACIONES =============
+
+    def agregar(self, cuenta: CuentaBancaria) -> CuentaBancaria:
+        """
+        Registra una cuenta y anota su alta con el balance actual (el
+        historial previo de la cuenta no se anota).
+
+        Raises:
+            TypeError: Si no es una CuentaBancaria
+            ValueError: Si ya hay una cuenta con ese número
+        """
+        if not isinstance(cuenta, CuentaBancaria):
+            raise TypeError("Sólo se pueden registrar objetos CuentaBancaria")
+        with self._cerrojo:
+            if cuenta.num_cuenta in self._cuentas:
+                raise ValueError(f"Ya existe la cuenta {cuenta.num_cuenta}")
+            with cuenta._cerrojo:
+                cuenta._diario = self._diario
+                secuencia = self._diario.anotar('ABRIR', cuenta.num_cuenta, cuenta.balance,
+                                                cuenta.nombre_titular)
+            self._cuentas[cuenta.num_cuenta] = cuenta
+        self._diario.confirmar(secuencia)
+        self._fotografiar_si_corresponde()
+        return cuenta
+
+    def cerrar_cuenta(self, num_cuenta: str) -> CuentaBancaria:
+        """
+        Quita una cuenta del registro y anota la baja.
+
+        Raises:
+            ValueError: Si no existe la cuenta
+        """
+        with self._cerrojo:
+            cuenta = self.cuenta(num_cuenta)
+            with cuenta._cerrojo:
+                secuencia = self._diario.anotar('CERRAR', num_cuenta)
+                cuenta._diario = None
+            del self._cuentas[num_cuenta]
+        self._diario.confirmar(secuencia)
+        return cuenta
+
+    def depositar(self, num_cuenta: str, monto: Union[int, float]) -> bool:
+        resultado = super().depositar(num_cuenta, monto)
+        self._fotografiar_si_corresponde()
+        return resultado
+
+    def retirar(self, num_cuenta: str, monto: Union[int, float]) -> bool:
+        resultado = super().retirar(num_cuenta, monto)
+        self._fotografiar_si_corresponde()
+        return resultado
+
+    def transferir(self, origen: str, destino: str, monto: Union[int, float]) -> bool:
+        resultado = super().transferir(origen, destino, monto)
+        self._fotografiar_si_corresponde()
+        return resultado
+
+    def aplicar_lote(self, operaciones: Iterable[Tuple], politica: str = 'todo_o_nada') -> ResultadoLote:
+        resultado = super().aplicar_lote(operaciones, politica)
+        self._fotografiar_si_corresponde()
+        return resultado
+
+    # ============= FOTOS =============
+
+    def _fotografiar_si_corresponde(self) -> None:
+        if self.fotos_cada is None or self._diario.ultima - self._secuencia_foto < self.fotos_cada:
+            return
+        # Si otro hilo ya está tomando la foto, no hace falta esperarlo
+        if self._cerrojo_foto.acquire(blocking=False):
+            try:
+                self._fotografiar()
+            finally:
+                self._cerrojo_foto.release()
+
+    def fotografiar(self) -> str:
+        """
+        Guarda una foto de todas las cuentas y borra los segmentos del
+        diario y las fotos que ya no hacen falta para recuperar.
+
+        Returns:
+            str: Ruta de la foto
+        """
+        with self._cerrojo_foto:
+            return self._fotografiar()
+
+    def _fotografiar(self) -> str:
+        # Con el registro y todas las cuentas bloqueadas (en orden) el estado
+        # es exactamente el que dejó la última secuencia del diario
+        with self._cerrojo:
+            cuentas = sorted(self._cuentas.values(), key=CuentaBancaria._orden_cerrojo)
+            tomados = []
+            try:
+                for cuenta in cuentas:
+                    cuenta._cerrojo.acquire()
+                    tomados.append(cuenta)
+                secuencia = self._diario.rotar()
+                partes = [_FOTO.pack(MAGIA_FOTO, secuencia, len(cuentas))]
+                for cuenta in cuentas:
+                    historial = cuenta._historial.a_bytes()
+                    partes += [_texto(cuenta.num_cuenta), _texto(cuenta.nombre_titular),
+                               _CUENTA.pack(cuenta.balance, len(historial)), historial]
+            finally:
+                for cuenta in reversed(tomados):
+                    cuenta._cerrojo.release()
+
+        cuerpo = b''.join(partes)
+        ruta = os.path.join(self.directorio, f"foto-{secuencia:020d}.bin")
+        temporal = ruta + ".tmp"
+        with open(temporal, 'wb') as archivo:
+            archivo.write(cuerpo)
+            archivo.write(_CRC.pack(zlib.crc32(cuerpo)))
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, ruta)
+        _sincronizar_directorio(self.directorio)
+        self._secuencia_foto = secuencia
+
+        # Todo lo anterior a la foto ya no hace falta
+        for secuencia_foto, vieja in _fotos(self.directorio):
+            if secuencia_foto < secuencia:
+                os.remove(vieja)
+        for primera, segmento in _segmentos(self.directorio):
+            if primera <= secuencia:
+                os.remove(segmento)
+        return ruta
+
+    def cerrar(self) -> None:
+        """Escribe lo pendiente del diario y lo cierra"""
+        self._diario.cerrar()
+
+    def __enter__(self) -> 'BancoPersistente':
+        return self
+
+    def __exit__(self, *excepcion) -> None:
+        self.cerrar()
@@ -0,0 +1,240 @@
+"""
+Salidas de los eventos de las cuentas y del banco.
+
+Cada operación exitosa emite un Evento con los datos crudos (montos y
+balances como números); el texto se arma recién cuando una salida lo
+pide. SalidaConsola imprime lo mismo que antes y es la salida por
+defecto; SalidaNula no hace nada (ni siquiera se crea el evento);
+SalidaRegistro junta los eventos y los pasa a un logging.Logger de a
+tandas; SalidaCola los entrega a otra salida desde un hilo aparte.
+"""
+import logging
+import queue
+import sys
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, TextIO
+
+
+# ============= EVENTOS =============
+
+def _texto_historial(datos: Dict[str, Any]) -> str:
+    transacciones = datos['transacciones']
+    if not transacciones:
+        return "No hay transacciones registradas"
+    lineas = ["\n--- Historial de transacciones ---"]
+    for i, trans in enumerate(transacciones, 1):
+        lineas.append(f"{i}. [{trans['timestamp']}] {trans['tipo']}: ${trans['monto']:,.2f} "
+                      f"(Balance: ${trans['balance_anterior']:,.2f} → ${trans['balance_nuevo']:,.2f})")
+    return "\n".join(lineas)
+
+
+def _texto_lote(datos: Dict[str, Any]) -> str:
+    texto = f"Lote aplicado: {datos['aplicadas']} de {datos['total']} operaciones"
+    if 'balance' in datos:
+        return f"{texto}. Nuevo balance: ${datos['balance']:,.2f}"
+    return f"{texto} en {datos['cuentas']} cuentas"
+
+
+_FORMATOS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    'DEPOSITO': lambda d: f"Depósito exitoso. Nuevo balance: ${d['balance']:,.2f}",
+    'RETIRO': lambda d: f"Retiro exitoso. Nuevo balance: ${d['balance']:,.2f}",
+    'TRANSFERENCIA': lambda d: (f"Transferencia exitosa de ${d['monto']:,.2f} a "
+                                f"{d['destino'] or 'cuenta externa'}\n"
+                                f"Nuevo balance: ${d['balance']:,.2f}"),
+    'BALANCE': lambda d: f"Balance actual: ${d['balance']:,.2f}",
+    'HISTORIAL': _texto_historial,
+    'LOTE': _texto_lote,
+}
+
+TIPOS_EVENTO = tuple(_FORMATOS)
+
+
+class Evento(NamedTuple):
+    """
+    Algo que pasó en una cuenta o en el banco.
+
+    Attributes:
+        tipo (str): Uno de TIPOS_EVENTO
+        cuenta (str): Número de cuenta ('' para los lotes del banco)
+        datos (Dict[str, Any]): Datos crudos del evento (balance, monto, destino...)
+    """
+    tipo: str
+    cuenta: str
+    datos: Dict[str, Any]
+
+    def texto(self) -> str:
+        """
+        Arma el mensaje para mostrar.
+
+        Returns:
+            str: El mismo texto que imprimían las operaciones
+        """
+        return _FORMATOS[self.tipo](self.datos)
+
+    def __str__(self) -> str:
+        return self.texto()
+
+
+# ============= SALIDAS =============
+
+class Salida:
+    """
+    Destino de los eventos. Las subclases redefinen emitir.
+
+    Attributes:
+        activa (bool): Si es False, las cuentas ni siquiera crean los eventos
+    """
+    activa = True
+
+    def emitir(self, evento: Evento) -> None:
+        """
+        Recibe un evento.
+
+        Args:
+            evento (Evento): Evento a procesar
+        """
+        raise NotImplementedError
+
+    def cerrar(self) -> None:
+        """
+        Termina de entregar lo pendiente y libera los recursos.
+        """
+
+    def __enter__(self) -> 'Salida':
+        return self
+
+    def __exit__(self, *excepcion) -> None:
+        self.cerrar()
+
+
+class SalidaNula(Salida):
+    """
+    Modo silencioso: descarta todo.
+    """
+    activa = False
+
+    def emitir(self, evento: Evento) -> None:
+        pass
+
+
+class SalidaConsola(Salida):
+    """
+    Imprime el texto de cada evento, como hacían siempre las operaciones.
+    """
+
+    def __init__(self, archivo: Optional[TextIO] = None):
+        """
+        Args:
+            archivo (Optional[TextIO]): Dónde escribir. Por defecto, sys.stdout
+                del momento (así funciona con contextlib.redirect_stdout).
+        """
+        self.archivo = archivo
+
+    def emitir(self, evento: Evento) -> None:
+        print(evento.texto(), file=self.archivo or sys.stdout)
+
+
+class SalidaRegistro(Salida):
+    """
+    Junta los eventos y los pasa a un logging.Logger de a tandas.
+
+    El texto se arma al pasarlos al logger y sólo si el logger tiene el
+    nivel habilitado. Los eventos pendientes se pasan al llenarse la tanda,
+    con vaciar() o al cerrar.
+
+    Attributes:
+        logger (logging.Logger): Logger que recibe los eventos
+        nivel (int): Nivel con que se registran
+        capacidad (int): Eventos por tanda
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, nivel: int = logging.INFO,
+                 capacidad: int = 1000):
+        """
+        Args:
+            logger (Optional[logging.Logger]): Por defecto, el logger 'cuenta_bancaria'
+            nivel (int, optional): Nivel de los registros. Por defecto INFO.
+            capacidad (int, optional): Eventos por tanda. Por defecto 1000.
+
+        Raises:
+            ValueError: Si la capacidad no es positiva
+        """
+        if capacidad < 1:
+            raise ValueError("La capacidad debe ser positiva")
+        self.logger = logger if logger is not None else logging.getLogger('cuenta_bancaria')
+        self.nivel = nivel
+        self.capacidad = capacidad
+        self._pendientes: List[Evento] = []
+        self._cerrojo = threading.Lock()
+
+    def emitir(self, evento: Evento) -> None:
+        with self._cerrojo:
+            self._pendientes.append(evento)
+            if len(self._pendientes) < self.capacidad:
+                return
+            pendientes, self._pendientes = self._pendientes, []
+        self._registrar(pendientes)
+
+    def vaciar(self) -> None:
+        """
+        Pasa al logger los eventos pendientes.
+        """
+        with self._cerrojo:
+            pendientes, self._pendientes = self._pendientes, []
+        self._registrar(pendientes)
+
+    def _registrar(self, eventos: List[Evento]) -> None:
+        if not self.logger.isEnabledFor(self.nivel):
+            return
+        for evento in eventos:
+            # '%s' deja el formateo para cuando un handler lo escriba
+            self.logger.log(self.nivel, '%s', evento)
+
+    def cerrar(self) -> None:
+        self.vaciar()
+
+
+class SalidaCola(Salida):
+    """
+    Entrega los eventos a otra salida desde un hilo aparte, así las
+    operaciones no esperan a la consola ni al logger.
+
+    Attributes:
+        destino (Salida): Salida que procesa los eventos
+    """
+
+    _FIN = object()
+
+    def __init__(self, destino: Salida, capacidad: int = 0):
+        """
+        Args:
+            destino (Salida): Salida que procesa los eventos en el hilo consumidor
+            capacidad (int, optional): Eventos en espera antes de frenar a
+                quien emite. Por defecto 0 (sin límite).
+        """
+        self.destino = destino
+        self._cola: 'queue.Queue' = queue.Queue(capacidad)
+        self._hilo = threading.Thread(target=self._consumir, name='SalidaCola', daemon=True)
+        self._hilo.start()
+
+    def _consumir(self) -> None:
+        while True:
+            evento = self._cola.get()
+            if evento is self._FIN:
+                return
+            try:
+                self.destino.emitir(evento)
+            except Exception:
+                logging.getLogger('cuenta_bancaria').exception("Error en la salida %r", self.destino)
+
+    def emitir(self, evento: Evento) -> None:
+        self._cola.put(evento)
+
+    def cerrar(self) -> None:
+        """
+        Espera a que se entreguen los eventos encolados y cierra el destino.
+        """
+        if self._hilo.is_alive():
+            self._cola.put(self._FIN)
+            self._hilo.join()
+        self.destino.cerrar()
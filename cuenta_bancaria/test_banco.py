@@ -0,0 +1,94 @@
+"""
+Pruebas del Banco desde varios hilos.
+
+Uso:
+    python -m pytest test_banco.py
+"""
+import random
+import threading
+
+from banco import Banco
+from salidas import SalidaNula
+
+CUENTAS = 6
+BALANCE_INICIAL = 1000
+
+
+def _banco():
+    banco = Banco(SalidaNula())
+    for i in range(CUENTAS):
+        banco.abrir_cuenta(f'C{i}', f'Titular {i}', BALANCE_INICIAL)
+    return banco
+
+
+def _en_hilos(objetivos, segundos=30):
+    hilos = [threading.Thread(target=objetivo, daemon=True) for objetivo in objetivos]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join(segundos)
+    # Un hilo vivo después del plazo es un bloqueo mutuo
+    assert not any(hilo.is_alive() for hilo in hilos)
+
+
+def test_transferencias_cruzadas_no_se_bloquean_ni_pierden_dinero():
+    banco = _banco()
+    total = CUENTAS * BALANCE_INICIAL
+    totales = []
+    terminado = threading.Event()
+
+    def transferir(semilla):
+        azar = random.Random(semilla)
+        for _ in range(2000):
+            origen, destino = azar.sample(range(CUENTAS), 2)
+            try:
+                banco.transferir(f'C{origen}', f'C{destino}', azar.randint(1, 50))
+            except ValueError:
+                pass  # fondos insuficientes
+
+    def ida_y_vuelta(sentido):
+        # Siempre entre las mismas dos cuentas, en sentidos opuestos
+        origen, destino = ('C0', 'C1') if sentido else ('C1', 'C0')
+        for _ in range(2000):
+            try:
+                banco.transferir(origen, destino, 1)
+            except ValueError:
+                pass
+
+    def observar():
+        while not terminado.is_set():
+            totales.append(banco.balance_total())
+
+    observador = threading.Thread(target=observar, daemon=True)
+    observador.start()
+    try:
+        _en_hilos([lambda s=s: transferir(s) for s in range(4)]
+                  + [lambda: ida_y_vuelta(True), lambda: ida_y_vuelta(False)])
+    finally:
+        terminado.set()
+        observador.join(30)
+
+    assert banco.balance_total() == total
+    # Ninguna transferencia se vio a medias
+    assert totales and set(totales) == {total}
+    assert all(cuenta.balance >= 0 for cuenta in banco)
+    # Cada transferencia dejó su débito y su crédito
+    assert (sum(len(cuenta._historial) for cuenta in banco) % 2) == 0
+
+
+def test_depositos_y_retiros_concurrentes_sobre_una_cuenta():
+    banco = _banco()
+
+    def operar():
+        for _ in range(1000):
+            banco.depositar('C0', 3)
+            banco.retirar('C0', 2)
+
+    _en_hilos([operar] * 8)
+    cuenta = banco.cuenta('C0')
+    assert cuenta.balance == BALANCE_INICIAL + 8 * 1000
+    assert len(cuenta._historial) == 8 * 2000
+    # El historial quedó en el mismo orden que los balances
+    historial = cuenta._historial[:]
+    assert all(anterior['balance_nuevo'] == siguiente['balance_anterior']
+               for anterior, siguiente in zip(historial, historial[1:]))
@@ -0,0 +1,105 @@
+"""
+Pruebas del historial en columnas.
+
+Uso:
+    python -m pytest test_libro_mayor.py
+"""
+import time
+from datetime import datetime
+
+import pytest
+
+from cuenta_bancaria import CuentaBancaria
+from libro_mayor import FORMATO_FECHA, MONTO_MAXIMO, LibroMayor
+from salidas import SalidaNula
+
+
+def _cuenta_con_movimientos():
+    cuenta = CuentaBancaria('A', 'Ana', 100, SalidaNula())
+    cuenta.depositar(0.1)
+    cuenta.depositar(0.2)
+    cuenta.retirar(50.3)
+    cuenta.transferir(12.3456, 'X')
+    cuenta.transferir(7, CuentaBancaria('B', 'Beto', 0, SalidaNula()))
+    cuenta.aplicar_lote([('DEPOSITO', 1.5), ('RETIRO', 0.5)])
+    return cuenta
+
+
+def test_consultar_historial_devuelve_los_diccionarios_de_siempre():
+    antes = time.time()
+    historial = _cuenta_con_movimientos().consultar_historial()
+    campos = [(t['tipo'], t['monto'], t['balance_anterior'], t['balance_nuevo']) for t in historial]
+    assert campos == [('DEPOSITO', 0.1, 100.0, 100.1), ('DEPOSITO', 0.2, 100.1, 100.3),
+                      ('RETIRO', 50.3, 100.3, 50.0), ('TRANSFERENCIA', 12.3456, 50.0, 37.6544),
+                      ('TRANSFERENCIA', 7.0, 37.6544, 30.6544), ('DEPOSITO', 1.5, 30.6544, 32.1544),
+                      ('RETIRO', 0.5, 32.1544, 31.6544)]
+    for transaccion in historial:
+        assert set(transaccion) == {'timestamp', 'tipo', 'monto', 'balance_anterior', 'balance_nuevo'}
+        fecha = datetime.strptime(transaccion['timestamp'], FORMATO_FECHA).timestamp()
+        assert antes - 1 <= fecha <= time.time()
+
+
+def test_consultar_ultimas_n():
+    cuenta = _cuenta_con_movimientos()
+    assert cuenta.consultar_historial(2) == cuenta.consultar_historial()[-2:]
+    assert cuenta._historial[-1] == cuenta._historial[len(cuenta._historial) - 1]
+
+
+def test_a_bytes_y_desde_bytes_ida_y_vuelta():
+    libro = _cuenta_con_movimientos()._historial
+    copia = LibroMayor.desde_bytes(libro.a_bytes())
+    assert len(copia) == len(libro) == 7
+    assert copia[:] == libro[:]
+    assert [copia.hora(i) for i in range(7)] == [libro.hora(i) for i in range(7)]
+    assert LibroMayor.desde_bytes(LibroMayor().a_bytes())[:] == []
+
+
+def test_desde_bytes_rechaza_datos_truncados_o_de_mas():
+    datos = _cuenta_con_movimientos()._historial.a_bytes()
+    with pytest.raises(ValueError, match="truncado"):
+        LibroMayor.desde_bytes(datos[:-1])
+    with pytest.raises(ValueError, match="de más"):
+        LibroMayor.desde_bytes(datos + b'\x00')
+
+
+def test_truncar_descarta_el_final():
+    libro = _cuenta_con_movimientos()._historial
+    primeras = libro[:3]
+    libro.truncar(3)
+    assert libro[:] == primeras
+    assert len({len(columna) for columna in libro._columnas()}) == 1
+
+
+@pytest.mark.parametrize('monto', [float('inf'), float('nan'), 1e15, MONTO_MAXIMO + 1])
+def test_monto_fuera_de_rango_no_despareja_las_columnas(monto):
+    libro = LibroMayor()
+    libro.registrar('DEPOSITO', 1, 0, 1, 0)
+    with pytest.raises(ValueError):
+        libro.registrar('DEPOSITO', monto, 1, 1 + monto)
+    with pytest.raises(ValueError):
+        libro.registrar_lote(['DEPOSITO', 'DEPOSITO'], [1, monto], [1, 2], [2, 2 + monto])
+    assert len({len(columna) for columna in libro._columnas()}) == 1
+    assert libro[:] == [libro.transaccion(0)]
+
+
+@pytest.mark.parametrize('monto', [float('inf'), float('nan'), 1e15])
+def test_cuenta_rechaza_montos_no_representables(monto):
+    cuenta = CuentaBancaria('A', 'Ana', 10, SalidaNula())
+    for operacion in (cuenta.depositar, cuenta.retirar, cuenta.transferir):
+        with pytest.raises(ValueError, match="finito"):
+            operacion(monto)
+    assert cuenta.balance == 10
+    assert cuenta.consultar_historial() == []
+
+
+def test_balance_que_no_entra_no_cambia_la_cuenta():
+    cuenta = CuentaBancaria('A', 'Ana', MONTO_MAXIMO, SalidaNula())
+    destino = CuentaBancaria('B', 'Beto', MONTO_MAXIMO, SalidaNula())
+    with pytest.raises(ValueError, match="fuera de rango"):
+        cuenta.depositar(1)
+    with pytest.raises(ValueError, match="fuera de rango"):
+        cuenta.transferir(1, destino)
+    assert (cuenta.balance, destino.balance) == (MONTO_MAXIMO, MONTO_MAXIMO)
+    assert len(cuenta.consultar_historial()) == len(destino.consultar_historial()) == 0
+    cuenta.retirar(1)
+    assert cuenta.consultar_historial()[-1]['balance_nuevo'] == MONTO_MAXIMO - 1
@@ -0,0 +1,132 @@
+"""
+Pruebas de los lotes de operaciones.
+
+Uso:
+    python -m pytest test_lotes.py
+"""
+import os
+
+import pytest
+
+from banco import Banco
+from cuenta_bancaria import CuentaBancaria
+from libro_mayor import MONTO_MAXIMO
+from lotes import Operacion, validar
+from persistencia import BancoPersistente
+from salidas import SalidaNula
+
+
+def _banco():
+    banco = Banco(SalidaNula())
+    banco.abrir_cuenta('A', 'Ana', 100)
+    banco.abrir_cuenta('B', 'Beto')
+    return banco
+
+
+LOTE = [('TRANSFERENCIA', 'A', 80, 'B'), ('RETIRO', 'B', 100), ('DEPOSITO', 'B', 5)]
+
+
+def test_todo_o_nada_no_toca_las_cuentas():
+    banco = _banco()
+    with pytest.raises(ValueError, match="operación 1: fondos insuficientes"):
+        banco.aplicar_lote(LOTE)
+    assert (banco.cuenta('A').balance, banco.cuenta('B').balance) == (100, 0)
+    assert len(banco.cuenta('A')._historial) == 0
+
+
+def test_hasta_error_aplica_el_prefijo():
+    resultado = _banco().aplicar_lote(LOTE, 'hasta_error')
+    assert resultado.aplicadas == 1
+    assert resultado.rechazadas == [(1, "fondos insuficientes")]
+    assert resultado.balances == {'A': 20, 'B': 80}
+
+
+def test_omitir_saltea_las_invalidas():
+    resultado = _banco().aplicar_lote(LOTE, 'omitir')
+    assert resultado.aplicadas == 2
+    assert resultado.balances == {'A': 20, 'B': 85}
+
+
+def test_lote_igual_a_operaciones_sueltas():
+    operaciones = [('DEPOSITO', 10.1), ('RETIRO', 3.3), ('TRANSFERENCIA', 0.7, 'X'), ('DEPOSITO', 0.2)]
+    suelta = CuentaBancaria('1', 'Uno', 1, SalidaNula())
+    for tipo, monto, *destino in operaciones:
+        {'DEPOSITO': suelta.depositar, 'RETIRO': suelta.retirar,
+         'TRANSFERENCIA': lambda m: suelta.transferir(m, *destino)}[tipo](monto)
+    en_lote = CuentaBancaria('1', 'Uno', 1, SalidaNula())
+    en_lote.aplicar_lote(operaciones)
+    assert en_lote.balance == suelta.balance
+    campos = ('tipo', 'monto', 'balance_anterior', 'balance_nuevo')
+    assert ([[t[c] for c in campos] for t in en_lote._historial]
+            == [[t[c] for c in campos] for t in suelta._historial])
+
+
+def test_validar_rechaza_valores_no_hashables_y_de_otro_tipo():
+    invalidas = validar([Operacion('TRANSFERENCIA', 'A', 1, ['B']),
+                         Operacion('DEPOSITO', ['A'], 1),
+                         Operacion('DEPOSITO', 'A', True),
+                         Operacion('RETIRO', 'A', float('nan')),
+                         Operacion('TRANSFERENCIA', 'A', 1, 'A'),
+                         Operacion('DEPOSITO', 'A', 1)], {'A', 'B'})
+    assert invalidas == {0: "el destino debe ser un número de cuenta",
+                         1: "no existe la cuenta ['A']",
+                         2: "el monto debe ser un número",
+                         3: "el monto debe ser positivo",
+                         4: "la cuenta de destino debe ser distinta de la de origen"}
+
+
+def test_banco_con_destino_no_hashable():
+    resultado = _banco().aplicar_lote([('TRANSFERENCIA', 'A', 1, {})], 'omitir')
+    assert resultado.rechazadas == [(0, "el destino debe ser un número de cuenta")]
+
+
+def test_lote_entre_diarios_distintos_se_recupera(tmp_path):
+    uno, otro = str(tmp_path / 'uno'), str(tmp_path / 'otro')
+    with BancoPersistente(uno, salida=SalidaNula()) as banco_uno, \
+            BancoPersistente(otro, salida=SalidaNula()) as banco_otro:
+        banco = Banco(SalidaNula())
+        banco.agregar(banco_uno.abrir_cuenta('X', 'Xavier', 100))
+        banco.agregar(banco_otro.abrir_cuenta('Y', 'Yanina'))
+        banco.aplicar_lote([('TRANSFERENCIA', 'X', 30, 'Y'), ('TRANSFERENCIA', 'Y', 5, 'X')])
+    with BancoPersistente(uno, salida=SalidaNula()) as banco_uno, \
+            BancoPersistente(otro, salida=SalidaNula()) as banco_otro:
+        assert banco_uno.cuenta('X').balance == 75
+        assert banco_otro.cuenta('Y').balance == 25
+
+
+@pytest.mark.parametrize('monto', [float('inf'), 1e15])
+def test_monto_no_representable_rechaza_el_lote_sin_aplicar_nada(monto):
+    banco = _banco()
+    with pytest.raises(ValueError, match="operación 1: el monto debe ser finito"):
+        banco.aplicar_lote([('DEPOSITO', 'A', 5), ('DEPOSITO', 'B', monto)])
+    assert (banco.cuenta('A').balance, banco.cuenta('B').balance) == (100, 0)
+    resultado = banco.aplicar_lote([('DEPOSITO', 'A', 5), ('DEPOSITO', 'B', monto)], 'omitir')
+    assert resultado.balances == {'A': 105, 'B': 0}
+
+
+def test_balance_que_no_entra_deshace_el_lote_entero():
+    banco = _banco()
+    banco.abrir_cuenta('C', 'Carla', MONTO_MAXIMO)
+    with pytest.raises(ValueError, match="fuera de rango"):
+        banco.aplicar_lote([('DEPOSITO', 'A', 5), ('DEPOSITO', 'C', 1)])
+    assert (banco.cuenta('A').balance, banco.cuenta('C').balance) == (100, MONTO_MAXIMO)
+    assert len(banco.cuenta('A')._historial) == len(banco.cuenta('C')._historial) == 0
+
+
+def test_lote_con_escritura_fallida_no_cambia_las_cuentas(tmp_path, monkeypatch):
+    def fsync_roto(descriptor):
+        raise OSError(5, "Error de entrada/salida")
+
+    with BancoPersistente(str(tmp_path), salida=SalidaNula()) as banco:
+        banco.abrir_cuenta('A', 'Ana', 100)
+        banco.abrir_cuenta('B', 'Beto')
+        monkeypatch.setattr(os, 'fsync', fsync_roto)
+        with pytest.raises(OSError):
+            banco.aplicar_lote([('TRANSFERENCIA', 'A', 30, 'B'), ('DEPOSITO', 'B', 5)])
+        with pytest.raises(OSError, match="falló"):
+            banco.cuenta('A').aplicar_lote([('DEPOSITO', 1)])
+        monkeypatch.undo()
+        assert (banco.cuenta('A').balance, banco.cuenta('B').balance) == (100, 0)
+        assert len(banco.cuenta('A')._historial) == len(banco.cuenta('B')._historial) == 0
+    with BancoPersistente(str(tmp_path), salida=SalidaNula()) as banco:
+        assert (banco.cuenta('A').balance, banco.cuenta('B').balance) == (100, 0)
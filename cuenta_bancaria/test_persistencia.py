@@ -0,0 +1,143 @@
+"""
+Pruebas de recuperación del BancoPersistente.
+
+Uso:
+    python -m pytest test_persistencia.py
+"""
+import os
+
+import pytest
+
+from cuenta_bancaria import CuentaBancaria
+from persistencia import BancoPersistente, Diario
+from salidas import SalidaNula
+
+
+def _estado(banco):
+    return {cuenta.num_cuenta: (cuenta.balance, cuenta._historial[:]) for cuenta in banco}
+
+
+def test_recupera_transferencias_entre_cuentas_del_banco(tmp_path):
+    with BancoPersistente(str(tmp_path), salida=SalidaNula()) as banco:
+        banco.abrir_cuenta('A', 'Ana', 100)
+        banco.abrir_cuenta('B', 'Beto')
+        banco.transferir('A', 'B', 30.5)
+        banco.retirar('B', 0.5)
+        antes = _estado(banco)
+    with BancoPersistente(str(tmp_path), salida=SalidaNula()) as banco:
+        assert _estado(banco) == antes
+
+
+def test_transferencia_a_cuenta_fuera_del_banco(tmp_path):
+    suelta = CuentaBancaria('Z', 'Zoe', 0, SalidaNula())
+    with BancoPersistente(str(tmp_path), salida=SalidaNula()) as banco:
+        banco.abrir_cuenta('A', 'Ana', 100).transferir(30, suelta)
+    with BancoPersistente(str(tmp_path), salida=SalidaNula()) as banco:
+        assert banco.cuenta('A').balance == 70
+        assert 'Z' not in banco
+    assert suelta.balance == 30
+
+
+def test_transferencia_desde_cuenta_fuera_del_banco(tmp_path):
+    suelta = CuentaBancaria('Z', 'Zoe', 100, SalidaNula())
+    with BancoPersistente(str(tmp_path), salida=SalidaNula()) as banco:
+        suelta.transferir(40, banco.abrir_cuenta('A', 'Ana'))
+    with BancoPersistente(str(tmp_path), salida=SalidaNula()) as banco:
+        assert banco.cuenta('A').balance == 40
+        assert banco.cuenta('A')._historial[-1]['tipo'] == 'TRANSFERENCIA_RECIBIDA'
+
+
+def test_transferencia_entre_bancos_persistentes(tmp_path):
+    uno, otro = str(tmp_path / 'uno'), str(tmp_path / 'otro')
+    with BancoPersistente(uno, salida=SalidaNula()) as banco_uno, \
+            BancoPersistente(otro, salida=SalidaNula()) as banco_otro:
+        origen = banco_uno.abrir_cuenta('X', 'Xavier', 100)
+        destino = banco_otro.abrir_cuenta('Y', 'Yanina')
+        origen.transferir(60, destino)
+        destino.transferir(15, origen)
+    with BancoPersistente(uno, salida=SalidaNula()) as banco_uno, \
+            BancoPersistente(otro, salida=SalidaNula()) as banco_otro:
+        assert banco_uno.cuenta('X').balance == 55
+        assert banco_otro.cuenta('Y').balance == 45
+
+
+def test_recupera_desde_foto_y_cola(tmp_path):
+    with BancoPersistente(str(tmp_path), salida=SalidaNula()) as banco:
+        banco.abrir_cuenta('A', 'Ana', 100)
+        banco.abrir_cuenta('B', 'Beto')
+        banco.transferir('A', 'B', 10)
+        banco.fotografiar()
+        banco.transferir('B', 'A', 4)
+        antes = _estado(banco)
+    with BancoPersistente(str(tmp_path), salida=SalidaNula()) as banco:
+        assert banco.reaplicados == 1
+        assert _estado(banco) == antes
+
+
+def test_descarta_la_cola_rota(tmp_path):
+    with BancoPersistente(str(tmp_path), salida=SalidaNula()) as banco:
+        banco.abrir_cuenta('A', 'Ana', 100)
+        banco.depositar('A', 5)
+    segmento = max(tmp_path.glob('diario-*.log'))
+    with open(segmento, 'ab') as archivo:
+        archivo.write(b'\x10\x00\x00\x00basura')
+    with BancoPersistente(str(tmp_path), salida=SalidaNula()) as banco:
+        assert banco.cuenta('A').balance == 105
+
+
+def _fsync_roto(descriptor):
+    raise OSError(5, "Error de entrada/salida")
+
+
+def test_escritura_fallida_no_se_da_por_durable(tmp_path, monkeypatch):
+    diario = Diario(str(tmp_path), 'lote')
+    secuencia = diario.anotar('DEPOSITO', 'A', 1.0)
+    monkeypatch.setattr(os, 'fsync', _fsync_roto)
+    with pytest.raises(OSError):
+        diario.confirmar(secuencia)
+    monkeypatch.undo()
+    with pytest.raises(OSError, match="falló"):
+        diario.confirmar(secuencia)
+    with pytest.raises(OSError, match="falló"):
+        diario.anotar('DEPOSITO', 'A', 1.0)
+    diario.cerrar()
+
+
+@pytest.mark.parametrize('durabilidad', ['lote', 'siempre'])
+def test_escritura_fallida_no_cambia_las_cuentas(tmp_path, monkeypatch, durabilidad):
+    with BancoPersistente(str(tmp_path), durabilidad, salida=SalidaNula()) as banco:
+        ana = banco.abrir_cuenta('A', 'Ana', 100)
+        beto = banco.abrir_cuenta('B', 'Beto')
+        monkeypatch.setattr(os, 'fsync', _fsync_roto)
+        with pytest.raises(OSError):
+            banco.transferir('A', 'B', 30)
+        monkeypatch.undo()
+        assert (ana.balance, beto.balance) == (100, 0)
+        assert len(ana._historial) == len(beto._historial) == 0
+        # El diario ya no acepta registros: las operaciones fallan sin tocar las cuentas
+        for operacion in (lambda: ana.depositar(50), lambda: ana.retirar(10),
+                          lambda: ana.transferir(5, 'Z'), lambda: beto.transferir(1, ana)):
+            with pytest.raises(OSError, match="falló"):
+                operacion()
+        assert (ana.balance, beto.balance) == (100, 0)
+        assert len(ana._historial) == len(beto._historial) == 0
+    with BancoPersistente(str(tmp_path), salida=SalidaNula()) as banco:
+        assert (banco.cuenta('A').balance, banco.cuenta('B').balance) == (100, 0)
+
+
+def test_escritura_fallida_deshace_solo_el_lado_de_ese_diario(tmp_path, monkeypatch):
+    uno, otro = str(tmp_path / 'uno'), str(tmp_path / 'otro')
+    with BancoPersistente(uno, salida=SalidaNula()) as banco_uno, \
+            BancoPersistente(otro, 'siempre', salida=SalidaNula()) as banco_otro:
+        origen = banco_uno.abrir_cuenta('X', 'Xavier', 100)
+        destino = banco_otro.abrir_cuenta('Y', 'Yanina')
+        monkeypatch.setattr(os, 'fsync', _fsync_roto)
+        with pytest.raises(OSError):
+            origen.transferir(60, destino)
+        monkeypatch.undo()
+        # El débito quedó anotado en su diario; el crédito no llegó al otro
+        assert (origen.balance, destino.balance) == (40, 0)
+    with BancoPersistente(uno, salida=SalidaNula()) as banco_uno, \
+            BancoPersistente(otro, salida=SalidaNula()) as banco_otro:
+        assert banco_uno.cuenta('X').balance == 40
+        assert banco_otro.cuenta('Y').balance == 0
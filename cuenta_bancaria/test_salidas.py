@@ -0,0 +1,110 @@
+"""
+Pruebas de las salidas de eventos.
+
+Uso:
+    python -m pytest test_salidas.py
+"""
+import logging
+
+import banco as modulo_banco
+import cuenta_bancaria as modulo_cuenta
+from banco import Banco
+from cuenta_bancaria import CuentaBancaria
+from salidas import Evento, Salida, SalidaCola, SalidaConsola, SalidaNula, SalidaRegistro
+
+
+class _Lista(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.mensajes = []
+
+    def emit(self, registro):
+        self.mensajes.append(registro.getMessage())
+
+
+class _Juntar(Salida):
+    def __init__(self):
+        self.eventos = []
+        self.cerrada = False
+
+    def emitir(self, evento):
+        self.eventos.append(evento)
+
+    def cerrar(self):
+        self.cerrada = True
+
+
+def _logger(nombre):
+    logger = logging.getLogger(nombre)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    manejador = _Lista()
+    logger.addHandler(manejador)
+    return logger, manejador
+
+
+def _operar(cuenta):
+    cuenta.depositar(50)
+    cuenta.retirar(20)
+    cuenta.transferir(10, '200-333-444')
+
+
+def test_salida_nula_no_crea_eventos(monkeypatch):
+    def prohibido(*args):
+        raise AssertionError("con SalidaNula no se crean eventos")
+
+    monkeypatch.setattr(modulo_cuenta, 'Evento', prohibido)
+    monkeypatch.setattr(modulo_banco, 'Evento', prohibido)
+    banco = Banco(SalidaNula())
+    cuenta = banco.abrir_cuenta('A', 'Ana', 100)
+    _operar(cuenta)
+    cuenta.generar_balance()
+    cuenta.consultar_historial()
+    banco.aplicar_lote([('DEPOSITO', 'A', 1)])
+    assert cuenta.balance == 121
+
+
+def test_salida_consola_imprime_el_texto_de_siempre(capsys):
+    _operar(CuentaBancaria('A', 'Ana', 100, SalidaConsola()))
+    assert capsys.readouterr().out.splitlines() == [
+        "Depósito exitoso. Nuevo balance: $150.00",
+        "Retiro exitoso. Nuevo balance: $130.00",
+        "Transferencia exitosa de $10.00 a 200-333-444",
+        "Nuevo balance: $120.00",
+    ]
+
+
+def test_salida_registro_junta_y_vacia_al_cerrar():
+    logger, manejador = _logger('test_salidas.registro')
+    salida = SalidaRegistro(logger, capacidad=2)
+    _operar(CuentaBancaria('A', 'Ana', 100, salida))
+    # La primera tanda (2 eventos) ya pasó; el tercero espera
+    assert len(manejador.mensajes) == 2
+    salida.cerrar()
+    assert manejador.mensajes == [
+        "Depósito exitoso. Nuevo balance: $150.00",
+        "Retiro exitoso. Nuevo balance: $130.00",
+        "Transferencia exitosa de $10.00 a 200-333-444\nNuevo balance: $120.00",
+    ]
+
+
+def test_salida_registro_no_arma_el_texto_con_el_nivel_deshabilitado(monkeypatch):
+    logger, manejador = _logger('test_salidas.silencio')
+    logger.setLevel(logging.WARNING)
+    textos = []
+    monkeypatch.setattr(Evento, 'texto', lambda evento: textos.append(evento) or '')
+    with SalidaRegistro(logger) as salida:
+        _operar(CuentaBancaria('A', 'Ana', 100, salida))
+    assert manejador.mensajes == textos == []
+
+
+def test_salida_cola_entrega_todo_en_orden_al_cerrar():
+    destino = _Juntar()
+    salida = SalidaCola(destino)
+    cuenta = CuentaBancaria('A', 'Ana', 0, salida)
+    for _ in range(500):
+        cuenta.depositar(1)
+    salida.cerrar()
+    assert destino.cerrada
+    assert [evento.datos['balance'] for evento in destino.eventos] == list(range(1, 501))
+    assert all(evento.tipo == 'DEPOSITO' and evento.cuenta == 'A' for evento in destino.eventos)
@@ -0,0 +1,274 @@
+"""
+Analizador seguro de expresiones para la CalculadoraAnalisisII.
+
+Reemplaza a sp.sympify sobre el texto que ingresa el usuario. El texto se
+parsea con ast (sin eval) y se recorre aceptando sólo números, símbolos,
+las operaciones aritméticas y una lista blanca de funciones, con límites
+de tamaño, profundidad y exponentes; el árbol de SymPy se arma
+directamente desde el AST. diff no deriva al parsear: arma una Derivative
+sin evaluar, que la calculadora evalúa después con su tiempo límite. Los resultados se cachean por el AST canónico
+(ast.dump), así "x^2+1", "x**2 + 1" y "(x**2)+1" comparten la entrada.
+"""
+import ast
+import functools
+import re
+
+import sympy as sp
+from sympy.core.function import AppliedUndef
+
+from cache_expresiones import CacheExpresiones
+
+# ============= LÍMITES =============
+
+LONGITUD_MAXIMA = 10_000
+NODOS_MAXIMOS = 20_000
+PROFUNDIDAD_MAXIMA = 100
+# |n| máximo de un exponente numérico (x**n, 2**n)
+EXPONENTE_MAXIMO = 1_000
+# Bits máximos de una potencia de números racionales (10**1000 tiene unos 3300)
+BITS_MAXIMOS = 100_000
+# Argumento numérico máximo de las funciones cuyo costo crece con él
+ARGUMENTO_MAXIMO = {'factorial': 10_000, 'factorial2': 10_000, 'binomial': 10_000,
+                    'fibonacci': 10_000, 'primorial': 1_000, 'gamma': 10_000, 'loggamma': 10_000}
+# Orden total máximo de las derivadas de una expresión (sumando las anidadas)
+ORDEN_MAXIMO = 10
+
+# ============= LISTAS BLANCAS =============
+
+FUNCIONES = {
+    'sin': sp.sin, 'cos': sp.cos, 'tan': sp.tan, 'cot': sp.cot, 'sec': sp.sec, 'csc': sp.csc,
+    'asin': sp.asin, 'acos': sp.acos, 'atan': sp.atan, 'atan2': sp.atan2, 'acot': sp.acot,
+    'sinh': sp.sinh, 'cosh': sp.cosh, 'tanh': sp.tanh, 'coth': sp.coth,
+    'asinh': sp.asinh, 'acosh': sp.acosh, 'atanh': sp.atanh,
+    'exp': sp.exp, 'log': sp.log, 'ln': sp.log, 'sqrt': sp.sqrt, 'cbrt': sp.cbrt, 'root': sp.root,
+    'Abs': sp.Abs, 'abs': sp.Abs, 'sign': sp.sign, 'floor': sp.floor, 'ceiling': sp.ceiling,
+    'Max': sp.Max, 'Min': sp.Min, 're': sp.re, 'im': sp.im, 'Mod': sp.Mod,
+    'factorial': sp.factorial, 'factorial2': sp.factorial2, 'binomial': sp.binomial,
+    'fibonacci': sp.fibonacci, 'primorial': sp.primorial,
+    'gamma': sp.gamma, 'loggamma': sp.loggamma, 'erf': sp.erf, 'erfc': sp.erfc, 'LambertW': sp.LambertW,
+    'Heaviside': sp.Heaviside, 'DiracDelta': sp.DiracDelta,
+    # Ecuaciones diferenciales: Eq(y(x).diff(x), ...) o Derivative(y(x), x)
+    'Eq': sp.Eq, 'Derivative': sp.Derivative, 'diff': sp.Derivative,
+}
+
+CONSTANTES = {'pi': sp.pi, 'E': sp.E, 'I': sp.I, 'oo': sp.oo}
+
+# Métodos que se pueden llamar sobre una subexpresión: expr.diff(x) arma Derivative(expr, x)
+METODOS = {'diff': sp.Derivative}
+
+# Funciones y métodos que derivan, para el límite de orden
+_DERIVADAS = ('diff', 'Derivative')
+
+# Símbolos: una letra con subíndice opcional (x, y1, x_2) o una letra griega
+_GRIEGAS = ('alpha', 'beta', 'gamma', 'delta', 'epsilon', 'zeta', 'eta', 'theta', 'iota',
+            'kappa', 'mu', 'nu', 'xi', 'omicron', 'rho', 'sigma', 'tau', 'upsilon',
+            'phi', 'chi', 'psi', 'omega')
+_SIMBOLO = re.compile(r'[A-Za-z](_?\d+)?|(' + '|'.join(_GRIEGAS) + r')(_?\d+)?')
+
+_OPERADORES = {
+    ast.Mod: sp.Mod,
+    ast.FloorDiv: lambda a, b: sp.floor(a / b),
+}
+
+# Cadenas a + b - c ... y a * b / c ...: se arman con un único Add o Mul
+_SUMAS = (ast.Add, ast.Sub)
+_PRODUCTOS = (ast.Mult, ast.Div)
+
+
+class ExpresionInvalida(ValueError):
+    """La expresión no se puede parsear o excede los límites permitidos"""
+
+
+# ============= CONSTRUCCIÓN =============
+
+def _potencia(base, exponente):
+    """base**exponente verificando los límites antes de calcularla"""
+    if exponente.is_Number and abs(exponente) > EXPONENTE_MAXIMO:
+        raise ExpresionInvalida(f"Exponente demasiado grande: {exponente} (máximo {EXPONENTE_MAXIMO})")
+    if base.is_Rational and exponente.is_Number and base not in (0, 1, -1):
+        bits = max(abs(base.p).bit_length(), abs(base.q).bit_length()) * abs(exponente)
+        if bits > BITS_MAXIMOS:
+            raise ExpresionInvalida(f"Potencia demasiado grande (más de {BITS_MAXIMOS} bits)")
+    return base**exponente
+
+
+def _funcion(nombre, argumentos):
+    if nombre in FUNCIONES:
+        maximo = ARGUMENTO_MAXIMO.get(nombre)
+        if maximo is not None and any(a.is_Number and abs(a) > maximo for a in argumentos):
+            raise ExpresionInvalida(f"Argumento de {nombre} demasiado grande (máximo {maximo})")
+        return FUNCIONES[nombre](*argumentos)
+    if _SIMBOLO.fullmatch(nombre):
+        # Función sin definir, como y(x) en una ecuación diferencial
+        return sp.Function(nombre)(*argumentos)
+    raise ExpresionInvalida(f"Función no permitida: {nombre!r}")
+
+
+def _cadena(nodo, operadores):
+    """
+    Operandos de una cadena de operaciones del mismo tipo, que ast anida
+    hacia la izquierda: devuelve [(operador, nodo), ...] en orden
+    """
+    operandos = []
+    while isinstance(nodo, ast.BinOp) and isinstance(nodo.op, operadores):
+        operandos.append((type(nodo.op), nodo.right))
+        nodo = nodo.left
+    operandos.append((None, nodo))
+    return operandos[::-1]
+
+
+def _construir(nodo):
+    """Arma la expresión de SymPy de un nodo ya validado"""
+    if isinstance(nodo, ast.BinOp) and isinstance(nodo.op, _SUMAS):
+        return sp.Add(*(-_construir(n) if op is ast.Sub else _construir(n)
+                        for op, n in _cadena(nodo, _SUMAS)))
+    if isinstance(nodo, ast.BinOp) and isinstance(nodo.op, _PRODUCTOS):
+        return sp.Mul(*(1 / _construir(n) if op is ast.Div else _construir(n)
+                        for op, n in _cadena(nodo, _PRODUCTOS)))
+    if isinstance(nodo, ast.Constant):
+        if isinstance(nodo.value, bool) or not isinstance(nodo.value, (int, float)):
+            raise ExpresionInvalida(f"Constante no permitida: {nodo.value!r}")
+        return sp.Integer(nodo.value) if isinstance(nodo.value, int) else sp.Float(nodo.value)
+    if isinstance(nodo, ast.Name):
+        if nodo.id in CONSTANTES:
+            return CONSTANTES[nodo.id]
+        if _SIMBOLO.fullmatch(nodo.id):
+            return sp.Symbol(nodo.id)
+        raise ExpresionInvalida(f"Símbolo no permitido: {nodo.id!r}")
+    if isinstance(nodo, ast.BinOp):
+        izquierda, derecha = _construir(nodo.left), _construir(nodo.right)
+        if isinstance(nodo.op, ast.Pow):
+            return _potencia(izquierda, derecha)
+        if type(nodo.op) in _OPERADORES:
+            return _OPERADORES[type(nodo.op)](izquierda, derecha)
+    if isinstance(nodo, ast.UnaryOp) and isinstance(nodo.op, (ast.USub, ast.UAdd)):
+        operando = _construir(nodo.operand)
+        return -operando if isinstance(nodo.op, ast.USub) else operando
+    if isinstance(nodo, ast.Call) and not nodo.keywords:
+        argumentos = [_construir(a) for a in nodo.args]
+        if isinstance(nodo.func, ast.Name):
+            return _funcion(nodo.func.id, argumentos)
+        if isinstance(nodo.func, ast.Attribute) and nodo.func.attr in METODOS:
+            return METODOS[nodo.func.attr](_construir(nodo.func.value), *argumentos)
+    raise ExpresionInvalida(f"Construcción no permitida: {ast.unparse(nodo)!r}")
+
+
+def _misma_cadena(padre, hijo):
+    for operadores in (_SUMAS, _PRODUCTOS):
+        if isinstance(padre, ast.BinOp) and isinstance(padre.op, operadores) and \
+                hijo is padre.left and isinstance(hijo, ast.BinOp) and isinstance(hijo.op, operadores):
+            return True
+    return False
+
+
+def _profundidad(nodo, limite):
+    """
+    Profundidad del árbol, cortando apenas supera el límite. Una suma o un
+    producto de muchos términos cuenta como un solo nivel.
+    """
+    pendientes = [(nodo, 1)]
+    maxima = 0
+    while pendientes:
+        actual, nivel = pendientes.pop()
+        maxima = max(maxima, nivel)
+        if maxima > limite:
+            break
+        pendientes.extend((hijo, nivel if _misma_cadena(actual, hijo) else nivel + 1)
+                          for hijo in ast.iter_child_nodes(actual))
+    return maxima
+
+
+def _orden_derivadas(cuerpo):
+    """
+    Orden total de las derivadas del árbol: cada variable suma 1 y un
+    orden entero n suma n - 1 (diff(f, x, 3) es de orden 3).
+    """
+    orden = 0
+    for nodo in ast.walk(cuerpo):
+        if not isinstance(nodo, ast.Call):
+            continue
+        if isinstance(nodo.func, ast.Name) and nodo.func.id in _DERIVADAS:
+            variables = nodo.args[1:]
+        elif isinstance(nodo.func, ast.Attribute) and nodo.func.attr in METODOS:
+            variables = nodo.args
+        else:
+            continue
+        orden += 0 if variables else 1
+        for variable in variables:
+            if isinstance(variable, ast.Name):
+                orden += 1
+            elif isinstance(variable, ast.Constant) and type(variable.value) is int:
+                orden += max(variable.value - 1, 0)
+            else:
+                raise ExpresionInvalida("Las variables de una derivada deben ser símbolos "
+                                        "u órdenes enteros")
+    return orden
+
+
+def derivadas_pendientes(expresion):
+    """
+    Si la expresión tiene derivadas que se pueden calcular (no las de
+    funciones sin definir, como y(x).diff(x) en una ecuación diferencial)
+    """
+    return any(not isinstance(derivada.expr, AppliedUndef)
+               for derivada in expresion.atoms(sp.Derivative))
+
+
+def derivar(expresion):
+    """Calcula las derivadas sin evaluar de la expresión, de adentro hacia afuera"""
+    return expresion.replace(lambda e: isinstance(e, sp.Derivative), lambda e: e.doit(deep=False))
+
+
+# Expresiones ya construidas, por AST canónico
+_cache = CacheExpresiones(capacidad=4096)
+
+
+def arbol(texto):
+    """
+    Parsea y valida el texto; devuelve el cuerpo de su AST.
+
+    Raises:
+        ExpresionInvalida: si el texto no es una expresión o excede los límites
+    """
+    if not isinstance(texto, str):
+        raise ExpresionInvalida(f"Se esperaba un texto, no {type(texto).__name__}")
+    if len(texto) > LONGITUD_MAXIMA:
+        raise ExpresionInvalida(f"Expresión demasiado larga ({len(texto)} caracteres, "
+                                f"máximo {LONGITUD_MAXIMA})")
+    try:
+        # Como sympify, ^ es potencia
+        cuerpo = ast.parse(texto.replace('^', '**').strip(), mode='eval').body
+    except (SyntaxError, ValueError, RecursionError, MemoryError) as e:
+        raise ExpresionInvalida(f"Expresión mal formada: {texto!r}") from e
+    nodos = sum(1 for _ in ast.walk(cuerpo))
+    if nodos > NODOS_MAXIMOS:
+        raise ExpresionInvalida(f"Expresión demasiado grande ({nodos} nodos, máximo {NODOS_MAXIMOS})")
+    if _profundidad(cuerpo, PROFUNDIDAD_MAXIMA) > PROFUNDIDAD_MAXIMA:
+        raise ExpresionInvalida(f"Expresión demasiado anidada (máximo {PROFUNDIDAD_MAXIMA} niveles)")
+    orden = _orden_derivadas(cuerpo)
+    if orden > ORDEN_MAXIMO:
+        raise ExpresionInvalida(f"Derivada de orden demasiado alto ({orden}, máximo {ORDEN_MAXIMO})")
+    return cuerpo
+
+
+@functools.lru_cache(maxsize=4096)
+def analizar(texto):
+    """
+    Convierte el texto en una expresión de SymPy, como sp.sympify pero sin
+    eval y sólo con lo que está en las listas blancas.
+
+    Raises:
+        ExpresionInvalida: si el texto no es válido o excede los límites
+    """
+    cuerpo = arbol(texto)
+    clave = _cache.clave('expresion', ast.dump(cuerpo))
+
+    def construir():
+        try:
+            return _construir(cuerpo)
+        except ExpresionInvalida:
+            raise
+        except (TypeError, ValueError, ArithmeticError, RecursionError) as e:
+            # Cantidad de argumentos equivocada, 1/0 exacto...
+            raise ExpresionInvalida(f"Expresión inválida {texto!r}: {e}") from e
+    return _cache.obtener_o_calcular(clave, construir)
@@ -0,0 +1,86 @@
+"""
+Benchmark del analizador de expresiones frente a sp.sympify.
+
+Para cada corpus mide cuántas expresiones por segundo se parsean con
+sp.sympify (el camino anterior), con el analizador sin caché (cada texto
+se parsea, valida y construye) y con el analizador ya cacheado. Antes
+verifica que ambos den la misma expresión para todo el corpus.
+
+Uso:
+    python bench_analizador.py --repeticiones 5
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+import sympy as sp
+
+import analizador
+
+CORTAS = ['x**2 + 3*x', 'exp(x)*sin(x)', '1/(n*log(n)**2)', '(-1)**n/n', 'sqrt(1-x**2-y**2)',
+          'x^2+1', 'log(n)/n**2', '2**n/factorial(n)', 'exp(-x**2-y**2)*cos(x*y)',
+          'Eq(y(x).diff(x), x*y(x))', 'x*y*z*w', 'pi/4 + E', '0.5*x + 1e-3', 'atan(x)/(1+x**2)']
+
+
+def _aleatoria(azar, terminos):
+    """Expresión sintética de unos cuantos términos con funciones anidadas"""
+    funciones = ['sin', 'cos', 'exp', 'log', 'sqrt', 'atan']
+    partes = []
+    for _ in range(terminos):
+        f = azar.choice(funciones)
+        partes.append(f"{azar.randint(1, 9)}*{f}({azar.choice('xyz')}**{azar.randint(1, 5)} + "
+                      f"{azar.randint(1, 9)})/({azar.choice('xyz')} + {azar.randint(1, 9)})")
+    return " + ".join(partes)
+
+
+def corpus():
+    azar = random.Random(0)
+    return {
+        'cortas': CORTAS,
+        'medianas (10 términos)': [_aleatoria(azar, 10) for _ in range(50)],
+        'largas (100 términos)': [_aleatoria(azar, 100) for _ in range(10)],
+    }
+
+
+def medir(parsear, textos, repeticiones):
+    """Mejor cantidad de expresiones por segundo entre las repeticiones"""
+    tasas = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for texto in textos:
+            parsear(texto)
+        tasas.append(len(textos) / (time.perf_counter() - inicio))
+    return max(tasas), statistics.median(tasas)
+
+
+def _sin_cache(texto):
+    analizador.analizar.cache_clear()
+    analizador._cache.limpiar()
+    return analizador.analizar(texto)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Velocidad del analizador de expresiones")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    distintas = 0
+    for textos in corpus().values():
+        for texto in textos:
+            if analizador.analizar(texto) != sp.sympify(texto):
+                print(f"Difiere de sympify: {texto}", file=sys.stderr)
+                distintas += 1
+
+    caminos = (('sympify', sp.sympify), ('analizador', _sin_cache),
+               ('analizador (caché)', analizador.analizar))
+    print(f"{'corpus':<24}" + "".join(f"{nombre:>22}" for nombre, _ in caminos) + f"{'aceleración':>14}")
+    for nombre, textos in corpus().items():
+        tasas = [medir(parsear, textos, args.repeticiones)[0] for _, parsear in caminos]
+        print(f"{nombre:<24}" + "".join(f"{t:>17,.0f} e/s" for t in tasas) + f"{tasas[1] / tasas[0]:>13.1f}x")
+    return 1 if distintas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
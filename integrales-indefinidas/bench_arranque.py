@@ -0,0 +1,93 @@
+"""
+Benchmark del tiempo de arranque de la calculadora.
+
+Cada escenario se mide en un intérprete nuevo (así no hay módulos ya
+cargados) y se informa la mediana y el mínimo de varias repeticiones,
+junto con las dependencias pesadas que quedaron importadas. Con
+--historial los resultados se agregan a un archivo JSONL para seguir el
+tiempo de arranque entre versiones, y con --maximo el script falla si
+importar calculadora_analisis tarda más de lo indicado.
+
+Uso:
+    python bench_arranque.py --repeticiones 10 --historial arranque.jsonl --maximo 0.3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Escenario: código que se ejecuta después de arrancar el intérprete
+ESCENARIOS = {
+    'import calculadora_analisis': "import calculadora_analisis",
+    'crear calculadora': "from calculadora_analisis import CalculadoraAnalisisII; CalculadoraAnalisisII()",
+    'primera integral': ("from calculadora_analisis import CalculadoraAnalisisII; "
+                         "CalculadoraAnalisisII().integral_definida('x**2', 0, 2)"),
+    'primer cálculo numérico': ("from calculadora_analisis import CalculadoraAnalisisII; "
+                                "CalculadoraAnalisisII(modo='numerico').integral_definida('x**2', 0, 2)"),
+    'import lote': "import lote",
+    'import servidor (cliente)': "import servidor",
+}
+
+PESADOS = ('sympy', 'numpy', 'matplotlib')
+
+_MEDIDOR = """
+import sys, time, json
+inicio = time.perf_counter()
+{codigo}
+segundos = time.perf_counter() - inicio
+print(json.dumps({{'segundos': segundos, 'cargados': [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+def medir(codigo, repeticiones=5):
+    """Mide codigo en intérpretes nuevos; devuelve (tiempos, total_proceso, cargados)"""
+    tiempos, totales, cargados = [], [], []
+    programa = _MEDIDOR.format(codigo=codigo, pesados=PESADOS)
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        salida = subprocess.run([sys.executable, '-c', programa], cwd=DIRECTORIO,
+                                capture_output=True, text=True, check=True).stdout
+        totales.append(time.perf_counter() - inicio)
+        datos = json.loads(salida.strip().splitlines()[-1])
+        tiempos.append(datos['segundos'])
+        cargados = datos['cargados']
+    return tiempos, totales, cargados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de la calculadora")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--historial', help="archivo JSONL al que agregar los resultados")
+    parser.add_argument('--maximo', type=float, default=None,
+                        help="segundos máximos (mediana) para 'import calculadora_analisis'")
+    args = parser.parse_args(argv)
+
+    registro = {'fecha': time.strftime("%Y-%m-%d %H:%M:%S"), 'python': sys.version.split()[0],
+                'escenarios': {}}
+    print(f"{'escenario':<28}{'mediana':>10}{'mínimo':>10}{'proceso':>10}  cargados")
+    for nombre, codigo in ESCENARIOS.items():
+        tiempos, totales, cargados = medir(codigo, args.repeticiones)
+        mediana = statistics.median(tiempos)
+        registro['escenarios'][nombre] = {'mediana': mediana, 'minimo': min(tiempos),
+                                          'proceso': statistics.median(totales), 'cargados': cargados}
+        print(f"{nombre:<28}{mediana:>9.3f}s{min(tiempos):>9.3f}s"
+              f"{statistics.median(totales):>9.3f}s  {', '.join(cargados) or '-'}")
+
+    if args.historial:
+        with open(args.historial, 'a', encoding='utf-8') as archivo:
+            archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+    importar = registro['escenarios']['import calculadora_analisis']['mediana']
+    if args.maximo is not None and importar > args.maximo:
+        print(f"El import tardó {importar:.3f} s (máximo {args.maximo} s)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Benchmark de las operaciones de la calculadora sobre corpus representativos.
+
+Cada familia de operaciones (integrales indefinidas y definidas, EDO,
+puntos críticos, Lagrange, series y economía) tiene tres corpus: chico
+(ejercicios típicos), mediano (expresiones más largas) y patológico
+(casos que tardan o agotan el tiempo límite). Cada caso se ejecuta con
+las cachés vacías varias veces y se informan los percentiles de latencia
+por corpus; en una pasada aparte, con tracemalloc, se mide el pico de
+memoria. Sólo los corpus patológicos corren con tiempo límite: como el
+cálculo va entonces a un subproceso, su memoria no se mide. Con
+--guardar los resultados quedan como línea de base y con --comparar el
+script falla si algún corpus empeoró más que la tolerancia.
+
+Uso:
+    python bench_calculadora.py --guardar base.json
+    python bench_calculadora.py --comparar base.json --tolerancia 0.25
+    python bench_calculadora.py --familias series economia --niveles chico
+"""
+import argparse
+import json
+import math
+import sys
+import time
+import tracemalloc
+
+import sympy as sp
+
+import analizador
+from cache_expresiones import CacheExpresiones
+from calculadora_analisis import CalculadoraAnalisisII
+
+EDO = "Eq(y(x).diff(x), {})"
+
+# familia -> nivel -> [(operacion, argumentos, opciones), ...]
+CORPUS = {
+    'integrales_indefinidas': {
+        'chico': [('integral_indefinida', ("x**2 + 3*x + 1",), {}),
+                  ('integral_indefinida', ("x*exp(x)",), {}),
+                  ('integral_indefinida', ("sin(x)*cos(x)",), {}),
+                  ('integral_por_partes', ("x", "exp(x)"), {})],
+        'mediano': [('integral_indefinida', ("x**3*exp(2*x)*sin(x)",), {}),
+                    ('integral_indefinida', ("(x**2 + 1)/(x**3 - x)",), {}),
+                    ('integral_indefinida', ("sqrt(1 - x**2)*x**3",), {})],
+        'patologico': [('integral_indefinida', ("sin(x)**7*cos(x)**6*exp(x)",), {}),
+                       ('integral_indefinida', ("1/(x**5 + x + 1)",), {})],
+    },
+    'integrales_definidas': {
+        'chico': [('integral_definida', ("x**2", 0, 2), {}),
+                  ('integral_definida', ("sin(x)", 0, "pi"), {}),
+                  ('area_entre_curvas', ("x**2", "x + 2"), {})],
+        'mediano': [('integral_definida', ("x**4*exp(-x)*cos(x)", 0, 5), {}),
+                    ('area_entre_curvas', ("sin(x)", "cos(x)", 0, 10), {}),
+                    ('integral_multiple', ("x*y + z", [("x", 0, 1), ("y", 0, 1), ("z", 0, 1)]), {})],
+        'patologico': [('integral_definida', ("exp(-x**2)*log(x + 2)", 0, 3), {}),
+                       ('integral_definida', ("sin(x)/x**3 + cos(x**2)", 1, 10), {'modo': 'auto'})],
+    },
+    'edo': {
+        'chico': [('ecuacion_diferencial_separable', (EDO.format("x*y(x)"),), {}),
+                  ('ecuacion_diferencial_separable', (EDO.format("2*y(x)"), (0, 1)), {})],
+        'mediano': [('ecuacion_diferencial_separable', (EDO.format("x**2*y(x)**2"), (0, 1)), {}),
+                    ('ecuacion_diferencial_numerica', (EDO.format("sin(x)*y(x)"), (0, [1.0]),
+                                                       [0.5 * k for k in range(21)]), {})],
+        'patologico': [('ecuacion_diferencial_separable', (EDO.format("exp(x)*sin(y(x))"),), {}),
+                       ('ecuacion_diferencial_numerica', (EDO.format("-50*(y(x) - cos(x))"), (0, [0.0]),
+                                                          [0.1 * k for k in range(101)]), {})],
+    },
+    'puntos_criticos': {
+        'chico': [('puntos_criticos', ("x**2 + y**2 - 2*x - 4*y",), {}),
+                  ('puntos_criticos', ("x**3 - 3*x + y**2",), {})],
+        'mediano': [('puntos_criticos', ("exp(x)*(x**2 - 2*x) + y**2",), {}),
+                    ('puntos_criticos', ("x*y*exp(-(x**2 + y**2)/2)",), {})],
+        'patologico': [('puntos_criticos', ("sin(x)*cos(y) + x**2/10",), {'modo': 'auto'})],
+    },
+    'lagrange': {
+        'chico': [('lagrange', ("x*y", "x + y - 10"), {}),
+                  ('lagrange', ("x**2 + y**2", "x + 2*y - 5"), {})],
+        'mediano': [('lagrange', ("x + y + z", ["x**2 + y**2 + z**2 - 1"]), {}),
+                    ('lagrange', ("x*y*z", ["x + y + z - 3", "x - y"]), {})],
+        'patologico': [('lagrange', ("exp(x)*y", "x**4 + y**4 - 1"), {'modo': 'auto'})],
+    },
+    'series': {
+        'chico': [('suma_serie_geometrica', (1, 0.5), {}),
+                  ('limite_sucesion', ("(1 + 1/n)**n",), {}),
+                  ('serie_taylor', ("exp(x)", 0, 5), {})],
+        'mediano': [('analizar_serie', ("1/n**2",), {}),
+                    ('analizar_serie', ("(-1)**n/n",), {}),
+                    ('serie_taylor', ("sin(x)*exp(x)/(1 + x)", 0, 12), {})],
+        'patologico': [('analizar_serie', ("1/(n*log(n)**2)",), {'desde': 2}),
+                       ('serie_taylor', ("tan(sin(x)) - sin(tan(x))", 0, 15), {})],
+    },
+    'economia': {
+        'chico': [('excedente_consumidor', ("10 - q",), {'q0': 5}),
+                  ('excedente_productor', ("2 + q",), {'p0': 6}),
+                  ('interes_compuesto', (1000, 0.05, 3, 12), {})],
+        'mediano': [('equilibrio_mercado', ("100 - 2*q", "20 + q**2"), {}),
+                    ('excedente_consumidor_lote', ("100 - 2*q",), {'p0': [1.0 + k for k in range(99)]}),
+                    ('cronograma_interes_compuesto', ([1000, 2000, 5000], 0.05, 30, 12), {})],
+        'patologico': [('equilibrio_mercado', ("10*exp(-q/50)", "1 + q/10"), {}),
+                       ('excedente_consumidor_lote', ("50/(1 + q) + 5*exp(-q)",), {'p0': [0.5 * k for k in range(1, 100)]})],
+    },
+}
+
+NIVELES = ('chico', 'mediano', 'patologico')
+PERCENTILES = (50, 90, 99)
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) por interpolación lineal entre los ordenados"""
+    ordenados = sorted(valores)
+    posicion = (len(ordenados) - 1) * p / 100
+    abajo, arriba = math.floor(posicion), math.ceil(posicion)
+    return ordenados[abajo] + (ordenados[arriba] - ordenados[abajo]) * (posicion - abajo)
+
+
+def _calculadora(tiempo_limite):
+    # Cachés vacías en cada ejecución (la de la calculadora, la del
+    # analizador y la global de SymPy): se mide el cálculo, no el acierto
+    sp.core.cache.clear_cache()
+    analizador.analizar.cache_clear()
+    analizador._cache.limpiar()
+    return CalculadoraAnalisisII(cache=CacheExpresiones(), tiempo_limite=tiempo_limite)
+
+
+def ejecutar_caso(caso, tiempo_limite):
+    """Ejecuta un caso con la calculadora vacía; devuelve (segundos, error)"""
+    operacion, argumentos, opciones = caso
+    calc = _calculadora(tiempo_limite)
+    inicio = time.perf_counter()
+    resultado = getattr(calc, operacion)(*argumentos, **opciones)
+    resultado.texto()
+    return time.perf_counter() - inicio, resultado.error
+
+
+def medir_corpus(casos, repeticiones, tiempo_limite):
+    """Latencias de todas las repeticiones, pico de memoria y errores del corpus"""
+    latencias, errores = [], []
+    for caso in casos:
+        for _ in range(repeticiones):
+            segundos, error = ejecutar_caso(caso, tiempo_limite)
+            latencias.append(segundos)
+        if error:
+            errores.append(f"{caso[0]}{caso[1]}: {error}")
+
+    # Pasada aparte: tracemalloc hace todo varias veces más lento y no ve
+    # la memoria del subproceso del tiempo límite
+    pico = None
+    if tiempo_limite is None:
+        pico = 0
+        tracemalloc.start()
+        try:
+            for caso in casos:
+                tracemalloc.reset_peak()
+                ejecutar_caso(caso, None)
+                pico = max(pico, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    medidas = {f'p{p}': percentil(latencias, p) for p in PERCENTILES}
+    medidas.update(maximo=max(latencias), casos=len(casos), memoria_pico=pico, errores=errores)
+    return medidas
+
+
+def comparar(actual, base, tolerancia, minimo_segundos=0.005):
+    """
+    Regresiones de actual frente a base: corpus cuyo p50, p90 o pico de
+    memoria crecieron más que la tolerancia (diferencias de tiempo menores
+    a minimo_segundos se consideran ruido)
+    """
+    regresiones = []
+    for corpus, medidas in actual.items():
+        anterior = base.get(corpus)
+        if anterior is None:
+            continue
+        for metrica in ('p50', 'p90'):
+            if medidas[metrica] - anterior[metrica] > max(tolerancia * anterior[metrica], minimo_segundos):
+                regresiones.append(f"{corpus} {metrica}: {anterior[metrica] * 1000:.1f} ms -> "
+                                   f"{medidas[metrica] * 1000:.1f} ms")
+        if None not in (medidas['memoria_pico'], anterior['memoria_pico']) and \
+                medidas['memoria_pico'] > (1 + tolerancia) * anterior['memoria_pico']:
+            regresiones.append(f"{corpus} memoria: {anterior['memoria_pico'] / 2**20:.1f} MiB -> "
+                               f"{medidas['memoria_pico'] / 2**20:.1f} MiB")
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de las operaciones de la calculadora")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--familias', nargs='+', choices=sorted(CORPUS), default=sorted(CORPUS))
+    parser.add_argument('--niveles', nargs='+', choices=NIVELES, default=list(NIVELES))
+    parser.add_argument('--tiempo-limite', type=float, default=10,
+                        help="segundos máximos por cálculo simbólico en los corpus patológicos")
+    parser.add_argument('--guardar', help="archivo JSON donde guardar la línea de base")
+    parser.add_argument('--comparar', help="línea de base (JSON) contra la cual comparar")
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help="empeoramiento relativo tolerado al comparar (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    # Una pasada por los corpus chicos importa sympy y los submódulos que
+    # cada familia usa recién la primera vez
+    for familia in args.familias:
+        for caso in CORPUS[familia]['chico']:
+            ejecutar_caso(caso, None)
+
+    resultados = {}
+    print(f"{'corpus':<36}" + "".join(f"{f'p{p}':>10}" for p in PERCENTILES) + f"{'máximo':>10}{'memoria':>11}")
+    for familia in args.familias:
+        for nivel in args.niveles:
+            nombre = f"{familia}/{nivel}"
+            tiempo_limite = args.tiempo_limite if nivel == 'patologico' else None
+            medidas = resultados[nombre] = medir_corpus(CORPUS[familia][nivel], args.repeticiones,
+                                                        tiempo_limite)
+            memoria = medidas['memoria_pico']
+            memoria = f"{memoria / 2**20:>7.1f} MiB" if memoria is not None else f"{'-':>11}"
+            print(f"{nombre:<36}" + "".join(f"{medidas[f'p{p}'] * 1000:>8.1f}ms" for p in PERCENTILES) +
+                  f"{medidas['maximo'] * 1000:>8.1f}ms{memoria}")
+            for error in medidas['errores']:
+                print(f"    error en {error}", file=sys.stderr)
+
+    if args.guardar:
+        registro = {'fecha': time.strftime("%Y-%m-%d %H:%M:%S"), 'python': sys.version.split()[0],
+                    'sympy': sp.__version__, 'repeticiones': args.repeticiones, 'corpus': resultados}
+        with open(args.guardar, 'w', encoding='utf-8') as archivo:
+            json.dump(registro, archivo, ensure_ascii=False, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)['corpus']
+        regresiones = comparar(resultados, base, args.tolerancia)
+        for regresion in regresiones:
+            print(f"Regresión: {regresion}", file=sys.stderr)
+        if regresiones:
+            return 1
+        print(f"Sin regresiones frente a {args.comparar} (tolerancia {args.tolerancia:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import os
+import pickle
+from collections import OrderedDict
+
+
+class CacheExpresiones:
+    """
+    Caché LRU acotada para la CalculadoraAnalisisII.
+    Guarda tanto las expresiones ya parseadas como los resultados finales
+    de cada operación, y opcionalmente se persiste en disco.
+    """
+
+    _FALTA = object()
+
+    def __init__(self, capacidad=1024, ruta=None):
+        """
+        capacidad: cantidad máxima de entradas (0 desactiva la caché)
+        ruta: archivo donde persistir la caché; si existe se carga al iniciar
+        """
+        self.capacidad = capacidad
+        self.ruta = ruta
+        self._datos = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+        if ruta and os.path.exists(ruta):
+            self.cargar(ruta)
+
+    # ============= CLAVES =============
+
+    @staticmethod
+    def normalizar(expresion):
+        """Normaliza una expresión de entrada quitando los espacios"""
+        if isinstance(expresion, str):
+            return "".join(expresion.split())
+        return expresion
+
+    def clave(self, operacion, *argumentos):
+        """Arma la clave de una operación a partir de sus argumentos"""
+        return (operacion,) + tuple(self._congelar(arg) for arg in argumentos)
+
+    def _congelar(self, valor):
+        """
+        Convierte listas y diccionarios en tuplas para poder usarlos como
+        clave. Los demás valores llevan su tipo: 2 == 2.0 (e Integer(2) ==
+        2), pero integrar entre 0 y 2 da 8/3 y entre 0.0 y 2.0 da 2.667.
+        """
+        if isinstance(valor, str):
+            return self.normalizar(valor)
+        if isinstance(valor, (list, tuple)):
+            return tuple(self._congelar(v) for v in valor)
+        if isinstance(valor, dict):
+            return tuple(sorted((k, self._congelar(v)) for k, v in valor.items()))
+        return (type(valor).__name__, valor)
+
+    # ============= ACCESO =============
+
+    def obtener(self, clave, por_defecto=None):
+        """Devuelve el valor guardado para la clave y lo marca como reciente"""
+        try:
+            valor = self._datos[clave]
+        except (KeyError, TypeError):
+            self.fallos += 1
+            return por_defecto
+        self._datos.move_to_end(clave)
+        self.aciertos += 1
+        return valor
+
+    def guardar_valor(self, clave, valor):
+        """Guarda un valor, desalojando el menos usado si se supera la capacidad"""
+        if self.capacidad <= 0:
+            return
+        try:
+            self._datos[clave] = valor
+        except TypeError:
+            return
+        self._datos.move_to_end(clave)
+        while len(self._datos) > self.capacidad:
+            self._datos.popitem(last=False)
+            self.desalojos += 1
+
+    def obtener_o_calcular(self, clave, calcular):
+        """Devuelve el valor cacheado o lo calcula con calcular() y lo guarda"""
+        valor = self.obtener(clave, self._FALTA)
+        if valor is self._FALTA:
+            valor = calcular()
+            self.guardar_valor(clave, valor)
+        return valor
+
+    def limpiar(self):
+        """Vacía la caché y reinicia las estadísticas"""
+        self._datos.clear()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def estadisticas(self):
+        """Devuelve aciertos, fallos, desalojos y ocupación de la caché"""
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'desalojos': self.desalojos,
+            'entradas': len(self._datos),
+            'capacidad': self.capacidad,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+        }
+
+    def __len__(self):
+        return len(self._datos)
+
+    def __contains__(self, clave):
+        return clave in self._datos
+
+    # ============= PERSISTENCIA =============
+
+    def guardar(self, ruta=None):
+        """Persiste la caché en disco (escritura atómica)"""
+        ruta = ruta or self.ruta
+        if not ruta:
+            raise ValueError("No se indicó una ruta para guardar la caché")
+        # Las funciones compiladas no se pueden serializar: se omiten
+        entradas = []
+        for clave, valor in self._datos.items():
+            try:
+                pickle.dumps((clave, valor), protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, TypeError, AttributeError):
+                continue
+            entradas.append((clave, valor))
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as archivo:
+            pickle.dump(entradas, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+
+    def cargar(self, ruta=None):
+        """Carga en la caché las entradas guardadas en disco"""
+        ruta = ruta or self.ruta
+        try:
+            with open(ruta, "rb") as archivo:
+                entradas = pickle.load(archivo)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return 0
+        for clave, valor in entradas:
+            self.guardar_valor(clave, valor)
+        return len(entradas)
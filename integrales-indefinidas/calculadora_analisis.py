@@ -1,8 +1,85 @@
-import sympy as sp
-import numpy as np
-from sympy import symbols, integrate, diff, solve, limit, series, exp, sin, cos, ln, sqrt, oo, pi
-from sympy.abc import x, y, z, t, n, q, p
-import matplotlib.pyplot as plt
+import functools
+import os
+import time
+from cache_expresiones import CacheExpresiones
+from perezoso import ModuloPerezoso
+from tiempo_limite import TiempoAgotado, ejecutar_con_limite
+from resultados import Resultado
+
+# Las dependencias pesadas se importan recién al usarlas: sympy con el
+# primer cálculo, numpy en los modos numéricos y matplotlib al graficar
+sp = ModuloPerezoso('sympy')
+np = ModuloPerezoso('numpy')
+motor_numerico = ModuloPerezoso('motor_numerico')
+integracion_rapida = ModuloPerezoso('integracion_rapida')
+edo_numerica = ModuloPerezoso('edo_numerica')
+graficos = ModuloPerezoso('graficos')
+taylor = ModuloPerezoso('taylor')
+convergencia = ModuloPerezoso('convergencia')
+cubatura = ModuloPerezoso('cubatura')
+analizador = ModuloPerezoso('analizador')
+instrumentacion = ModuloPerezoso('instrumentacion')
+
+# Archivo opcional donde persistir la caché entre ejecuciones
+RUTA_CACHE = os.environ.get('CALCULADORA_CACHE')
+
+# Modos de cálculo: sólo simbólico, sólo numérico o simbólico con respaldo numérico
+MODOS = ('simbolico', 'numerico', 'auto')
+
+# Formas de entregar los resultados: objetos Resultado o el texto de siempre
+SALIDAS = ('objeto', 'texto')
+
+# Segundos por criterio de convergencia cuando la calculadora no tiene tiempo
+# límite: un sp.limit o sp.integrate patológico no debe colgar analizar_serie
+TIEMPO_CRITERIO = 5
+
+# Nombres de SymPy que este módulo exportaba; se resuelven recién al pedirlos
+_NOMBRES_SYMPY = ('symbols', 'integrate', 'diff', 'solve', 'limit', 'series',
+                  'exp', 'sin', 'cos', 'ln', 'sqrt', 'oo', 'pi')
+_SIMBOLOS = ('x', 'y', 'z', 't', 'n', 'q', 'p')
+
+
+def __getattr__(nombre):
+    if nombre in _NOMBRES_SYMPY:
+        return getattr(sp, nombre)
+    if nombre in _SIMBOLOS:
+        return sp.Symbol(nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+class _Simbolo:
+    """Símbolo de SymPy que se crea al usarlo por primera vez"""
+    
+    def __set_name__(self, clase, nombre):
+        self.nombre = nombre
+    
+    def __get__(self, instancia, clase=None):
+        simbolo = sp.Symbol(self.nombre)
+        if instancia is not None:
+            instancia.__dict__[self.nombre] = simbolo
+        return simbolo
+
+
+def _operacion(metodo):
+    """Mide el tiempo de una operación y entrega el Resultado según self.salida"""
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        if self.instrumentacion is None:
+            resultado = metodo(self, *args, **kwargs)
+        else:
+            with self.instrumentacion.operacion(metodo.__name__, self.cache) as registro:
+                resultado = metodo(self, *args, **kwargs)
+                registro['error'] = resultado.error
+                if isinstance(resultado.expresion, sp.Basic):
+                    registro['tamano'] = sum(1 for _ in sp.preorder_traversal(resultado.expresion))
+            if resultado._plantilla is not None:
+                resultado._plantilla = self._medido('texto', resultado._plantilla)
+        resultado.operacion = metodo.__name__
+        resultado.segundos = time.perf_counter() - inicio
+        return resultado.texto() if self.salida == 'texto' else resultado
+    return envoltura
+
 
 class CalculadoraAnalisisII:
     """
@@ -10,156 +87,687 @@ class CalculadoraAnalisisII:
     Incluye: Integrales, Ecuaciones Diferenciales, Funciones Multivariables, Series
     """
     
-    def __init__(self):
-        self.x = sp.Symbol('x')
-        self.y = sp.Symbol('y')
-        self.z = sp.Symbol('z')
-        self.q = sp.Symbol('q')
-        self.p = sp.Symbol('p')
+    x = _Simbolo()
+    y = _Simbolo()
+    z = _Simbolo()
+    q = _Simbolo()
+    p = _Simbolo()
+    
+    def __init__(self, cache=None, modo='simbolico', tiempo_limite=None, salida='objeto',
+                 instrumentacion=None):
+        """
+        instrumentacion: Instrumentacion (instrumentacion.py) donde registrar
+        tiempos, tamaños y aciertos de caché; None no mide nada
+        """
+        self.cache = cache if cache is not None else CacheExpresiones()
+        self.modo = modo
+        # Segundos máximos por cálculo simbólico (None = sin límite)
+        self.tiempo_limite = tiempo_limite
+        if salida not in SALIDAS:
+            raise ValueError(f"Salida desconocida: {salida}")
+        self.salida = salida
+        self.instrumentacion = instrumentacion
+    
+    @functools.cached_property
+    def integrador(self):
+        """Integrador por tabla para las formas elementales más frecuentes"""
+        return integracion_rapida.IntegradorRapido()
+    
+    # ============= CACHÉ =============
+    
+    def _sympify(self, expresion_str):
+        """
+        Parsea una expresión reutilizando el árbol cacheado si ya se parseó.
+        El texto pasa por el analizador seguro (lista blanca y límites, sin
+        eval); los números y expresiones de SymPy se convierten directamente.
+        """
+        clave = self.cache.clave('sympify', expresion_str)
+        if isinstance(expresion_str, str):
+            expresion = self.cache.obtener_o_calcular(
+                clave, self._medido('sympify', lambda: analizador.analizar(expresion_str)))
+            if analizador.derivadas_pendientes(expresion):
+                # diff llega sin evaluar: se deriva acá, con el tiempo límite
+                expresion = self._memo('derivar', (expresion_str,), lambda: analizador.derivar(expresion))
+            return expresion
+        return self.cache.obtener_o_calcular(clave, self._medido('sympify', lambda: sp.sympify(expresion_str)))
+    
+    def _medido(self, etapa, calcular):
+        """calcular, midiendo su tiempo como etapa si hay instrumentación"""
+        if self.instrumentacion is None:
+            return calcular
         
+        def medido():
+            with self.instrumentacion.etapa(etapa):
+                return calcular()
+        return medido
+    
+    @staticmethod
+    def _etapa(operacion, calcular):
+        """La función de SymPy que llama el cálculo (integrate, solve...) o la operación"""
+        nombres = getattr(getattr(calcular, '__code__', None), 'co_names', ())
+        return next((nombre for nombre in instrumentacion.ETAPAS_SYMPY if nombre in nombres), operacion)
+    
+    def _memo(self, operacion, argumentos, calcular, limitado=True, segundos=None):
+        """
+        Devuelve el resultado cacheado de una operación o lo calcula.
+        Si limitado es True el cálculo respeta self.tiempo_limite (o segundos,
+        si se indica). Los tiempos agotados no se cachean: con más tiempo
+        (o la máquina menos cargada) el mismo cálculo puede terminar.
+        """
+        clave = self.cache.clave(operacion, *argumentos)
+        segundos = segundos if segundos is not None else self.tiempo_limite
+        if limitado and segundos is not None:
+            def medir():
+                return ejecutar_con_limite(calcular, segundos=segundos)
+        else:
+            medir = calcular
+        if self.instrumentacion is not None:
+            medir = self._medido(self._etapa(operacion, calcular), medir)
+        # TiempoAgotado sale de medir sin que se guarde nada en la caché
+        valor = self.cache.obtener_o_calcular(clave, medir)
+        if isinstance(valor, TiempoAgotado):
+            # Guardado en disco por una versión que cacheaba los tiempos agotados
+            valor = medir()
+            self.cache.guardar_valor(clave, valor)
+        return valor
+    
+    def _integrar(self, operacion, argumentos, expr, variable, a=None, b=None):
+        """
+        Integra expr (indefinida, o entre a y b) probando primero la vía
+        rápida por tabla; si la forma no es conocida usa sp.integrate,
+        cacheado y con tiempo límite.
+        """
+        if a is None:
+            rapida = self._medido('integracion_rapida', lambda: self.integrador.integrar(expr, variable))()
+            limites = variable
+        else:
+            rapida = self._medido('integracion_rapida',
+                                  lambda: self.integrador.integrar_definida(expr, variable, a, b))()
+            limites = (variable, a, b)
+        if rapida is not None:
+            return rapida
+        return self._memo(operacion, argumentos, lambda: sp.integrate(expr, limites))
+    
+    # ============= EVALUACIÓN NUMÉRICA =============
+    
+    def _compilar(self, expr, *variables):
+        """
+        Compila la expresión (o lista de expresiones) con lambdify una única
+        vez y reutiliza la función
+        """
+        variables = variables or (self.x,)
+        if isinstance(expr, (list, tuple)):
+            compilar = motor_numerico.compilar_arreglo
+        else:
+            compilar = motor_numerico.compilar
+        return self._memo('lambdify', (expr, variables),
+                          lambda: compilar(expr, variables), limitado=False)
+    
+    def _integrar_numerico(self, expr, variable, a, b, metodo='gauss'):
+        """Integra numéricamente expr entre a y b (escalares o arreglos)"""
+        f = self._compilar(expr, variable)
+        return motor_numerico.integrar(f, a, b, metodo)
+    
+    def _resolver(self, modo, simbolico):
+        """
+        Ejecuta el cálculo simbólico según el modo y devuelve (resultado, nota).
+        resultado es None cuando corresponde pasar al cálculo numérico, y
+        nota explica por qué. Si se agota el tiempo límite siempre se pasa
+        al numérico, cualquiera sea el modo.
+        """
+        modo = modo or self.modo
+        if modo not in MODOS:
+            raise ValueError(f"Modo desconocido: {modo}")
+        if modo == 'numerico':
+            return None, "numérico"
+        try:
+            resultado = simbolico()
+        except TiempoAgotado as e:
+            return None, f"aproximación numérica: se agotó el tiempo límite de {e.segundos} s"
+        except Exception:
+            if modo == 'simbolico':
+                raise
+            return None, "aproximación numérica: falló el cálculo simbólico"
+        if modo == 'auto' and isinstance(resultado, sp.Basic) and resultado.has(sp.Integral):
+            return None, "aproximación numérica: sin primitiva simbólica"
+        return resultado, None
+    
     # ============= INTEGRALES INDEFINIDAS =============
     
+    @_operacion
     def integral_indefinida(self, expresion_str):
         """Calcula integral indefinida"""
         try:
-            expr = sp.sympify(expresion_str)
-            resultado = sp.integrate(expr, self.x)
-            return f"∫ {expr} dx = {resultado} + C"
+            expr = self._sympify(expresion_str)
+            resultado = self._integrar('integral_indefinida', (expresion_str,), expr, self.x)
+            return Resultado(resultado, lambda: f"∫ {expr} dx = {resultado} + C", expr)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
     
+    @_operacion
     def integral_sustitucion(self, expresion_str, u_str, du_dx_str):
         """Resuelve integral por sustitución"""
         try:
-            expr = sp.sympify(expresion_str)
-            u = sp.sympify(u_str)
+            expr = self._sympify(expresion_str)
+            u = self._sympify(u_str)
             du_dx = sp.diff(u, self.x)
             
             # Intentar expresar la integral en términos de u
-            resultado = sp.integrate(expr, self.x)
-            return f"Con u = {u}, du = {du_dx}dx\n∫ {expr} dx = {resultado} + C"
+            resultado = self._integrar('integral_indefinida', (expresion_str,), expr, self.x)
+            return Resultado(resultado, lambda: f"Con u = {u}, du = {du_dx}dx\n∫ {expr} dx = {resultado} + C",
+                             expr, u=u, du=du_dx)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
     
+    @_operacion
     def integral_por_partes(self, u_str, dv_str):
         """Resuelve integral por partes: ∫u dv = uv - ∫v du"""
         try:
-            u = sp.sympify(u_str)
-            dv = sp.sympify(dv_str)
+            u = self._sympify(u_str)
+            dv = self._sympify(dv_str)
             
             du = sp.diff(u, self.x)
-            v = sp.integrate(dv, self.x)
+            v = self._integrar('integral_indefinida', (dv_str,), dv, self.x)
             
-            resultado = u * v - sp.integrate(v * du, self.x)
-            return f"u = {u}, dv = {dv}dx\ndu = {du}dx, v = {v}\n∫ u dv = {resultado} + C"
+            resultado = u * v - self._integrar('integral_v_du', (u_str, dv_str), v * du, self.x)
+            return Resultado(resultado, lambda: f"u = {u}, dv = {dv}dx\ndu = {du}dx, v = {v}\n∫ u dv = {resultado} + C",
+                             u * dv, u=u, dv=dv, du=du, v=v)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
     
     # ============= INTEGRALES DEFINIDAS =============
     
-    def integral_definida(self, expresion_str, a, b):
+    @_operacion
+    def integral_definida(self, expresion_str, a, b, modo=None):
         """Calcula integral definida entre a y b"""
         try:
-            expr = sp.sympify(expresion_str)
-            resultado = sp.integrate(expr, (self.x, a, b))
-            return f"∫[{a},{b}] {expr} dx = {resultado} = {float(resultado):.4f}"
+            expr = self._sympify(expresion_str)
+            resultado, nota = self._resolver(modo, lambda: self._integrar(
+                'integral_definida', (expresion_str, a, b), expr, self.x, a, b))
+            if resultado is not None:
+                return Resultado(resultado, lambda: f"∫[{a},{b}] {expr} dx = {resultado} = {float(resultado):.4f}",
+                                 expr, a=a, b=b)
+            
+            valor, error = self._integrar_numerico(expr, self.x, float(self._sympify(a)), float(self._sympify(b)))
+            return Resultado(valor, lambda: f"∫[{a},{b}] {expr} dx ≈ {valor:.4f} ({nota}, error ≈ {error:.1e})",
+                             expr, a=a, b=b, nota=nota, error_estimado=error)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
+    
+    def integral_definida_lote(self, expresion_str, a, b, metodo='gauss'):
+        """
+        Calcula en una sola llamada muchas integrales definidas del mismo integrando.
+        a y b pueden ser arreglos; devuelve (valores, errores) como arreglos de NumPy.
+        """
+        expr = self._sympify(expresion_str)
+        return self._integrar_numerico(expr, self.x, a, b, metodo)
+    
+    def _intersecciones(self, f1_str, f2_str, a=None, b=None, dominio=(-10, 10), modo=None):
+        """
+        Abscisas ordenadas donde se cruzan las curvas: las exactas de
+        sp.solve (si no falla ni agota el tiempo) más las que agrega la
+        búsqueda numérica de cambios de signo en (a, b), o en dominio si no
+        se dan límites.
+        """
+        f1, f2 = self._sympify(f1_str), self._sympify(f2_str)
+        exactas = []
+        if (modo or self.modo) != 'numerico':
+            try:
+                soluciones = self._memo('intersecciones', (f1_str, f2_str),
+                                        lambda: sp.solve(f1 - f2, self.x))
+                exactas = [s for s in soluciones if s.is_real and s.is_finite]
+            except Exception:
+                # sp.solve no encuentra las raíces de muchas trascendentes
+                pass
+        
+        if a is not None and b is not None:
+            lo, hi = float(self._sympify(a)), float(self._sympify(b))
+        else:
+            lo, hi = min([dominio[0]] + exactas), max([dominio[1]] + exactas)
+            lo, hi = float(lo), float(hi)
+        numericas = self._memo('raices', (f1 - f2, lo, hi), lambda: motor_numerico.raices(
+            self._compilar(f1 - f2), lo, hi), limitado=False)
+        
+        # Las numéricas sólo agregan los cruces que sp.solve no encontró
+        aproximadas = np.array([float(s) for s in exactas])
+        nuevas = [sp.Float(r) for r in numericas
+                  if not np.any(np.abs(aproximadas - r) <= 1e-8 * (1 + abs(r)))]
+        puntos = sorted(exactas + nuevas, key=float)
+        if a is not None and b is not None:
+            margen = 1e-12 * (1 + hi - lo)
+            puntos = [c for c in puntos if lo + margen < float(c) < hi - margen]
+        return puntos
     
-    def area_entre_curvas(self, f1_str, f2_str, a=None, b=None):
-        """Calcula el área entre dos curvas"""
+    def _singularidades(self, expr, a, b):
+        """Singularidades de expr dentro de (a, b), ordenadas (vacío si no se pueden calcular)"""
         try:
-            f1 = sp.sympify(f1_str)
-            f2 = sp.sympify(f2_str)
+            puntos = self._memo('singularidades', (expr, a, b), lambda: sp.singularities(
+                expr, self.x, sp.Interval.open(a, b)))
+        except Exception:
+            return []
+        return sorted(puntos, key=float) if isinstance(puntos, sp.FiniteSet) else []
+    
+    def _limites_area(self, f1_str, f2_str, dominio=(-10, 10), modo=None):
+        """Intersecciones extremas de dos curvas, o (None, None) si hay menos de dos"""
+        intersecciones = self._intersecciones(f1_str, f2_str, dominio=dominio, modo=modo)
+        if len(intersecciones) < 2:
+            return None, None
+        return intersecciones[0], intersecciones[-1]
+    
+    def _areas_simbolicas(self, f1_str, f2_str, bordes, signos):
+        """
+        Área exacta de cada región como ±(F(r) - F(l)) con una única
+        primitiva F de f1 - f2; la región donde evaluar F no da un número
+        finito se integra aparte.
+        """
+        g = self._sympify(f1_str) - self._sympify(f2_str)
+        F = self._integrar('integral_indefinida', (f"({f1_str}) - ({f2_str})",), g, self.x)
+        areas = []
+        for l, r, signo in zip(bordes[:-1], bordes[1:], signos):
+            area = signo * (F.subs(self.x, r) - F.subs(self.x, l)) if not F.has(sp.Integral) else sp.nan
+            if not area.is_finite:
+                area = self._memo('area_region', (f1_str, f2_str, l, r),
+                                  lambda: sp.integrate(signo * g, (self.x, l, r)))
+                if area.has(sp.oo, sp.zoo):
+                    # Integral impropia divergente junto a una singularidad
+                    area = sp.oo
+            # Con un borde aproximado el área exacta no aporta: se da en decimales
+            areas.append(sp.N(area) if isinstance(l, sp.Float) or isinstance(r, sp.Float) else sp.simplify(area))
+        return sp.Tuple(*areas)
+    
+    @_operacion
+    def area_entre_curvas(self, f1_str, f2_str, a=None, b=None, modo=None, dominio=(-10, 10)):
+        """
+        Calcula el área entre dos curvas. El intervalo se divide en
+        regiones en los puntos donde las curvas se cruzan y cada región se
+        integra sin valor absoluto, con la curva de arriba menos la de abajo.
+        Sin límites se usan las intersecciones extremas (buscadas en dominio
+        cuando sp.solve no las encuentra).
+        """
+        try:
+            f1 = self._sympify(f1_str)
+            f2 = self._sympify(f2_str)
             
             # Encontrar puntos de intersección si no se dan límites
             if a is None or b is None:
-                intersecciones = sp.solve(f1 - f2, self.x)
-                if len(intersecciones) >= 2:
-                    a = min(intersecciones)
-                    b = max(intersecciones)
+                a, b = self._limites_area(f1_str, f2_str, dominio, modo)
+                if a is None:
+                    mensaje = "No se encontraron suficientes puntos de intersección"
+                    return Resultado(plantilla=lambda: mensaje, error=mensaje)
+            a, b = self._sympify(a), self._sympify(b)
+            
+            # Regiones separadas por los cruces y por las singularidades (tan x, 1/x...)
+            cortes = self._intersecciones(f1_str, f2_str, a, b, modo=modo)
+            singularidades = self._singularidades(f1 - f2, a, b)
+            cortes = sorted(cortes + singularidades, key=float)
+            bordes = [a] + cortes + [b]
+            izquierdas = np.array([float(l) for l in bordes[:-1]])
+            derechas = np.array([float(r) for r in bordes[1:]])
+            signos = np.sign(self._compilar(f1 - f2)((izquierdas + derechas) / 2))
+            signos = [int(s) if s != 0 else 1 for s in signos]
+            
+            areas, nota = self._resolver(modo, lambda: self._areas_simbolicas(
+                f1_str, f2_str, bordes, signos))
+            error = None
+            if areas is None:
+                # Todas las regiones en una sola cuadratura vectorizada
+                valores, errores = self._integrar_numerico(f1 - f2, self.x, izquierdas, derechas)
+                # Junto a una singularidad la cuadratura no puede acotar su error
+                impropias = np.isin(izquierdas, [float(s) for s in singularidades]) | \
+                    np.isin(derechas, [float(s) for s in singularidades])
+                errores = np.where(impropias, np.inf, errores)
+                areas = list(np.array(signos) * valores)
+                area, error = float(np.sum(areas)), float(np.sum(errores))
+            else:
+                areas = list(areas)
+                area = sum(areas)
+                area = sp.N(area) if area.has(sp.Float) else sp.simplify(area)
+            
+            regiones = [{'desde': l, 'hasta': r, 'area': area_region,
+                         'arriba': str(f1 if signo > 0 else f2)}
+                        for l, r, area_region, signo in zip(bordes[:-1], bordes[1:], areas, signos)]
+            
+            def texto():
+                if error is not None:
+                    resultado = (f"Área entre {f1} y {f2} desde x={a} hasta x={b} ≈ {area:.4f} u.A. "
+                                 f"({nota}, error ≈ {error:.1e})")
                 else:
-                    return "No se encontraron suficientes puntos de intersección"
+                    resultado = f"Área entre {f1} y {f2} desde x={a} hasta x={b}: {area} u.A."
+                if len(regiones) > 1:
+                    for region in regiones:
+                        resultado += (f"\n  [{region['desde']}, {region['hasta']}]: {region['area']} u.A. "
+                                      f"(arriba {region['arriba']})")
+                return resultado
             
-            # Calcular el área
-            area = sp.integrate(sp.Abs(f1 - f2), (self.x, a, b))
-            return f"Área entre {f1} y {f2} desde x={a} hasta x={b}: {area} u.A."
+            datos = {'nota': nota, 'error_estimado': error} if error is not None else {}
+            return Resultado(area, texto, f1 - f2, a=a, b=b, regiones=regiones, **datos)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
     
     # ============= ECUACIONES DIFERENCIALES =============
     
+    @_operacion
     def ecuacion_diferencial_separable(self, ec_str, condicion_inicial=None):
         """Resuelve EDO de variables separables"""
         try:
             y_func = sp.Function('y')
-            eq = sp.sympify(ec_str)
+            eq = self._sympify(ec_str)
             
             # Resolver la ecuación diferencial
             if condicion_inicial:
                 x0, y0 = condicion_inicial
-                solucion = sp.dsolve(eq, y_func(self.x), ics={y_func(x0): y0})
-                return f"Solución particular: {solucion}"
+                solucion = self._memo('ecuacion_diferencial', (ec_str, x0, y0),
+                                      lambda: sp.dsolve(eq, y_func(self.x), ics={y_func(x0): y0}))
+                return Resultado(solucion, lambda: f"Solución particular: {solucion}", eq,
+                                 condicion_inicial=(x0, y0))
             else:
-                solucion = sp.dsolve(eq, y_func(self.x))
-                return f"Solución general: {solucion}"
+                solucion = self._memo('ecuacion_diferencial', (ec_str,),
+                                      lambda: sp.dsolve(eq, y_func(self.x)))
+                return Resultado(solucion, lambda: f"Solución general: {solucion}", eq)
+        except Exception as e:
+            return Resultado(error=e)
+    
+    def _sistema_edo(self, ec_str):
+        """Prepara y compila una única vez el sistema de primer orden de una EDO"""
+        ecuaciones = [ec_str] if isinstance(ec_str, str) else list(ec_str)
+        return self._memo('sistema_edo', (ecuaciones,), lambda: edo_numerica.preparar_sistema(
+            [self._sympify(e) for e in ecuaciones], self.x), limitado=False)
+    
+    def ecuacion_diferencial_flujo(self, ec_str, condicion_inicial, grilla, metodo='rk45',
+                                   rtol=1e-6, atol=1e-9):
+        """
+        Integra numéricamente una EDO (o sistema, o de orden superior) y
+        genera (x, Y) a medida que se alcanza cada punto de la grilla.
+        condicion_inicial es (x0, Y0) con Y0 = [y(x0), y'(x0), ...], o un
+        arreglo (B, n) para integrar B condiciones iniciales a la vez.
+        """
+        x0, y0 = condicion_inicial
+        sistema = self._sistema_edo(ec_str)
+        y0 = np.atleast_1d(np.asarray(y0, dtype=float))
+        return edo_numerica.integrar(sistema, x0, y0, grilla, metodo, rtol, atol)
+    
+    @_operacion
+    def ecuacion_diferencial_numerica(self, ec_str, condicion_inicial, grilla, metodo='rk45',
+                                      rtol=1e-6, atol=1e-9):
+        """Resuelve numéricamente un problema de valor inicial sobre una grilla de x"""
+        try:
+            sistema = self._sistema_edo(ec_str)
+            xs, ys = zip(*self.ecuacion_diferencial_flujo(ec_str, condicion_inicial, grilla,
+                                                          metodo, rtol, atol))
+            xs, ys = np.array(xs), np.stack(ys)
+            
+            def texto():
+                resultado = f"Solución numérica ({metodo}) con {', '.join(sistema.estado)}:\n"
+                if ys.ndim == 3:
+                    return resultado + f"{ys.shape[1]} condiciones iniciales en {len(xs)} puntos"
+                for x_val, fila in zip(xs, ys):
+                    valores = ", ".join(f"{nombre} = {v:.6g}" for nombre, v in zip(sistema.estado, fila))
+                    resultado += f"x = {x_val:.6g}: {valores}\n"
+                return resultado
+            
+            return Resultado((xs, ys), texto, sistema.lado_derecho, estado=sistema.estado, metodo=metodo)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
     
     # ============= FUNCIONES MULTIVARIABLES =============
     
+    def _derivada(self, expr, *variables):
+        """
+        Derivada parcial de expr respecto de las variables, en orden. Se
+        arma sobre la derivada de un orden menos, que también queda
+        cacheada: gradiente, jacobiano y hessiana comparten las cuentas.
+        """
+        if not variables:
+            return expr
+        # Con derivadas continuas el orden no importa (Schwarz): se usa uno solo
+        variables = tuple(sorted(variables, key=lambda v: v.name))
+        return self._memo('derivada', (expr, variables), lambda: sp.diff(
+            self._derivada(expr, *variables[:-1]), variables[-1]), limitado=False)
+    
+    def _variables(self, exprs, variables=None):
+        """
+        Variables de derivación: las indicadas o, si no, las libres de las
+        expresiones ordenadas por nombre (x, y si no aparece ninguna otra)
+        """
+        if variables is not None:
+            return [sp.Symbol(v) if isinstance(v, str) else v for v in variables]
+        simbolos = set().union(*(e.free_symbols for e in exprs))
+        if simbolos <= {self.x, self.y}:
+            return [self.x, self.y]
+        return sorted(simbolos, key=lambda s: s.name)
+    
+    def _evaluar_en(self, exprs, variables, puntos):
+        """
+        Evalúa una lista (o matriz) de expresiones en los puntos, arreglo de
+        forma (N, n), con una sola llamada a la función compilada con sp.cse
+        """
+        puntos = np.atleast_2d(np.asarray(puntos, dtype=float))
+        if puntos.shape[-1] != len(variables):
+            raise ValueError(f"Cada punto debe tener {len(variables)} coordenadas "
+                             f"({', '.join(map(str, variables))})")
+        return self._compilar(exprs, *variables)(*puntos.T)
+    
+    def _texto_evaluado(self, valores, puntos, maximo=10):
+        """Líneas con el valor en cada punto (sólo la forma si son muchos)"""
+        if len(valores) > maximo:
+            return f"\nEvaluado en {len(valores)} puntos: arreglo de forma {valores.shape}"
+        resultado = ""
+        for punto, valor in zip(np.atleast_2d(puntos), valores):
+            resultado += f"\n  en {tuple(float(c) for c in punto)}: {np.array2string(valor, precision=6)}"
+        return resultado
+    
+    @_operacion
     def derivada_parcial(self, funcion_str, variable='x'):
-        """Calcula derivada parcial respecto a una variable"""
+        """
+        Calcula derivada parcial respecto a una variable; con una lista de
+        variables, la derivada parcial sucesiva (mixta) respecto de todas
+        """
         try:
-            f = sp.sympify(funcion_str)
-            var = self.x if variable == 'x' else self.y if variable == 'y' else self.z
-            derivada = sp.diff(f, var)
-            return f"∂f/∂{variable} = {derivada}"
+            f = self._sympify(funcion_str)
+            nombres = [variable] if isinstance(variable, str) else list(variable)
+            variables = [sp.Symbol(v) for v in nombres]
+            derivada = self._derivada(f, *variables)
+            orden = f"^{len(variables)}" if len(variables) > 1 else ""
+            denominador = "".join(f"∂{v}" for v in variables)
+            return Resultado(derivada, lambda: f"∂{orden}f/{denominador} = {derivada}", f,
+                             variable=variables[0] if len(variables) == 1 else tuple(variables))
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
     
-    def gradiente(self, funcion_str):
-        """Calcula el gradiente de una función"""
+    @_operacion
+    def gradiente(self, funcion_str, variables=None, puntos=None):
+        """
+        Calcula el gradiente de una función de n variables (x e y si no se
+        indican otras). Con puntos, arreglo (N, n), también lo evalúa en
+        todos ellos de una vez.
+        """
         try:
-            f = sp.sympify(funcion_str)
-            grad_x = sp.diff(f, self.x)
-            grad_y = sp.diff(f, self.y)
-            return f"∇f = ({grad_x}, {grad_y})"
+            f = self._sympify(funcion_str)
+            variables = self._variables([f], variables)
+            grad = tuple(self._derivada(f, v) for v in variables)
+            valores = self._evaluar_en(list(grad), variables, puntos) if puntos is not None else None
+            
+            def texto():
+                resultado = f"∇f = ({', '.join(map(str, grad))})"
+                return resultado + (self._texto_evaluado(valores, puntos) if valores is not None else "")
+            
+            return Resultado(grad, texto, f, variables=tuple(variables), valores=valores)
+        except Exception as e:
+            return Resultado(error=e)
+    
+    @_operacion
+    def jacobiano(self, funciones, variables=None, puntos=None):
+        """
+        Matriz jacobiana de una función vectorial (lista de componentes, o
+        un texto con las componentes separadas por ';'). Con puntos la
+        evalúa en todos ellos de una vez: arreglo (N, m, n).
+        """
+        try:
+            if isinstance(funciones, str):
+                funciones = [c.strip() for c in funciones.split(';') if c.strip()]
+            componentes = [self._sympify(c) for c in funciones]
+            variables = self._variables(componentes, variables)
+            filas = [[self._derivada(c, v) for v in variables] for c in componentes]
+            matriz = sp.Matrix(filas)
+            valores = self._evaluar_en(filas, variables, puntos) if puntos is not None else None
+            
+            def texto():
+                resultado = f"J(f) respecto de ({', '.join(map(str, variables))}) = {matriz.tolist()}"
+                return resultado + (self._texto_evaluado(valores, puntos) if valores is not None else "")
+            
+            return Resultado(matriz, texto, sp.Matrix(componentes), variables=tuple(variables),
+                             valores=valores)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
     
-    def puntos_criticos(self, funcion_str):
+    @_operacion
+    def hessiana(self, funcion_str, variables=None, puntos=None):
+        """
+        Matriz hessiana de una función de n variables. Con puntos la evalúa
+        en todos ellos con una sola llamada: arreglo (N, n, n).
+        """
+        try:
+            f = self._sympify(funcion_str)
+            variables = self._variables([f], variables)
+            filas = [[self._derivada(f, u, v) for v in variables] for u in variables]
+            matriz = sp.Matrix(filas)
+            valores = self._evaluar_en(filas, variables, puntos) if puntos is not None else None
+            
+            def texto():
+                resultado = f"H(f) respecto de ({', '.join(map(str, variables))}) = {matriz.tolist()}"
+                return resultado + (self._texto_evaluado(valores, puntos) if valores is not None else "")
+            
+            return Resultado(matriz, texto, f, variables=tuple(variables), valores=valores)
+        except Exception as e:
+            return Resultado(error=e)
+    
+    def _limites_multiples(self, limites):
+        """
+        Convierte los límites [(variable, inferior, superior), ...] a SymPy
+        y verifica que cada uno dependa sólo de las variables exteriores
+        """
+        convertidos = []
+        for variable, inferior, superior in limites:
+            a, b = (self._sympify(l) for l in (inferior, superior))
+            convertidos.append((sp.Symbol(str(variable)), a, b))
+        for i, (variable, a, b) in enumerate(convertidos):
+            exteriores = {v for v, _, _ in convertidos[i + 1:]}
+            if (a.free_symbols | b.free_symbols) - exteriores:
+                if not exteriores:
+                    raise ValueError(f"Los límites de {variable}, la variable exterior, deben ser constantes")
+                raise ValueError(f"Los límites de {variable} sólo pueden depender de "
+                                 f"las variables exteriores: {', '.join(sorted(map(str, exteriores)))}")
+        return convertidos
+    
+    @_operacion
+    def integral_multiple(self, funcion_str, limites, modo=None, metodo='cubatura', puntos=2**20):
+        """
+        Calcula una integral doble o triple iterada. limites es una lista de
+        (variable, inferior, superior) de la integral interior a la exterior,
+        como en sp.integrate; los límites pueden depender de las variables
+        exteriores (regiones de tipo I y II).
+        En modo numérico metodo es 'cubatura' (Gauss-Legendre) o 'qmc'
+        (cuasi-Monte Carlo), con unos `puntos` puntos evaluados por bloques.
+        """
+        try:
+            f = self._sympify(funcion_str)
+            limites_sym = self._limites_multiples(limites)
+            clave = tuple(tuple(map(str, limite)) for limite in limites)
+            
+            signos = "∫" * len(limites_sym)
+            diferenciales = " ".join(f"d{v}" for v, _, _ in limites_sym)
+            rangos = ", ".join(f"{v} ∈ [{a}, {b}]" for v, a, b in limites_sym)
+            
+            resultado, nota = self._resolver(modo, lambda: self._memo(
+                'integral_multiple', (funcion_str, clave), lambda: sp.integrate(f, *limites_sym)))
+            if resultado is not None:
+                return Resultado(resultado, lambda: f"{signos} {f} {diferenciales} ({rangos}) = "
+                                                    f"{resultado} = {float(resultado):.6f}",
+                                 f, limites=limites_sym)
+            
+            if metodo not in cubatura.METODOS:
+                raise ValueError(f"Método de integración múltiple desconocido: {metodo}")
+            valor, error = self._memo('integral_multiple_numerica', (funcion_str, clave, metodo, puntos),
+                                      lambda: cubatura.integrar(f, limites_sym, metodo, puntos),
+                                      limitado=False)
+            return Resultado(valor, lambda: f"{signos} {f} {diferenciales} ({rangos}) ≈ {valor:.6f} "
+                                            f"({nota}, {metodo}, error ≈ {error:.1e})",
+                             f, limites=limites_sym, nota=nota, metodo=metodo, error_estimado=error)
+        except Exception as e:
+            return Resultado(error=e)
+    
+    def _puntos_criticos_numericos(self, f, variables, dominio, semillas_por_eje):
+        """
+        Busca puntos críticos con Levenberg-Marquardt desde una grilla de
+        semillas y los clasifica todos juntos con la hessiana compilada.
+        Devuelve (raices, tipos) como arreglos de NumPy.
+        """
+        gradiente = [self._derivada(f, v) for v in variables]
+        hessiana = [[self._derivada(f, u, v) for v in variables] for u in variables]
+        F = self._compilar(gradiente, *variables)
+        H = self._compilar(hessiana, *variables)
+        
+        semillas = motor_numerico.grilla_semillas(dominio, semillas_por_eje, len(variables))
+        X, convergio = motor_numerico.resolver_sistema(F, H, semillas)
+        lo, hi = dominio
+        dentro = convergio & np.all((X >= lo) & (X <= hi), axis=1)
+        raices = motor_numerico.deduplicar(X[dentro])
+        raices = motor_numerico.limpiar_ceros(raices)
+        if len(raices) == 0:
+            return raices, np.array([])
+        return raices, motor_numerico.clasificar_hessianas(H(*raices.T))
+    
+    @_operacion
+    def puntos_criticos(self, funcion_str, modo=None, dominio=(-10, 10), semillas_por_eje=25):
         """Encuentra puntos críticos de una función de dos variables"""
         try:
-            f = sp.sympify(funcion_str)
+            f = self._sympify(funcion_str)
             
             # Derivadas parciales
-            fx = sp.diff(f, self.x)
-            fy = sp.diff(f, self.y)
+            fx = self._derivada(f, self.x)
+            fy = self._derivada(f, self.y)
             
             # Resolver sistema fx = 0, fy = 0
-            puntos = sp.solve([fx, fy], [self.x, self.y])
+            puntos, nota = self._resolver(modo, lambda: self._memo(
+                'puntos_criticos', (funcion_str,),
+                lambda: sp.solve([fx, fy], [self.x, self.y])))
+            
+            if puntos is None:
+                raices, tipos = self._puntos_criticos_numericos(
+                    f, (self.x, self.y), dominio, semillas_por_eje)
+                if len(raices) == 0:
+                    return Resultado([], lambda: f"No se encontraron puntos críticos en {dominio} ({nota})",
+                                     f, nota=nota)
+                clasificados = [(float(xv), float(yv), str(tipo)) for (xv, yv), tipo in zip(raices, tipos)]
+                
+                def texto():
+                    resultado = f"Puntos críticos de f = {f} ({nota}):\n"
+                    for x_val, y_val, tipo in clasificados:
+                        resultado += f"({x_val:.6g}, {y_val:.6g}): {tipo}\n"
+                    return resultado
+                
+                return Resultado(clasificados, texto, f, nota=nota, dominio=dominio)
             
             if not puntos:
-                return "No se encontraron puntos críticos"
+                return Resultado([], lambda: "No se encontraron puntos críticos", f)
             
             # Clasificar puntos usando el criterio de la segunda derivada
-            fxx = sp.diff(fx, self.x)
-            fyy = sp.diff(fy, self.y)
-            fxy = sp.diff(fx, self.y)
+            fxx = self._derivada(f, self.x, self.x)
+            fyy = self._derivada(f, self.y, self.y)
+            fxy = self._derivada(f, self.x, self.y)
             
-            resultado = f"Puntos críticos de f = {f}:\n"
+            clasificados = []
             for punto in puntos if isinstance(puntos, list) else [puntos]:
                 x_val = punto[self.x] if isinstance(punto, dict) else punto[0]
                 y_val = punto[self.y] if isinstance(punto, dict) else punto[1]
                 
-                # Evaluar en el punto
-                D = fxx.subs([(self.x, x_val), (self.y, y_val)]) * \
-                    fyy.subs([(self.x, x_val), (self.y, y_val)]) - \
-                    fxy.subs([(self.x, x_val), (self.y, y_val)])**2
+                # Evaluar cada derivada segunda una sola vez en el punto
+                valores = {self.x: x_val, self.y: y_val}
+                hxx = fxx.subs(valores)
+                D = hxx * fyy.subs(valores) - fxy.subs(valores)**2
                 
                 if D > 0:
-                    if fxx.subs([(self.x, x_val), (self.y, y_val)]) > 0:
+                    if hxx > 0:
                         tipo = "Mínimo"
                     else:
                         tipo = "Máximo"
@@ -168,132 +776,584 @@ class CalculadoraAnalisisII:
                 else:
                     tipo = "No concluyente"
                 
-                resultado += f"({x_val}, {y_val}): {tipo}\n"
+                clasificados.append((x_val, y_val, tipo))
+            
+            def texto():
+                resultado = f"Puntos críticos de f = {f}:\n"
+                for x_val, y_val, tipo in clasificados:
+                    resultado += f"({x_val}, {y_val}): {tipo}\n"
+                return resultado
             
-            return resultado
+            return Resultado(clasificados, texto, f)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
+    
+    def _lagrange_numerico(self, f, restricciones, variables, multiplicadores, ecuaciones,
+                           dominio, semillas_por_eje):
+        """
+        Resuelve el sistema de Lagrange (KKT con igualdades) con
+        Levenberg-Marquardt desde una grilla de semillas. Los multiplicadores
+        iniciales de cada semilla salen de ∇f ≈ Σ λi ∇gi por mínimos cuadrados.
+        Devuelve un arreglo (k, n + m) con las soluciones distintas.
+        """
+        incognitas = list(variables) + list(multiplicadores)
+        n = len(variables)
+        F = self._compilar(ecuaciones, *incognitas)
+        J = self._compilar([[sp.diff(e, u) for u in incognitas] for e in ecuaciones], *incognitas)
+        grad_f = self._compilar([self._derivada(f, v) for v in variables], *variables)
+        jac_g = self._compilar([[self._derivada(g, v) for v in variables] for g in restricciones], *variables)
+        
+        por_eje = semillas_por_eje or max(3, int(round(4096 ** (1 / n))))
+        semillas = motor_numerico.grilla_semillas(dominio, por_eje, n)
+        with np.errstate(all='ignore'):
+            jg_t = np.nan_to_num(np.swapaxes(jac_g(*semillas.T), -1, -2))
+            lam0 = np.einsum('skn,sn->sk', np.linalg.pinv(jg_t), np.nan_to_num(grad_f(*semillas.T)))
+        
+        Z, convergio = motor_numerico.resolver_sistema(F, J, np.hstack([semillas, lam0]))
+        lo, hi = dominio
+        dentro = convergio & np.all((Z[:, :n] >= lo) & (Z[:, :n] <= hi), axis=1)
+        soluciones = motor_numerico.deduplicar(Z[dentro])
+        soluciones = motor_numerico.limpiar_ceros(soluciones)
+        return soluciones
     
-    def lagrange(self, funcion_str, restriccion_str):
-        """Método de multiplicadores de Lagrange"""
+    @_operacion
+    def lagrange(self, funcion_str, restriccion_str, variables=None, modo=None,
+                 dominio=(-10, 10), semillas_por_eje=None):
+        """
+        Método de multiplicadores de Lagrange.
+        restriccion_str puede ser una restricción g = 0 o una lista de ellas;
+        las variables se deducen de f y g si no se indican.
+        """
         try:
-            f = sp.sympify(funcion_str)
-            g = sp.sympify(restriccion_str)
-            lam = sp.Symbol('lambda')
+            f = self._sympify(funcion_str)
+            restricciones_str = [restriccion_str] if isinstance(restriccion_str, str) else list(restriccion_str)
+            restricciones = [self._sympify(g) for g in restricciones_str]
+            if variables is None:
+                simbolos = f.free_symbols.union(*(g.free_symbols for g in restricciones))
+                variables = sorted(simbolos, key=lambda s: s.name)
+            else:
+                variables = [sp.Symbol(v) if isinstance(v, str) else v for v in variables]
+            if len(restricciones) == 1:
+                multiplicadores = [sp.Symbol('lambda')]
+            else:
+                multiplicadores = [sp.Symbol(f'lambda{i}') for i in range(1, len(restricciones) + 1)]
             
             # Formar el Lagrangiano
-            L = f - lam * g
+            L = f - sum(lam * g for lam, g in zip(multiplicadores, restricciones))
             
-            # Derivadas parciales
-            Lx = sp.diff(L, self.x)
-            Ly = sp.diff(L, self.y)
-            Llam = sp.diff(L, lam)
+            # Derivadas parciales respecto de las variables y los multiplicadores
+            ecuaciones = [sp.diff(L, u) for u in variables + multiplicadores]
             
             # Resolver sistema
-            soluciones = sp.solve([Lx, Ly, Llam], [self.x, self.y, lam])
+            soluciones, nota = self._resolver(modo, lambda: self._memo(
+                'lagrange_kkt', (funcion_str, restricciones_str, variables),
+                lambda: sp.solve(ecuaciones, variables + multiplicadores, dict=True)))
+            
+            sujeto_a = ", ".join(f"{g} = 0" for g in restricciones)
+            if soluciones is None:
+                numericas = self._lagrange_numerico(f, restricciones, variables, multiplicadores,
+                                                    ecuaciones, dominio, semillas_por_eje)
+                n = len(variables)
+                objetivo = self._compilar(f, *variables)
+                valores_f = objetivo(*numericas[:, :n].T) if len(numericas) else np.array([])
+                puntos = [(dict(zip(variables, map(float, z[:n]))),
+                           dict(zip(multiplicadores, map(float, z[n:]))), float(valor))
+                          for z, valor in sorted(zip(numericas, valores_f), key=lambda par: -par[1])]
+                
+                def texto():
+                    resultado = f"Optimización con restricción ({nota}):\n"
+                    resultado += f"f = {f}, sujeto a {sujeto_a}\n"
+                    if not puntos:
+                        return resultado + f"No se encontraron puntos críticos en {dominio}"
+                    for k, (punto, _, valor) in enumerate(puntos):
+                        coordenadas = ", ".join(f"{v}={c:.6g}" for v, c in punto.items())
+                        marca = " ← máximo" if k == 0 else " ← mínimo" if k == len(puntos) - 1 else ""
+                        resultado += f"  ({coordenadas}): f = {valor:.6g}{marca}\n"
+                    return resultado
+                
+                return Resultado(puntos, texto, f, restricciones=restricciones, nota=nota)
             
-            resultado = f"Optimización con restricción:\n"
-            resultado += f"f = {f}, sujeto a {g} = 0\n"
-            resultado += f"Puntos críticos: {soluciones}"
+            puntos = [({v: s[v] for v in variables if v in s},
+                       {lam: s[lam] for lam in multiplicadores if lam in s},
+                       f.subs(s)) for s in soluciones]
             
-            return resultado
+            def texto():
+                resultado = f"Optimización con restricción:\n"
+                resultado += f"f = {f}, sujeto a {sujeto_a}\n"
+                resultado += f"Puntos críticos: {soluciones}"
+                for punto, _, valor in puntos:
+                    coordenadas = ", ".join(f"{v}={c}" for v, c in punto.items())
+                    resultado += f"\n  ({coordenadas}): f = {valor}"
+                return resultado
+            
+            return Resultado(puntos, texto, f, restricciones=restricciones)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
     
     # ============= SERIES Y SUCESIONES =============
     
+    @_operacion
     def limite_sucesion(self, an_str, n_var='n'):
         """Calcula el límite de una sucesión"""
         try:
             n = sp.Symbol(n_var)
-            an = sp.sympify(an_str)
-            lim = sp.limit(an, n, sp.oo)
+            an = self._sympify(an_str)
+            lim = self._memo('limite_sucesion', (an_str, n_var),
+                             lambda: sp.limit(an, n, sp.oo))
             
             if lim.is_finite:
-                return f"lim(n→∞) {an} = {lim} (Converge)"
+                return Resultado(lim, lambda: f"lim(n→∞) {an} = {lim} (Converge)", an, converge=True)
             else:
-                return f"lim(n→∞) {an} = {lim} (Diverge)"
+                return Resultado(lim, lambda: f"lim(n→∞) {an} = {lim} (Diverge)", an, converge=False)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
     
+    @_operacion
     def suma_serie_geometrica(self, a, r, n_terminos=None):
         """Calcula la suma de una serie geométrica"""
         try:
             if n_terminos:
                 # Serie finita
                 suma = a * (1 - r**n_terminos) / (1 - r)
-                return f"Suma de {n_terminos} términos: {suma}"
+                return Resultado(suma, lambda: f"Suma de {n_terminos} términos: {suma}",
+                                 a=a, r=r, n_terminos=n_terminos)
             else:
                 # Serie infinita
                 if abs(r) < 1:
                     suma = a / (1 - r)
-                    return f"Suma infinita: {suma} (|r| < 1, converge)"
+                    return Resultado(suma, lambda: f"Suma infinita: {suma} (|r| < 1, converge)",
+                                     a=a, r=r, converge=True)
                 else:
-                    return "Serie divergente (|r| ≥ 1)"
+                    return Resultado(plantilla=lambda: "Serie divergente (|r| ≥ 1)",
+                                     a=a, r=r, converge=False)
+        except Exception as e:
+            return Resultado(error=e)
+    
+    @_operacion
+    def analizar_serie(self, an_str, n_var='n', desde=1, terminos=4096, metodo='auto'):
+        """
+        Analiza la serie Σ a_n desde n = desde: aplica los criterios de
+        convergencia (cada uno con el tiempo límite de la calculadora, o
+        TIEMPO_CRITERIO si no tiene) y, si no diverge, estima la suma con
+        términos vectorizados y aceleración.
+        metodo: 'auto', 'richardson', 'wynn', 'euler_maclaurin' o 'ninguno'
+        """
+        try:
+            an, n = convergencia.preparar(self._sympify(an_str), sp.Symbol(n_var))
+            
+            criterios = {}
+            for nombre, criterio in convergencia.CRITERIOS.items():
+                try:
+                    criterios[nombre] = self._memo(
+                        'criterio_' + nombre, (an_str, n_var), lambda: criterio(an, n),
+                        segundos=self.tiempo_limite or TIEMPO_CRITERIO)
+                except TiempoAgotado as e:
+                    criterios[nombre] = (convergencia.NO_CONCLUYE, str(e))
+                except Exception as e:
+                    criterios[nombre] = (convergencia.NO_CONCLUYE, f"no aplica ({e or type(e).__name__})")
+            
+            veredictos = {v for v, _ in criterios.values()} - {convergencia.NO_CONCLUYE}
+            veredicto = veredictos.pop() if len(veredictos) == 1 else convergencia.NO_CONCLUYE
+            
+            suma = None
+            if veredicto != convergencia.DIVERGE:
+                suma = self._memo('suma_serie', (an_str, n_var, desde, terminos, metodo),
+                                  lambda: convergencia.sumar(an, n, desde, terminos, metodo),
+                                  limitado=False)
+                if suma['metodo'] == 'diverge' and veredicto == convergencia.NO_CONCLUYE:
+                    veredicto = convergencia.DIVERGE
+            valor = suma['valor'] if suma and veredicto != convergencia.DIVERGE else None
+            
+            def texto():
+                resultado = f"Serie Σ {an} desde {n} = {desde}:\n"
+                for nombre, (v, detalle) in criterios.items():
+                    resultado += f"  Criterio {nombre}: {v} ({detalle})\n"
+                resultado += f"Veredicto: {veredicto}"
+                if valor is not None:
+                    resultado += (f"\nSuma ≈ {valor:.15g} ± {suma['error']:.1e} "
+                                  f"({suma['metodo']}, {terminos} términos)")
+                return resultado
+            
+            return Resultado(valor, texto, an, criterios=criterios, veredicto=veredicto,
+                             error_estimado=suma['error'] if valor is not None else None,
+                             metodo=suma['metodo'] if suma else None)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
+    
+    def _serie_taylor(self, funcion_str, punto):
+        """
+        Desarrollo de Taylor incremental de la función en el punto: se
+        guarda uno por (función, punto) y sólo calcula los coeficientes
+        que todavía no se pidieron
+        """
+        f = self._sympify(funcion_str)
+        return self._memo('taylor', (funcion_str, punto),
+                          lambda: taylor.SerieTaylor(f, self.x, punto), limitado=False)
     
+    def _polinomio_taylor(self, funcion_str, punto, orden):
+        try:
+            return self._serie_taylor(funcion_str, punto).polinomio(orden)
+        except taylor.SinSerieTaylor:
+            # Polos y raíces: sp.series da el desarrollo de Laurent o Puiseux
+            f = self._sympify(funcion_str)
+            serie = self._memo('serie_taylor', (funcion_str, punto, orden),
+                               lambda: sp.series(f, self.x, punto, orden + 1))
+            return serie.removeO()
+    
+    @_operacion
     def serie_taylor(self, funcion_str, punto=0, orden=5):
         """Calcula la serie de Taylor/Maclaurin"""
         try:
-            f = sp.sympify(funcion_str)
-            serie = sp.series(f, self.x, punto, orden + 1)
-            return f"Serie de Taylor en x={punto}: {serie.removeO()}"
+            f = self._sympify(funcion_str)
+            polinomio = self._polinomio_taylor(funcion_str, punto, orden)
+            return Resultado(polinomio, lambda: f"Serie de Taylor en x={punto}: {polinomio}", f,
+                             punto=punto, orden=orden)
+        except Exception as e:
+            return Resultado(error=e)
+    
+    @_operacion
+    def convergencia_taylor(self, funcion_str, xs, punto=0, orden=10):
+        """
+        Evalúa las sumas parciales de Taylor de orden 0 a orden sobre los x
+        dados, junto con el error real y la cota de Lagrange de cada una
+        """
+        try:
+            f = self._sympify(funcion_str)
+            serie = self._serie_taylor(funcion_str, punto)
+            xs = np.asarray(xs, dtype=float)
+            sumas = serie.sumas_parciales(xs, orden)
+            errores = serie.errores(xs, orden)
+            cotas = np.stack([serie.cota_error(xs, n) for n in range(orden + 1)])
+            
+            def texto():
+                resultado = f"Convergencia de Taylor de {f} en x={punto} sobre [{xs.min():g}, {xs.max():g}]:\n"
+                for n in range(orden + 1):
+                    resultado += (f"Orden {n}: error máximo = {np.nanmax(errores[n]):.3e}, "
+                                  f"cota de Lagrange = {np.nanmax(cotas[n]):.3e}\n")
+                return resultado
+            
+            return Resultado((sumas, errores, cotas), texto, f, punto=punto, orden=orden)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
     
     # ============= APLICACIONES ECONÓMICAS =============
     
-    def excedente_consumidor(self, demanda_str, q0=None, p0=None):
+    def _punto_mercado(self, curva, q0, p0):
+        """Completa el par (q0, p0) sobre la curva de demanda u oferta"""
+        if q0 is not None:
+            return q0, curva.subs(self.q, q0)
+        return sp.solve(curva - p0, self.q)[0], p0
+    
+    @_operacion
+    def excedente_consumidor(self, demanda_str, q0=None, p0=None, modo=None):
         """Calcula el excedente del consumidor"""
         try:
-            demanda = sp.sympify(demanda_str)
+            demanda = self._sympify(demanda_str)
             
-            if q0 is not None:
-                p0 = demanda.subs(self.q, q0)
-                p_max = demanda.subs(self.q, 0)
-                excedente = sp.integrate(demanda - p0, (self.q, 0, q0))
-            elif p0 is not None:
-                q0 = sp.solve(demanda - p0, self.q)[0]
-                excedente = sp.integrate(demanda - p0, (self.q, 0, q0))
-            else:
-                return "Debe especificar q0 o p0"
+            if q0 is None and p0 is None:
+                return Resultado(plantilla=lambda: "Debe especificar q0 o p0",
+                                 error="Debe especificar q0 o p0")
             
-            return f"Excedente del consumidor: {excedente} = {float(excedente):.2f}"
+            q0, p0 = self._memo('punto_mercado', (demanda_str, q0, p0),
+                                lambda: self._punto_mercado(demanda, q0, p0))
+            integrando = demanda - p0
+            excedente, nota = self._resolver(modo, lambda: self._integrar(
+                'excedente_consumidor', (demanda_str, q0, p0), integrando, self.q, 0, q0))
+            if excedente is None:
+                valor, _ = self._integrar_numerico(integrando, self.q, 0.0, float(q0))
+                return Resultado(valor, lambda: f"Excedente del consumidor ≈ {valor:.2f} ({nota})",
+                                 demanda, q0=q0, p0=p0, nota=nota)
+            
+            return Resultado(excedente, lambda: f"Excedente del consumidor: {excedente} = {float(excedente):.2f}",
+                             demanda, q0=q0, p0=p0)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
     
-    def excedente_productor(self, oferta_str, q0=None, p0=None):
+    @_operacion
+    def excedente_productor(self, oferta_str, q0=None, p0=None, modo=None):
         """Calcula el excedente del productor"""
         try:
-            oferta = sp.sympify(oferta_str)
+            oferta = self._sympify(oferta_str)
+            
+            if q0 is None and p0 is None:
+                return Resultado(plantilla=lambda: "Debe especificar q0 o p0",
+                                 error="Debe especificar q0 o p0")
+            
+            q0, p0 = self._memo('punto_mercado', (oferta_str, q0, p0),
+                                lambda: self._punto_mercado(oferta, q0, p0))
+            integrando = p0 - oferta
+            excedente, nota = self._resolver(modo, lambda: self._integrar(
+                'excedente_productor', (oferta_str, q0, p0), integrando, self.q, 0, q0))
+            if excedente is None:
+                valor, _ = self._integrar_numerico(integrando, self.q, 0.0, float(q0))
+                return Resultado(valor, lambda: f"Excedente del productor ≈ {valor:.2f} ({nota})",
+                                 oferta, q0=q0, p0=p0, nota=nota)
+            
+            return Resultado(excedente, lambda: f"Excedente del productor: {excedente} = {float(excedente):.2f}",
+                             oferta, q0=q0, p0=p0)
+        except Exception as e:
+            return Resultado(error=e)
+    
+    def _primitiva_curva(self, curva_str, modo=None):
+        """
+        G(q) = ∫[0, q] curva, compilada y vectorizada. La primitiva
+        simbólica se calcula una sola vez; si no sale (o en modo numérico)
+        G integra con Gauss-Legendre todos los q del arreglo a la vez.
+        Devuelve (G, nota).
+        """
+        curva = self._sympify(curva_str)
+        primitiva, nota = self._resolver(modo, lambda: self._integrar(
+            'primitiva_curva', (curva_str,), curva, self.q))
+        if primitiva is not None:
+            inicial = primitiva.subs(self.q, 0)
+            if not inicial.is_finite:
+                inicial = sp.limit(primitiva, self.q, 0, '+')
+            return self._compilar(primitiva - inicial, self.q), None
+        f = self._compilar(curva, self.q)
+        return (lambda q0: motor_numerico.integrar(f, np.zeros_like(q0), q0)[0]), nota
+    
+    def _cantidades(self, curva_str, precios, modo=None):
+        """
+        Cantidades q ≥ 0 con curva(q) = p para un arreglo de precios: con la
+        inversa simbólica (la menor rama no negativa) o, si no la hay,
+        invirtiendo numéricamente la curva. nan donde no hay solución.
+        """
+        curva = self._sympify(curva_str)
+        precios = np.asarray(precios, dtype=float)
+        try:
+            ramas, _ = self._resolver(modo, lambda: self._memo(
+                'inversa_curva', (curva_str,), lambda: sp.solve(curva - self.p, self.q)))
+        except Exception:
+            ramas = None
+        ramas = [r for r in ramas or [] if not r.has(sp.I)]
+        if not ramas:
+            return motor_numerico.invertir(self._compilar(curva, self.q), precios)
+        with np.errstate(all='ignore'):
+            candidatas = np.stack([self._compilar(r, self.p)(precios) for r in ramas])
+        candidatas = np.where(np.isfinite(candidatas) & (candidatas >= 0), candidatas, np.inf)
+        cantidades = candidatas.min(axis=0)
+        return np.where(np.isfinite(cantidades), cantidades, np.nan)
+    
+    def _excedentes_lote(self, curva_str, q0, p0, modo):
+        """
+        Completa los pares (q0, p0) sobre la curva y devuelve
+        (q0, p0, G(q0) - p0 q0, nota) como arreglos
+        """
+        if q0 is None and p0 is None:
+            raise ValueError("Debe especificar q0 o p0")
+        if q0 is None:
+            p0 = np.asarray(p0, dtype=float)
+            q0 = self._cantidades(curva_str, p0, modo)
+        elif p0 is None:
+            q0 = np.asarray(q0, dtype=float)
+            p0 = self._compilar(self._sympify(curva_str), self.q)(q0)
+        else:
+            q0, p0 = np.broadcast_arrays(np.asarray(q0, dtype=float), np.asarray(p0, dtype=float))
+        G, nota = self._primitiva_curva(curva_str, modo)
+        validos = np.isfinite(q0)
+        integrales = G(np.where(validos, q0, 0.0))
+        return q0, p0, np.where(validos, integrales - p0 * q0, np.nan), nota
+    
+    def _texto_lote(self, titulo, valores, nota=None):
+        resumen = f"{titulo} en {valores.size} puntos"
+        if np.isfinite(valores).any():
+            resumen += f": mínimo {np.nanmin(valores):.2f}, máximo {np.nanmax(valores):.2f}"
+        faltantes = np.count_nonzero(~np.isfinite(valores))
+        if faltantes:
+            resumen += f" ({faltantes} sin solución)"
+        return resumen + (f" ({nota})" if nota else "")
+    
+    @_operacion
+    def excedente_consumidor_lote(self, demanda_str, q0=None, p0=None, modo=None):
+        """
+        Excedente del consumidor sobre arreglos (grillas) de q0 y/o p0. Con
+        uno solo el otro sale de la demanda; con los dos se usan tal cual,
+        elemento a elemento. La demanda se integra una sola vez.
+        """
+        try:
+            q0, p0, valores, nota = self._excedentes_lote(demanda_str, q0, p0, modo)
+            return Resultado(valores, lambda: self._texto_lote("Excedente del consumidor", valores, nota),
+                             self._sympify(demanda_str), q0=q0, p0=p0, nota=nota)
+        except Exception as e:
+            return Resultado(error=e)
+    
+    @_operacion
+    def excedente_productor_lote(self, oferta_str, q0=None, p0=None, modo=None):
+        """
+        Excedente del productor sobre arreglos (grillas) de q0 y/o p0, con
+        los mismos criterios que excedente_consumidor_lote
+        """
+        try:
+            q0, p0, valores, nota = self._excedentes_lote(oferta_str, q0, p0, modo)
+            valores = -valores
+            return Resultado(valores, lambda: self._texto_lote("Excedente del productor", valores, nota),
+                             self._sympify(oferta_str), q0=q0, p0=p0, nota=nota)
+        except Exception as e:
+            return Resultado(error=e)
+    
+    @_operacion
+    def equilibrio_mercado(self, demanda_str, oferta_str, modo=None, dominio=(0, 1e4)):
+        """
+        Equilibrio entre demanda y oferta: la cantidad q* ≥ 0 con D(q*) = S(q*)
+        (la menor, si hay varias), su precio y los excedentes en ese punto
+        """
+        try:
+            demanda = self._sympify(demanda_str)
+            oferta = self._sympify(oferta_str)
+            soluciones, nota = self._resolver(modo, lambda: self._memo(
+                'equilibrio_mercado', (demanda_str, oferta_str),
+                lambda: sp.solve(demanda - oferta, self.q)))
+            if soluciones is not None:
+                soluciones = sorted((s for s in soluciones if s.is_real and s.is_nonnegative), key=float)
+            if not soluciones:
+                # Sin solución simbólica: cambios de signo de D - S en el dominio
+                nota = nota or "aproximación numérica: sin solución simbólica"
+                soluciones = [float(r) for r in motor_numerico.raices(
+                    self._compilar(demanda - oferta, self.q), *dominio) if r >= 0]
+            if not soluciones:
+                mensaje = "No hay equilibrio con q ≥ 0"
+                return Resultado(plantilla=lambda: mensaje, error=mensaje)
             
-            if q0 is not None:
-                p0 = oferta.subs(self.q, q0)
-                excedente = sp.integrate(p0 - oferta, (self.q, 0, q0))
-            elif p0 is not None:
-                q0 = sp.solve(oferta - p0, self.q)[0]
-                excedente = sp.integrate(p0 - oferta, (self.q, 0, q0))
+            q_eq = soluciones[0]
+            if isinstance(q_eq, float):
+                p_eq = float(self._compilar(demanda, self.q)(q_eq))
+                consumidor = float(self._primitiva_curva(demanda_str, modo)[0](q_eq)) - p_eq * q_eq
+                productor = p_eq * q_eq - float(self._primitiva_curva(oferta_str, modo)[0](q_eq))
             else:
-                return "Debe especificar q0 o p0"
+                p_eq = sp.simplify(demanda.subs(self.q, q_eq))
+                consumidor = self._integrar('excedente_consumidor', (demanda_str, q_eq, p_eq),
+                                            demanda - p_eq, self.q, 0, q_eq)
+                productor = self._integrar('excedente_productor', (oferta_str, q_eq, p_eq),
+                                           p_eq - oferta, self.q, 0, q_eq)
             
-            return f"Excedente del productor: {excedente} = {float(excedente):.2f}"
+            def mostrar(valor):
+                if isinstance(valor, sp.Basic) and not valor.is_Number:
+                    return f"{valor} ≈ {float(valor):.6g}"
+                return str(valor)
+            
+            def texto():
+                resultado = f"Equilibrio entre D(q) = {demanda} y S(q) = {oferta}"
+                resultado += f" ({nota}):" if nota else ":"
+                resultado += f"\nq* = {mostrar(q_eq)}, p* = {mostrar(p_eq)}"
+                resultado += f"\nExcedente del consumidor: {mostrar(consumidor)}"
+                resultado += f"\nExcedente del productor: {mostrar(productor)}"
+                return resultado
+            
+            return Resultado((q_eq, p_eq), texto, demanda - oferta, equilibrios=soluciones,
+                             excedente_consumidor=consumidor, excedente_productor=productor, nota=nota)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
     
+    @_operacion
     def interes_compuesto(self, capital, tasa, tiempo, n_periodos=1):
-        """Calcula el monto con interés compuesto"""
+        """
+        Calcula el monto con interés compuesto. Cualquiera de los argumentos
+        puede ser un arreglo: se calculan todas las combinaciones de una vez.
+        """
         try:
+            if any(hasattr(v, '__len__') for v in (capital, tasa, tiempo, n_periodos)):
+                capital, tasa, tiempo, n_periodos = np.broadcast_arrays(
+                    *(np.asarray(v, dtype=float) for v in (capital, tasa, tiempo, n_periodos)))
+                monto = capital * (1 + tasa / n_periodos)**(n_periodos * tiempo)
+                return Resultado(monto, lambda: self._texto_lote("Monto final", monto),
+                                 capital=capital, tasa=tasa, tiempo=tiempo, n_periodos=n_periodos)
             monto = capital * (1 + tasa/n_periodos)**(n_periodos * tiempo)
-            return f"Capital inicial: ${capital}\nTasa: {tasa*100}%\nTiempo: {tiempo}\nMonto final: ${monto:.2f}"
+            return Resultado(monto, lambda: f"Capital inicial: ${capital}\nTasa: {tasa*100}%\nTiempo: {tiempo}\nMonto final: ${monto:.2f}",
+                             capital=capital, tasa=tasa, tiempo=tiempo, n_periodos=n_periodos)
+        except Exception as e:
+            return Resultado(error=e)
+    
+    @_operacion
+    def cronograma_interes_compuesto(self, capital, tasa, tiempo, n_periodos=1):
+        """
+        Saldo al final de cada período. capital y tasa pueden ser arreglos:
+        el resultado tiene forma (..., n_periodos * tiempo + 1)
+        """
+        try:
+            periodos = int(round(n_periodos * tiempo))
+            factor = 1 + np.asarray(tasa, dtype=float)[..., None] / n_periodos
+            saldos = np.asarray(capital, dtype=float)[..., None] * factor ** np.arange(periodos + 1)
+            
+            def texto():
+                if saldos.ndim > 1:
+                    return f"Cronograma de {periodos} períodos para {saldos[..., 0].size} combinaciones de capital y tasa"
+                filas = [f"Período {k}: ${saldo:.2f}" for k, saldo in enumerate(saldos)]
+                return "\n".join([f"Cronograma con tasa {tasa*100}% en {periodos} períodos:"] + filas)
+            
+            return Resultado(saldos, texto, capital=capital, tasa=tasa, tiempo=tiempo, n_periodos=n_periodos)
+        except Exception as e:
+            return Resultado(error=e)
+    
+    # ============= GRÁFICOS =============
+    
+    def _muestras(self, expr, a, b):
+        """Muestreo adaptativo de expr en [a, b], cacheado por expresión y dominio"""
+        a, b = float(a), float(b)
+        return self._memo('muestras', (expr, a, b),
+                          lambda: graficos.muestrear(self._compilar(expr), a, b), limitado=False)
+    
+    @_operacion
+    def graficar_area(self, f1_str, f2_str, a=None, b=None, ruta=None, formato=None):
+        """
+        Grafica dos curvas y el área entre ellas. Con ruta guarda la imagen
+        (PNG o SVG según la extensión); sin ruta el valor son sus bytes.
+        """
+        try:
+            f1 = self._sympify(f1_str)
+            f2 = self._sympify(f2_str)
+            if a is None or b is None:
+                a, b = self._limites_area(f1_str, f2_str)
+                if a is None:
+                    mensaje = "No se encontraron suficientes puntos de intersección"
+                    return Resultado(plantilla=lambda: mensaje, error=mensaje)
+            a, b = float(self._sympify(a)), float(self._sympify(b))
+            
+            # Las curvas se muestran un poco más allá de la región sombreada
+            margen = 0.25 * (b - a) or 1.0
+            x1, y1 = self._muestras(f1, a - margen, b + margen)
+            x2, y2 = self._muestras(f2, a - margen, b + margen)
+            x_relleno = np.union1d(x1[(x1 >= a) & (x1 <= b)], x2[(x2 >= a) & (x2 <= b)])
+            x_relleno = np.union1d(x_relleno, [a, b])
+            relleno = (x_relleno, self._compilar(f1)(x_relleno), self._compilar(f2)(x_relleno))
+            
+            figura = graficos.figura_area((str(f1), x1, y1), (str(f2), x2, y2), relleno, a, b)
+            imagen = graficos.exportar(figura, ruta, formato)
+            destino = ruta if ruta is not None else f"{len(imagen)} bytes"
+            return Resultado(imagen, lambda: f"Gráfico del área entre {f1} y {f2} en [{a:g}, {b:g}]: {destino}",
+                             f1 - f2, a=a, b=b, ruta=ruta)
         except Exception as e:
-            return f"Error: {e}"
+            return Resultado(error=e)
+    
+    @_operacion
+    def graficar_taylor(self, funcion_str, punto=0, ordenes=(1, 3, 5), dominio=None,
+                        ruta=None, formato=None):
+        """
+        Grafica una función junto con sus polinomios de Taylor de los
+        órdenes pedidos. dominio es (a, b); por defecto punto ± 3.
+        """
+        try:
+            f = self._sympify(funcion_str)
+            a, b = dominio if dominio is not None else (punto - 3, punto + 3)
+            funcion = (str(f),) + self._muestras(f, a, b)
+            aproximaciones = []
+            for orden in ordenes:
+                polinomio = self._polinomio_taylor(funcion_str, punto, orden)
+                aproximaciones.append((f"Orden {orden}",) + self._muestras(polinomio, a, b))
+            
+            figura = graficos.figura_taylor(funcion, aproximaciones, float(punto))
+            imagen = graficos.exportar(figura, ruta, formato)
+            destino = ruta if ruta is not None else f"{len(imagen)} bytes"
+            return Resultado(imagen, lambda: f"Gráfico de Taylor de {f} en x={punto}: {destino}",
+                             f, punto=punto, ordenes=tuple(ordenes), ruta=ruta)
+        except Exception as e:
+            return Resultado(error=e)
+
 
 # ============= INTERFAZ DE USUARIO =============
 
 def menu_principal():
     """Menú principal de la calculadora"""
-    calc = CalculadoraAnalisisII()
+    calc = CalculadoraAnalisisII(CacheExpresiones(ruta=RUTA_CACHE))
     
     while True:
         print("\n" + "="*50)
@@ -305,12 +1365,15 @@ def menu_principal():
         print("4. Funciones Multivariables")
         print("5. Series y Sucesiones")
         print("6. Aplicaciones Económicas")
+        print("7. Estadísticas de la caché y de la integración")
         print("0. Salir")
         print("-"*50)
         
         opcion = input("Seleccione una opción: ")
         
         if opcion == "0":
+            if calc.cache.ruta:
+                calc.cache.guardar()
             print("¡Hasta luego!")
             break
         elif opcion == "1":
@@ -325,6 +1388,11 @@ def menu_principal():
             menu_series(calc)
         elif opcion == "6":
             menu_aplicaciones_economicas(calc)
+        elif opcion == "7":
+            for nombre, valor in calc.cache.estadisticas().items():
+                print(f"{nombre}: {valor}")
+            for nombre, valor in calc.integrador.estadisticas().items():
+                print(f"integrales_{nombre}: {valor}")
         else:
             print("Opción no válida")
 
@@ -354,6 +1422,7 @@ def menu_integrales_definidas(calc):
     print("\n--- INTEGRALES DEFINIDAS ---")
     print("1. Integral definida")
     print("2. Área entre curvas")
+    print("3. Graficar área entre curvas")
     
     sub_opcion = input("Seleccione opción: ")
     
@@ -372,6 +1441,17 @@ def menu_integrales_definidas(calc):
             print(calc.area_entre_curvas(f1, f2, a, b))
         else:
             print(calc.area_entre_curvas(f1, f2))
+    elif sub_opcion == "3":
+        f1 = input("Primera función: ")
+        f2 = input("Segunda función: ")
+        ruta = input("Archivo de salida (.png o .svg): ")
+        usar_limites = input("¿Especificar límites? (s/n): ")
+        if usar_limites.lower() == 's':
+            a = float(input("Límite inferior: "))
+            b = float(input("Límite superior: "))
+            print(calc.graficar_area(f1, f2, a, b, ruta=ruta))
+        else:
+            print(calc.graficar_area(f1, f2, ruta=ruta))
 
 def menu_ecuaciones_diferenciales(calc):
     """Submenú para ecuaciones diferenciales"""
@@ -380,6 +1460,16 @@ def menu_ecuaciones_diferenciales(calc):
     print("Ejemplo: Eq(y(x).diff(x), x*y(x))")
     
     ec = input("Ecuación: ")
+    numerica = input("¿Resolver numéricamente? (s/n): ")
+    
+    if numerica.lower() == 's':
+        x0 = float(input("x0: "))
+        y0 = [float(v) for v in input("Valores iniciales y(x0), y'(x0), ... (separados por coma): ").split(',')]
+        x_final = float(input("x final: "))
+        puntos = int(input("Cantidad de puntos: "))
+        print(calc.ecuacion_diferencial_numerica(ec, (x0, y0), np.linspace(x0, x_final, puntos)))
+        return
+    
     cond_inicial = input("¿Tiene condición inicial? (s/n): ")
     
     if cond_inicial.lower() == 's':
@@ -396,6 +1486,9 @@ def menu_funciones_multivariables(calc):
     print("2. Gradiente")
     print("3. Puntos críticos")
     print("4. Multiplicadores de Lagrange")
+    print("5. Integral doble o triple")
+    print("6. Jacobiano")
+    print("7. Hessiana")
     
     sub_opcion = input("Seleccione opción: ")
     
@@ -404,15 +1497,28 @@ def menu_funciones_multivariables(calc):
         var = input("Variable de derivación (x/y): ")
         print(calc.derivada_parcial(f, var))
     elif sub_opcion == "2":
-        f = input("Ingrese f(x,y): ")
+        f = input("Ingrese f (x, y u otras variables): ")
         print(calc.gradiente(f))
     elif sub_opcion == "3":
         f = input("Ingrese f(x,y): ")
         print(calc.puntos_criticos(f))
     elif sub_opcion == "4":
         f = input("Función objetivo f(x,y): ")
-        g = input("Restricción g(x,y) = 0 (ingrese solo g): ")
-        print(calc.lagrange(f, g))
+        g = input("Restricción g(x,y) = 0 (ingrese solo g; varias separadas por ';'): ")
+        restricciones = [r.strip() for r in g.split(';') if r.strip()]
+        print(calc.lagrange(f, restricciones[0] if len(restricciones) == 1 else restricciones))
+    elif sub_opcion == "5":
+        f = input("Función a integrar: ")
+        print("Límites de la integral interior a la exterior, como variable,inferior,superior")
+        texto = input("separados por ';' (ej: y,0,x; x,0,1): ")
+        limites = [tuple(l.strip() for l in limite.split(',')) for limite in texto.split(';') if limite.strip()]
+        print(calc.integral_multiple(f, limites))
+    elif sub_opcion == "6":
+        f = input("Componentes de la función (separadas por ';'): ")
+        print(calc.jacobiano(f))
+    elif sub_opcion == "7":
+        f = input("Ingrese f: ")
+        print(calc.hessiana(f))
 
 def menu_series(calc):
     """Submenú para series y sucesiones"""
@@ -420,6 +1526,9 @@ def menu_series(calc):
     print("1. Límite de sucesión")
     print("2. Serie geométrica")
     print("3. Serie de Taylor")
+    print("4. Graficar aproximaciones de Taylor")
+    print("5. Convergencia de Taylor en un intervalo")
+    print("6. Analizar serie (criterios y suma numérica)")
     
     sub_opcion = input("Seleccione opción: ")
     
@@ -440,6 +1549,23 @@ def menu_series(calc):
         punto = float(input("Punto de expansión (0 para Maclaurin): "))
         orden = int(input("Orden de la serie: "))
         print(calc.serie_taylor(f, punto, orden))
+    elif sub_opcion == "4":
+        f = input("Función: ")
+        punto = float(input("Punto de expansión (0 para Maclaurin): "))
+        ordenes = [int(o) for o in input("Órdenes a graficar (separados por coma): ").split(',')]
+        ruta = input("Archivo de salida (.png o .svg): ")
+        print(calc.graficar_taylor(f, punto, ordenes, ruta=ruta))
+    elif sub_opcion == "5":
+        f = input("Función: ")
+        punto = float(input("Punto de expansión (0 para Maclaurin): "))
+        orden = int(input("Orden máximo: "))
+        a = float(input("Desde x = "))
+        b = float(input("Hasta x = "))
+        print(calc.convergencia_taylor(f, np.linspace(a, b, 201), punto, orden))
+    elif sub_opcion == "6":
+        an = input("Término general an (use n como variable): ")
+        desde = int(input("Desde n = "))
+        print(calc.analizar_serie(an, desde=desde))
 
 def menu_aplicaciones_economicas(calc):
     """Submenú para aplicaciones económicas"""
@@ -447,6 +1573,8 @@ def menu_aplicaciones_economicas(calc):
     print("1. Excedente del consumidor")
     print("2. Excedente del productor")
     print("3. Interés compuesto")
+    print("4. Equilibrio de mercado")
+    print("5. Excedentes para un rango de precios")
     
     sub_opcion = input("Seleccione opción: ")
     
@@ -474,6 +1602,16 @@ def menu_aplicaciones_economicas(calc):
         tiempo = float(input("Tiempo: "))
         n = int(input("Períodos de capitalización por unidad de tiempo (1 para anual): "))
         print(calc.interes_compuesto(capital, tasa, tiempo, n))
+    elif sub_opcion == "4":
+        demanda = input("Función de demanda p(q): ")
+        oferta = input("Función de oferta p(q): ")
+        print(calc.equilibrio_mercado(demanda, oferta))
+    elif sub_opcion == "5":
+        demanda = input("Función de demanda p(q): ")
+        desde = float(input("Precio mínimo: "))
+        hasta = float(input("Precio máximo: "))
+        cantidad = int(input("Cantidad de precios: "))
+        print(calc.excedente_consumidor_lote(demanda, p0=np.linspace(desde, hasta, cantidad)))
 
 # ============= EJEMPLOS DE USO =============
 
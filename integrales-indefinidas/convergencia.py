@@ -0,0 +1,290 @@
+"""
+Criterios de convergencia y suma numérica de series para la CalculadoraAnalisisII.
+
+Los criterios (término general, cociente, raíz, integral y comparación)
+se aplican simbólicamente sobre el término general a_n. La suma se estima
+con sumas parciales vectorizadas y aceleración: Richardson para series de
+términos positivos que decrecen como una potencia de n, y el algoritmo
+épsilon de Wynn (transformación de Shanks) para series alternadas o de
+convergencia geométrica. Si el término tiene factores logarítmicos, que
+Richardson no modela, la cola se suma con Euler-Maclaurin. Así unos pocos
+miles de términos alcanzan lo que sin acelerar pediría millones.
+"""
+import numpy as np
+import sympy as sp
+
+import motor_numerico
+
+CONVERGE = 'converge'
+DIVERGE = 'diverge'
+NO_CONCLUYE = 'no concluyente'
+
+# Sumas parciales que recibe la épsilon de Wynn
+VENTANA_WYNN = 32
+
+
+def preparar(an, n):
+    """Reemplaza n por un símbolo entero positivo, que simplifica |a_n| y los límites"""
+    entero = sp.Symbol(n.name, integer=True, positive=True)
+    return an.subs(n, entero), entero
+
+
+def _signo_final(an, n, puntos=(10, 100, 1000, 10**4, 10**5, 10**6)):
+    """+1 o -1 si a_n tiene signo constante en n grandes, 0 si no"""
+    signos = set()
+    for k in puntos:
+        # k y k + 1 para no muestrear sólo índices pares
+        for valor in (sp.N(an.subs(n, k)), sp.N(an.subs(n, k + 1))):
+            if not valor.is_real:
+                return 0
+            signos.add(1 if valor > 0 else -1 if valor < 0 else 0)
+    return signos.pop() if len(signos) == 1 else 0
+
+
+def _es_cero(limite):
+    return limite.is_zero is True
+
+
+# ============= CRITERIOS SIMBÓLICOS =============
+
+def termino_general(an, n):
+    """Si a_n no tiende a 0 la serie diverge (se mira |a_n|, que no oscila de signo)"""
+    limite = sp.limit(sp.Abs(an), n, sp.oo)
+    if _es_cero(limite):
+        return NO_CONCLUYE, "lim a_n = 0"
+    if isinstance(limite, sp.AccumBounds):
+        return DIVERGE, f"lim a_n no existe (|a_n| oscila en {limite})"
+    if limite.is_zero is False:
+        return DIVERGE, f"lim |a_n| = {limite} ≠ 0"
+    return NO_CONCLUYE, f"lim |a_n| = {limite}"
+
+
+def _veredicto_limite(limite, nombre):
+    if isinstance(limite, sp.AccumBounds) or limite.is_real is not True and limite != sp.oo:
+        return NO_CONCLUYE, f"{nombre} = {limite}"
+    if limite < 1:
+        return CONVERGE, f"{nombre} = {limite} < 1"
+    if limite > 1:
+        return DIVERGE, f"{nombre} = {limite} > 1"
+    return NO_CONCLUYE, f"{nombre} = 1"
+
+
+def cociente(an, n):
+    """Criterio de D'Alembert: L = lim |a_(n+1) / a_n|"""
+    razon = sp.simplify(sp.Abs(an.subs(n, n + 1) / an))
+    return _veredicto_limite(sp.limit(razon, n, sp.oo), "lim |a(n+1)/a(n)|")
+
+
+def raiz(an, n):
+    """Criterio de Cauchy: L = lim |a_n|^(1/n)"""
+    return _veredicto_limite(sp.limit(sp.Abs(an) ** (1 / n), n, sp.oo), "lim |a(n)|^(1/n)")
+
+
+def integral(an, n, desde=10):
+    """
+    Criterio de la integral: si f(x) = a_x es positiva y decreciente para
+    x grandes, la serie y ∫ f convergen o divergen juntas.
+    """
+    x = sp.Symbol('x', positive=True)
+    f = an.subs(n, x)
+    derivada = sp.diff(f, x)
+    for k in (desde, 10 * desde, 100 * desde, 10**6):
+        try:
+            aplica = float(f.subs(x, k)) > 0 and float(derivada.subs(x, k)) < 0
+        except TypeError:
+            aplica = False
+        if not aplica:
+            return NO_CONCLUYE, "no aplica: a_n no es positiva y decreciente"
+    valor = sp.integrate(f, (x, desde, sp.oo))
+    if valor.has(sp.Integral):
+        return NO_CONCLUYE, "no se pudo calcular la integral"
+    if valor.is_finite:
+        return CONVERGE, f"∫[{desde},∞) f(x) dx = {valor} es finita"
+    if valor == sp.oo:
+        return DIVERGE, f"∫[{desde},∞) f(x) dx = ∞"
+    return NO_CONCLUYE, f"∫[{desde},∞) f(x) dx = {valor}"
+
+
+def comparacion(an, n):
+    """
+    Comparación en el límite con la serie p: p = lim -log|a_n| / log n y
+    se compara |a_n| con 1/n^q para q cerca de p.
+    """
+    modulo = sp.Abs(an)
+    p = sp.limit(-sp.log(modulo) / sp.log(n), n, sp.oo)
+    if not p.is_real or not p.is_finite:
+        return NO_CONCLUYE, f"|a_n| no se comporta como una potencia de n (p = {p})"
+
+    constante = sp.limit(modulo * n**p, n, sp.oo)
+    if constante.is_positive and constante.is_finite:
+        q = p
+    else:
+        # |a_n| = n^-p por un factor más lento (logaritmos): se compara con p ± algo
+        q = (p + 1) / 2
+        constante = sp.limit(modulo * n**q, n, sp.oo)
+    if q > 1 and constante.is_finite:
+        return CONVERGE, f"|a_n| ≲ 1/n^{q} con {q} > 1 (converge absolutamente)"
+    if q <= 1 and (constante.is_positive or constante == sp.oo):
+        if _signo_final(an, n) != 0:
+            return DIVERGE, f"a_n ≳ 1/n^{q} con {q} ≤ 1"
+        return NO_CONCLUYE, f"|a_n| ≳ 1/n^{q}: no converge absolutamente"
+    return NO_CONCLUYE, f"p = {p}"
+
+
+CRITERIOS = {
+    'término general': termino_general,
+    'cociente': cociente,
+    'raíz': raiz,
+    'integral': integral,
+    'comparación': comparacion,
+}
+
+
+# ============= ACELERACIÓN =============
+
+def wynn_epsilon(sumas):
+    """
+    Algoritmo épsilon de Wynn sobre sumas parciales consecutivas (cada
+    columna par es una transformación de Shanks). Devuelve (valor, error)
+    con el error estimado como la diferencia entre las dos últimas
+    columnas pares (infinito si no se llegó a calcular ninguna).
+    """
+    actual = np.asarray(sumas, dtype=float)
+    previo = np.zeros(actual.size + 1)
+    estimaciones = [actual[-1]]
+    for k in range(1, actual.size):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            siguiente = previo[1:actual.size] + 1 / np.diff(actual)
+        if siguiente.size == 0 or not np.all(np.isfinite(siguiente)):
+            break
+        previo, actual = actual, siguiente
+        if k % 2 == 0:
+            estimaciones.append(actual[-1])
+    if len(estimaciones) < 2:
+        return estimaciones[-1], np.inf
+    return estimaciones[-1], abs(estimaciones[-1] - estimaciones[-2])
+
+
+def richardson(sumas, exponentes):
+    """
+    Extrapolación de Richardson de S_n con n duplicándose en cada paso,
+    cuando S - S_n ≈ c0/n^e0 + c1/n^e1 + ...  Devuelve (valor, error).
+    """
+    tabla = np.asarray(sumas, dtype=float)
+    anterior = None
+    for e in exponentes[:tabla.size - 1]:
+        anterior = tabla
+        tabla = tabla[1:] + (tabla[1:] - tabla[:-1]) / (2.0**e - 1)
+    if anterior is None:
+        return tabla[-1], np.inf
+    return tabla[-1], abs(tabla[-1] - anterior[-1])
+
+
+# ============= SUMA NUMÉRICA =============
+
+def terminos(an, n, desde, cantidad):
+    """Evalúa a_n para n = desde .. desde + cantidad - 1 en un solo arreglo"""
+    indices = np.arange(desde, desde + cantidad, dtype=float)
+    try:
+        with np.errstate(all='ignore'):
+            return motor_numerico.compilar(an, (n,))(indices)
+    except Exception:
+        # Funciones sin equivalente en NumPy (factorial, binomial...): término a término
+        escalar = sp.lambdify(n, an, 'math')
+
+        def evaluar(k):
+            try:
+                return float(escalar(int(k)))
+            except (OverflowError, ValueError, ZeroDivisionError):
+                return np.nan
+        return np.array([evaluar(k) for k in indices])
+
+
+def cola_euler_maclaurin(an, n, desde):
+    """
+    Cola Σ_(k ≥ desde) a_k por Euler-Maclaurin:
+    ∫[desde, ∞) a + a(desde)/2 - a'(desde)/12 + a^(3)(desde)/720.
+    La integral se intenta en forma cerrada y, si no sale, numéricamente
+    (con el error tomado de comparar dos cuadraturas). Devuelve (valor, error).
+    """
+    x = sp.Symbol('x', positive=True)
+    f_x = an.subs(n, x)
+    integral, error = sp.integrate(f_x, (x, desde, sp.oo)), 0.0
+    if integral.has(sp.Integral) or not integral.is_finite:
+        f = motor_numerico.compilar(f_x, (x,))
+        integral, error = motor_numerico.integrar(f, desde, np.inf, metodo='gauss')
+        otra, _ = motor_numerico.integrar(f, desde, np.inf, metodo='gauss', subintervalos=64)
+        error = max(float(error), abs(otra - integral))
+    d1 = float(sp.diff(f_x, x).subs(x, desde))
+    d3 = float(sp.diff(f_x, x, 3).subs(x, desde))
+    valor = float(integral) + float(f_x.subs(x, desde)) / 2 - d1 / 12 + d3 / 720
+    return valor, float(error) + abs(d3) / 720
+
+
+def sumar(an, n, desde=1, cantidad=4096, metodo='auto'):
+    """
+    Estima la suma de a_n desde n = desde con cantidad términos.
+    metodo: 'richardson', 'wynn', 'euler_maclaurin', 'ninguno' o 'auto'
+    (según los términos: alternados o geométricos → Wynn; positivos que
+    decrecen como 1/n^p → Richardson; con factores logarítmicos, que
+    Richardson no modela, → Euler-Maclaurin).
+
+    Devuelve un diccionario con valor, error, metodo y exponente (el p de
+    a_n ~ 1/n^p si se estimó).
+    """
+    a = terminos(an, n, desde, cantidad)
+    if not np.all(np.isfinite(a)):
+        raise ValueError("Algún término de la serie no es finito")
+    sumas = np.cumsum(a)
+    ultimo = abs(a[-1])
+
+    p = None
+    mitad = cantidad // 2
+    if a[mitad - 1] != 0 and a[-1] != 0:
+        p = float(np.log(abs(a[mitad - 1] / a[-1])) / np.log(cantidad / mitad))
+    if metodo == 'auto':
+        alternada = np.all(a[-64:] * a[-65:-1] < 0)
+        razon = abs(a[-1] / a[-2]) if a[-2] != 0 else 0.0
+        if alternada or razon < 0.99 or p is None:
+            metodo = 'wynn'
+        elif abs(p - round(2 * p) / 2) < 1e-2:
+            metodo = 'richardson'
+        else:
+            metodo = 'euler_maclaurin'
+    if metodo in ('richardson', 'euler_maclaurin'):
+        if not (np.all(a[-64:] > 0) and np.all(np.diff(a[-64:]) < 0)):
+            raise ValueError(f"{metodo} necesita términos positivos y decrecientes")
+        if p is not None and p <= 1:
+            return {'valor': np.inf, 'error': np.inf, 'metodo': 'diverge', 'exponente': p}
+
+    if metodo == 'richardson' and p is not None:
+        p = round(2 * p) / 2 if abs(p - round(2 * p) / 2) < 1e-2 else p
+        # S_n en n = cantidad / 2^k, con S - S_n ≈ n^(1-p) (c0 + c1/n + ...)
+        puntos = np.array([cantidad >> k for k in range(8, -1, -1) if cantidad >> k >= 8])
+        exponentes = [p - 1 + j for j in range(len(puntos))]
+        valor, error = richardson(sumas[puntos - 1], exponentes)
+        # Lo mismo con la mitad de los términos: si el modelo no es exacto, difieren
+        valor_mitad, _ = richardson(sumas[puntos[:-1] // 2 - 1], exponentes)
+        error = max(error, abs(valor - valor_mitad))
+    elif metodo == 'euler_maclaurin':
+        cola, error = cola_euler_maclaurin(an, n, desde + cantidad)
+        valor = sumas[-1] + cola
+        # Redondeo acumulado de la suma parcial
+        error += cantidad * np.finfo(float).eps * abs(sumas[-1])
+    elif metodo == 'wynn':
+        # Las últimas VENTANA_WYNN sumas antes de que los términos se pierdan
+        # en el redondeo: las más cercanas al límite que todavía cambian
+        vivos = np.nonzero(np.abs(a) > np.finfo(float).eps * np.abs(sumas))[0]
+        fin = vivos[-1] + 1 if vivos.size else 1
+        valor, error = wynn_epsilon(sumas[max(fin - VENTANA_WYNN, 0):fin])
+        # Cada suma parcial arrastra el redondeo acumulado de sus términos
+        redondeo = fin * np.finfo(float).eps * abs(sumas[fin - 1])
+        error = max(error, redondeo)
+        if ultimo + redondeo < error:
+            valor, error = sumas[-1], ultimo + redondeo
+    else:
+        metodo = 'ninguno'
+        valor, error = sumas[-1], ultimo
+    # Nunca por debajo del redondeo del valor: un error 0 sería falso
+    error = max(error, np.spacing(abs(valor)))
+    return {'valor': float(valor), 'error': float(error), 'metodo': metodo, 'exponente': p}
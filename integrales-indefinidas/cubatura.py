@@ -0,0 +1,132 @@
+"""
+Integrales múltiples numéricas para la CalculadoraAnalisisII.
+
+La región de integración (rectangular o de tipo I/II, con límites que
+dependen de las variables exteriores) se lleva al cubo unitario [0, 1]^d
+y el integrando compilado se evalúa por bloques de puntos, así la memoria
+no crece con la cantidad de puntos. Hay dos métodos:
+
+* cubatura: producto tensorial de reglas de Gauss-Legendre compuestas; el
+  error se estima comparando con la regla de la mitad de subintervalos.
+* qmc: cuasi-Monte Carlo con una sucesión de Kronecker desplazada al azar
+  varias veces; el error es el error estándar entre repeticiones.
+"""
+import numpy as np
+
+import motor_numerico
+
+METODOS = ('cubatura', 'qmc')
+
+# Puntos que se evalúan juntos (el bloque ocupa bloque * d números en memoria)
+BLOQUE = 2**16
+
+
+def preparar(f, limites):
+    """
+    Compila f y sus límites y devuelve (g, d): g(U) integra sobre el cubo
+    unitario, con U de forma (N, d) y la columna i asociada a limites[i].
+
+    limites: [(variable, inferior, superior), ...] de la integral más
+    interior a la más exterior, como en sp.integrate. Los límites de cada
+    variable sólo pueden depender de las variables que están más afuera.
+    """
+    variables = [v for v, _, _ in limites]
+    d = len(variables)
+    integrando = motor_numerico.compilar(f, variables)
+    bordes = [(motor_numerico.compilar(a, variables[i + 1:]), motor_numerico.compilar(b, variables[i + 1:]))
+              for i, (_, a, b) in enumerate(limites)]
+
+    def g(U):
+        valores = [None] * d
+        jacobiano = np.ones(len(U))
+        # De afuera hacia adentro: cada variable escala su columna entre sus límites
+        for i in reversed(range(d)):
+            inferior, superior = (borde(*valores[i + 1:]) for borde in bordes[i])
+            valores[i] = inferior + (superior - inferior) * U[:, i]
+            jacobiano = jacobiano * (superior - inferior)
+        with np.errstate(all='ignore'):
+            return integrando(*valores) * jacobiano
+
+    return g, d
+
+
+def _bloques(total, bloque=BLOQUE):
+    for inicio in range(0, total, bloque):
+        yield np.arange(inicio, min(inicio + bloque, total))
+
+
+# ============= CUBATURA =============
+
+def _regla_unitaria(nodos, subintervalos):
+    """Nodos y pesos de Gauss-Legendre compuesta en [0, 1]"""
+    x, w = motor_numerico.nodos_gauss_legendre(nodos)
+    izquierdas = np.arange(subintervalos) / subintervalos
+    puntos = (izquierdas[:, None] + (x + 1) / (2 * subintervalos)).ravel()
+    pesos = np.tile(w / (2 * subintervalos), subintervalos)
+    return puntos, pesos
+
+
+def producto_tensorial(g, d, nodos=16, subintervalos=4):
+    """Regla de Gauss-Legendre en [0, 1]^d evaluada por bloques"""
+    puntos, pesos = _regla_unitaria(nodos, subintervalos)
+    forma = (puntos.size,) * d
+    suma = 0.0
+    for indices in _bloques(puntos.size**d):
+        ejes = np.unravel_index(indices, forma)
+        U = np.stack([puntos[eje] for eje in ejes], axis=1)
+        W = np.prod([pesos[eje] for eje in ejes], axis=0)
+        suma += np.sum(g(U) * W)
+    return suma
+
+
+def cubatura(g, d, puntos=2**20, nodos=16):
+    """
+    Integra g sobre [0, 1]^d con unos `puntos` puntos (la regla fina) y
+    estima el error con la regla de la mitad de subintervalos.
+    Devuelve (valor, error).
+    """
+    por_eje = puntos ** (1 / d)
+    subintervalos = max(2, 2 * round(por_eje / nodos / 2))
+    fino = producto_tensorial(g, d, nodos, subintervalos)
+    grueso = producto_tensorial(g, d, nodos, subintervalos // 2)
+    return fino, abs(fino - grueso)
+
+
+# ============= CUASI-MONTE CARLO =============
+
+def _kronecker(d):
+    """Pasos de la sucesión R_d: potencias de 1/φ_d, con φ_d^(d+1) = φ_d + 1"""
+    phi = 2.0
+    for _ in range(50):
+        phi = (1 + phi) ** (1 / (d + 1))
+    return (1 / phi) ** np.arange(1, d + 1)
+
+
+def cuasi_montecarlo(g, d, puntos=2**20, repeticiones=8, semilla=None):
+    """
+    Promedia g sobre la sucesión de Kronecker con `repeticiones`
+    desplazamientos al azar de puntos / repeticiones puntos cada uno.
+    Devuelve (valor, error) con el error estándar de las repeticiones.
+    """
+    azar = np.random.default_rng(semilla)
+    paso = _kronecker(d)
+    por_repeticion = puntos // repeticiones
+    medias = []
+    for _ in range(repeticiones):
+        desplazamiento = azar.random(d)
+        suma = 0.0
+        for indices in _bloques(por_repeticion):
+            U = np.mod(desplazamiento + (indices[:, None] + 1) * paso, 1.0)
+            suma += np.sum(g(U))
+        medias.append(suma / por_repeticion)
+    return float(np.mean(medias)), float(np.std(medias, ddof=1) / np.sqrt(repeticiones))
+
+
+def integrar(f, limites, metodo='cubatura', puntos=2**20):
+    """Integral múltiple numérica de f; devuelve (valor, error_estimado)"""
+    g, d = preparar(f, limites)
+    if metodo == 'cubatura':
+        return cubatura(g, d, puntos)
+    if metodo == 'qmc':
+        return cuasi_montecarlo(g, d, puntos)
+    raise ValueError(f"Método de integración múltiple desconocido: {metodo}")
@@ -0,0 +1,211 @@
+"""
+Integración numérica de problemas de valor inicial para la CalculadoraAnalisisII.
+
+Acepta las mismas ecuaciones que ecuacion_diferencial_separable (por
+ejemplo "Eq(y(x).diff(x), x*y(x))"), también sistemas y ecuaciones de
+orden superior, que se llevan a un sistema de primer orden. El lado
+derecho se compila una sola vez y se integra con Dormand-Prince (RK45)
+o, para problemas rígidos, con el método de Rosenbrock ROS2. Muchas
+condiciones iniciales se integran juntas como un arreglo de estados.
+"""
+import numpy as np
+import sympy as sp
+from sympy.core.function import AppliedUndef
+
+import motor_numerico
+
+METODOS = ('rk45', 'rigido')
+
+
+# ============= PREPARACIÓN DEL SISTEMA =============
+
+class SistemaEDO:
+    """
+    Sistema de primer orden Y' = F(x, Y) listo para integrar.
+
+    Attributes:
+        estado (list): Nombres de las componentes de Y (y, y', z, ...)
+        lado_derecho (list): Expresiones de F
+        f: F compilada; para Y de forma (B, n) devuelve (B, n)
+        jacobiano: ∂F/∂Y compilado; devuelve (B, n, n)
+        derivada_x: ∂F/∂x compilada; devuelve (B, n)
+    """
+
+    def __init__(self, estado, simbolos, lado_derecho, variable):
+        self.estado = estado
+        self.lado_derecho = lado_derecho
+        argumentos = (variable,) + tuple(simbolos)
+        jacobiano = [[sp.diff(r, s) for s in simbolos] for r in lado_derecho]
+        compilado_f = motor_numerico.compilar_arreglo(lado_derecho, argumentos)
+        compilado_j = motor_numerico.compilar_arreglo(jacobiano, argumentos)
+        compilado_x = motor_numerico.compilar_arreglo([sp.diff(r, variable) for r in lado_derecho],
+                                                      argumentos)
+        self.f = lambda t, Y: compilado_f(t, *np.moveaxis(Y, -1, 0))
+        self.jacobiano = lambda t, Y: compilado_j(t, *np.moveaxis(Y, -1, 0))
+        self.derivada_x = lambda t, Y: compilado_x(t, *np.moveaxis(Y, -1, 0))
+
+    @property
+    def dimension(self):
+        return len(self.estado)
+
+
+def preparar_sistema(ecuaciones, variable):
+    """
+    Lleva una ecuación o sistema de ecuaciones diferenciales ordinarias
+    (Eq o expresiones igualadas a 0) a un SistemaEDO de primer orden.
+    """
+    if isinstance(ecuaciones, (sp.Basic, str)):
+        ecuaciones = [ecuaciones]
+    ecuaciones = [e.lhs - e.rhs if isinstance(e, sp.Eq) else e for e in ecuaciones]
+
+    funciones = sorted({f for e in ecuaciones for f in e.atoms(AppliedUndef)
+                        if f.args == (variable,)}, key=str)
+    if not funciones:
+        raise ValueError(f"La ecuación no tiene funciones incógnita de {variable}")
+
+    ordenes = {}
+    for f in funciones:
+        derivadas = [d.derivative_count for e in ecuaciones for d in e.atoms(sp.Derivative)
+                     if d.expr == f]
+        ordenes[f] = max(derivadas, default=0)
+        if ordenes[f] == 0:
+            raise ValueError(f"{f} no aparece derivada en el sistema")
+
+    mayores = [f.diff(variable, ordenes[f]) for f in funciones]
+    despejes = sp.solve(ecuaciones, mayores, dict=True)
+    if not despejes:
+        raise ValueError("No se pudieron despejar las derivadas de mayor orden")
+    despeje = despejes[0]
+
+    # Componentes del estado: f, f', ..., f^(k-1) para cada función
+    estado, simbolos, reemplazos = [], [], {}
+    for f in funciones:
+        nombre = f.func.__name__
+        for k in range(ordenes[f]):
+            simbolo = sp.Symbol(f"_{nombre}{k}")
+            estado.append(nombre + "'" * k)
+            simbolos.append(simbolo)
+            reemplazos[f.diff(variable, k) if k else f] = simbolo
+
+    # Reemplazar primero las derivadas de mayor orden
+    por_orden = sorted(reemplazos.items(),
+                       key=lambda par: -par[0].derivative_count if isinstance(par[0], sp.Derivative) else 0)
+    lado_derecho = []
+    for f in funciones:
+        for k in range(ordenes[f]):
+            if k < ordenes[f] - 1:
+                lado_derecho.append(reemplazos[f.diff(variable, k + 1)])
+            else:
+                lado_derecho.append(despeje[f.diff(variable, ordenes[f])].subs(por_orden))
+    return SistemaEDO(estado, simbolos, lado_derecho, variable)
+
+
+# ============= MÉTODOS DE PASO =============
+
+# Tabla de Butcher de Dormand-Prince 5(4)
+_DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+_DP_A = [
+    [],
+    [1/5],
+    [3/40, 9/40],
+    [44/45, -56/15, 32/9],
+    [19372/6561, -25360/2187, 64448/6561, -212/729],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+    [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84],
+]
+_DP_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+_DP_E = _DP_B - np.array([5179/57600, 0, 7571/16695, 393/640, -92097/339200, 187/2100, 1/40])
+
+
+def _paso_rk45(sistema, t, y, fy, h):
+    """Un paso de Dormand-Prince; devuelve (y_nuevo, f_nuevo, error)"""
+    k = [fy]
+    for i in range(1, 7):
+        incremento = sum(a * ki for a, ki in zip(_DP_A[i], k))
+        k.append(sistema.f(t + _DP_C[i] * h, y + h * incremento))
+    y_nuevo = y + h * sum(b * ki for b, ki in zip(_DP_B, k))
+    error = h * sum(e * ki for e, ki in zip(_DP_E, k))
+    return y_nuevo, k[6], error
+
+
+_ROS2_GAMMA = 1 + 1 / np.sqrt(2)
+
+
+def _paso_ros2(sistema, t, y, fy, h):
+    """
+    Un paso del método de Rosenbrock ROS2 (L-estable, orden 2). El error
+    se estima contra Euler linealmente implícito (orden 1).
+    """
+    identidad = np.eye(y.shape[-1])
+    W = identidad - _ROS2_GAMMA * h * sistema.jacobiano(t, y)
+    # Término de ∂F/∂x para ecuaciones no autónomas
+    gft = _ROS2_GAMMA * h * sistema.derivada_x(t, y)
+    k1 = np.linalg.solve(W, (fy + gft)[..., None])[..., 0]
+    k2 = np.linalg.solve(W, (sistema.f(t + h, y + h * k1) - 2 * k1 - gft)[..., None])[..., 0]
+    y_nuevo = y + h * (1.5 * k1 + 0.5 * k2)
+    return y_nuevo, sistema.f(t + h, y_nuevo), 0.5 * h * (k1 + k2)
+
+
+_PASOS = {'rk45': (_paso_rk45, 5), 'rigido': (_paso_ros2, 2)}
+
+
+# ============= INTEGRACIÓN =============
+
+def integrar(sistema, x0, y0, grilla, metodo='rk45', rtol=1e-6, atol=1e-9, max_pasos=100000):
+    """
+    Integra el sistema desde (x0, y0) y genera (x, Y) para cada punto de
+    la grilla a medida que se alcanza. Los pasos se acortan para caer
+    exactamente sobre los puntos de la grilla.
+
+    y0 puede ser un estado de forma (n,) o un lote de estados (B, n): todo
+    el lote avanza con un mismo paso, controlado por la trayectoria con
+    mayor error.
+    """
+    if metodo not in _PASOS:
+        raise ValueError(f"Método desconocido: {metodo}")
+    paso, orden = _PASOS[metodo]
+
+    grilla = np.asarray(grilla, dtype=float)
+    if np.any(np.diff(grilla) <= 0) or grilla[0] < x0:
+        raise ValueError("La grilla debe ser creciente y empezar en x0 o después")
+    y = np.array(y0, dtype=float)
+    unico = y.ndim == 1
+    y = np.atleast_2d(y)
+    if y.shape[-1] != sistema.dimension:
+        raise ValueError(f"Se esperaban {sistema.dimension} valores iniciales ({', '.join(sistema.estado)})")
+
+    t = float(x0)
+    fy = sistema.f(t, y)
+    h = (grilla[-1] - t) / 100 or 1e-3
+    indice = 0
+    while indice < len(grilla) and grilla[indice] == t:
+        yield t, (y[0] if unico else y).copy()
+        indice += 1
+
+    for _ in range(max_pasos):
+        if indice >= len(grilla):
+            return
+        objetivo = grilla[indice]
+        h_usado = min(h, objetivo - t)
+        y_nuevo, f_nuevo, error = paso(sistema, t, y, fy, h_usado)
+        escala = atol + rtol * np.maximum(np.abs(y), np.abs(y_nuevo))
+        norma = np.max(np.sqrt(np.mean((error / escala)**2, axis=-1)))
+        if not np.isfinite(norma):
+            norma = np.inf
+
+        if norma <= 1:
+            llego = h_usado == objetivo - t
+            t = objetivo if llego else t + h_usado
+            y, fy = y_nuevo, f_nuevo
+            if llego:
+                yield t, (y[0] if unico else y).copy()
+                indice += 1
+
+        # Un paso acortado por la grilla y aceptado no dice nada sobre h: se conserva
+        factor = 5.0 if norma == 0 else 0.9 * norma ** (-1 / orden)
+        if norma > 1 or h_usado == h:
+            h = h_usado * min(5.0, max(0.2, factor))
+        if h < 1e-14 * max(1.0, abs(t)):
+            raise RuntimeError(f"El paso se volvió demasiado chico en x = {t}")
+
+    raise RuntimeError(f"Se superó el máximo de {max_pasos} pasos en x = {t}")
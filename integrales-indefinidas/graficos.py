@@ -0,0 +1,169 @@
+"""
+Gráficos de la CalculadoraAnalisisII sin interfaz gráfica.
+
+Las funciones se muestrean con las funciones de NumPy ya compiladas,
+agregando puntos sólo donde la curva se dobla o salta, y las figuras se
+dibujan fuera de pantalla con el backend Agg de matplotlib. No se usa
+pyplot: cada figura es independiente y se libera al terminar, así un
+servidor puede generar muchas sin estado global ni ventanas.
+"""
+import io
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_svg import FigureCanvasSVG
+from matplotlib.figure import Figure
+
+FORMATOS = {'png': FigureCanvasAgg, 'svg': FigureCanvasSVG}
+
+
+# ============= MUESTREO ADAPTATIVO =============
+
+def _escala(y):
+    """Rango típico de los valores, sin que los polos lo dominen"""
+    finitos = y[np.isfinite(y)]
+    if finitos.size == 0:
+        return 1.0
+    bajo, alto = np.percentile(finitos, [2, 98])
+    return float(alto - bajo) or max(1.0, float(np.abs(finitos).max()))
+
+
+def muestrear(f, a, b, puntos=129, max_nivel=10, tol=2e-3):
+    """
+    Muestrea f (vectorizada) en [a, b] y devuelve (x, y).
+
+    Parte de una grilla uniforme y, nivel por nivel, evalúa juntos los
+    puntos medios de los intervalos donde la curva se aparta de la recta
+    más de tol (relativo a la escala de la función) o pasa de valores
+    finitos a no finitos. Los saltos que no se achican al partir el
+    intervalo (discontinuidades y polos) se cortan con un NaN para que
+    no se dibujen como rectas verticales.
+    """
+    x = np.linspace(float(a), float(b), puntos)
+    with np.errstate(all='ignore'):
+        y = np.asarray(f(x), dtype=float)
+    umbral = tol * _escala(y)
+    marcados = np.ones(len(x) - 1, dtype=bool)
+    salto_padre = np.zeros(len(x) - 1)
+
+    for _ in range(max_nivel):
+        indices = np.nonzero(marcados)[0]
+        if indices.size == 0:
+            break
+        xm = (x[indices] + x[indices + 1]) / 2
+        with np.errstate(all='ignore'):
+            ym = np.asarray(f(xm), dtype=float)
+        izq, der = y[indices], y[indices + 1]
+        finitos = np.isfinite(izq) & np.isfinite(der) & np.isfinite(ym)
+        desvio = np.abs(ym - (izq + der) / 2)
+        refinar = np.where(finitos, desvio > umbral,
+                           np.isfinite(izq) != np.isfinite(der))
+
+        # Se insertan todos los puntos medios; sólo se siguen mirando las
+        # dos mitades de los intervalos que hubo que refinar
+        x = np.insert(x, indices + 1, xm)
+        y = np.insert(y, indices + 1, ym)
+        mitades = indices + np.arange(indices.size)
+        marcados = np.zeros(len(x) - 1, dtype=bool)
+        salto_padre = np.zeros(len(x) - 1)
+        for mitad in (mitades[refinar], mitades[refinar] + 1):
+            marcados[mitad] = True
+            salto_padre[mitad] = np.abs(der - izq)[refinar]
+
+    # En una curva continua el salto de la mitad es cerca de la mitad del
+    # salto del padre; en una discontinuidad queda igual
+    salto = np.abs(np.diff(y))
+    with np.errstate(invalid='ignore'):
+        saltos = np.nonzero(marcados & (salto > umbral) & (salto > 0.9 * salto_padre))[0]
+    if saltos.size:
+        x = np.insert(x, saltos + 1, (x[saltos] + x[saltos + 1]) / 2)
+        y = np.insert(y, saltos + 1, np.nan)
+    y[~np.isfinite(y)] = np.nan
+    x.setflags(write=False)
+    y.setflags(write=False)
+    return x, y
+
+
+# ============= FIGURAS =============
+
+def nueva_figura(ancho=6.4, alto=4.8, dpi=100):
+    """Figura fuera de pantalla con un único par de ejes"""
+    figura = Figure(figsize=(ancho, alto), dpi=dpi)
+    eje = figura.add_subplot()
+    eje.grid(True, alpha=0.3)
+    eje.axhline(0, color='gray', linewidth=0.8)
+    return figura, eje
+
+
+def _limitar_y(eje, *curvas):
+    """
+    Ajusta el eje y al rango típico de las curvas (los polos no lo
+    aplastan). El rango se mide sobre una grilla uniforme, porque el
+    muestreo adaptativo concentra puntos justamente cerca de los polos.
+    """
+    uniformes = [np.interp(np.linspace(xs[0], xs[-1], 512), xs, ys) for xs, ys in curvas]
+    valores = np.concatenate([y[np.isfinite(y)] for y in uniformes])
+    if valores.size == 0:
+        return
+    bajo, alto = np.percentile(valores, [2, 98])
+    margen = 0.5 * (alto - bajo) or 1.0
+    bajo, alto = max(valores.min(), bajo - margen), min(valores.max(), alto + margen)
+    relleno = 0.05 * (alto - bajo) or 1.0
+    eje.set_ylim(bajo - relleno, alto + relleno)
+
+
+def figura_area(curva_1, curva_2, relleno, a, b, titulo=None):
+    """
+    Dibuja dos curvas y sombrea el área entre ellas en [a, b].
+    curva_1 y curva_2 son (etiqueta, x, y); relleno es (x, y1, y2)
+    sobre una grilla común del intervalo.
+    """
+    figura, eje = nueva_figura()
+    for etiqueta, xs, ys in (curva_1, curva_2):
+        eje.plot(xs, ys, label=etiqueta)
+    x_relleno, y1, y2 = relleno
+    eje.fill_between(x_relleno, y1, y2, alpha=0.3, label="Área")
+    for limite in (a, b):
+        eje.axvline(limite, color='gray', linestyle='--', linewidth=0.8)
+    _limitar_y(eje, curva_1[1:], curva_2[1:])
+    eje.set_title(titulo or f"Área entre curvas en [{a:g}, {b:g}]")
+    eje.legend()
+    return figura
+
+
+def figura_taylor(funcion, aproximaciones, punto, titulo=None):
+    """
+    Dibuja la función y sus polinomios de Taylor.
+    funcion es (etiqueta, x, y) y aproximaciones una lista de tuplas iguales.
+    """
+    figura, eje = nueva_figura()
+    etiqueta, xs, ys = funcion
+    eje.plot(xs, ys, color='black', linewidth=2, label=etiqueta)
+    for etiqueta_p, xp, yp in aproximaciones:
+        eje.plot(xp, yp, linestyle='--', label=etiqueta_p)
+    eje.axvline(punto, color='gray', linestyle=':', linewidth=0.8)
+    _limitar_y(eje, (xs, ys))
+    eje.set_title(titulo or f"Aproximaciones de Taylor en x = {punto:g}")
+    eje.legend()
+    return figura
+
+
+# ============= EXPORTACIÓN =============
+
+def exportar(figura, ruta=None, formato=None):
+    """
+    Dibuja la figura en PNG o SVG. Con ruta la escribe en el archivo y
+    devuelve la ruta; sin ruta devuelve los bytes de la imagen.
+    """
+    if formato is None:
+        formato = ruta.rsplit('.', 1)[-1].lower() if ruta and '.' in ruta else 'png'
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato} (use {', '.join(FORMATOS)})")
+    lienzo = FORMATOS[formato](figura)
+    if ruta is not None:
+        with open(ruta, 'wb') as archivo:
+            lienzo.print_figure(archivo, format=formato)
+        return ruta
+    memoria = io.BytesIO()
+    lienzo.print_figure(memoria, format=formato)
+    return memoria.getvalue()
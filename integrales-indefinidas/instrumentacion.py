@@ -0,0 +1,249 @@
+"""
+Instrumentación opcional de la CalculadoraAnalisisII.
+
+Registra, por operación, el tiempo de cada llamada, el tamaño de la
+expresión de entrada y si se resolvió desde la caché, y por etapa
+(sympify, integrate, solve, lambdify, texto...) el tiempo de cálculo
+efectivo. Todo se acumula en histogramas en memoria que se exportan como
+texto de Prometheus o como JSON. Con umbral_perfil las operaciones corren
+bajo cProfile y se guarda el perfil de las que tardan más que el umbral.
+
+Uso:
+    instrumentacion = Instrumentacion(umbral_perfil=0.5, carpeta_perfiles='perfiles')
+    calc = CalculadoraAnalisisII(instrumentacion=instrumentacion)
+    ...
+    print(instrumentacion.exportar_prometheus())
+"""
+import bisect
+import contextlib
+import cProfile
+import json
+import os
+import threading
+import time
+
+# Límites superiores de los baldes de tiempo (segundos) y de tamaño (nodos)
+BALDES_SEGUNDOS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BALDES_NODOS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# Funciones de SymPy que dan nombre a la etapa de un cálculo cacheado
+ETAPAS_SYMPY = ('integrate', 'dsolve', 'solve', 'limit', 'series', 'summation', 'simplify')
+
+PREFIJO = 'calculadora'
+
+
+class Histograma:
+    """Histograma acumulativo de baldes fijos, como los de Prometheus"""
+
+    __slots__ = ('limites', 'baldes', 'cantidad', 'suma', 'minimo', 'maximo')
+
+    def __init__(self, limites):
+        self.limites = limites
+        # Un balde por límite más el de +Inf
+        self.baldes = [0] * (len(limites) + 1)
+        self.cantidad = 0
+        self.suma = 0.0
+        self.minimo = float('inf')
+        self.maximo = float('-inf')
+
+    def observar(self, valor):
+        self.baldes[bisect.bisect_left(self.limites, valor)] += 1
+        self.cantidad += 1
+        self.suma += valor
+        self.minimo = min(self.minimo, valor)
+        self.maximo = max(self.maximo, valor)
+
+    def acumulados(self):
+        """[(límite, observaciones ≤ límite), ...] terminando en +Inf"""
+        total = 0
+        resultado = []
+        for limite, cantidad in zip(self.limites + (float('inf'),), self.baldes):
+            total += cantidad
+            resultado.append((limite, total))
+        return resultado
+
+    def cuantil(self, q):
+        """Cuantil aproximado: límite superior del balde que lo contiene"""
+        if not self.cantidad:
+            return None
+        objetivo = q * self.cantidad
+        for limite, acumulado in self.acumulados():
+            if acumulado >= objetivo:
+                return min(limite, self.maximo)
+        return self.maximo
+
+    def a_dict(self):
+        return {
+            'cantidad': self.cantidad, 'suma': self.suma,
+            'minimo': self.minimo if self.cantidad else None,
+            'maximo': self.maximo if self.cantidad else None,
+            'p50': self.cuantil(0.5), 'p95': self.cuantil(0.95), 'p99': self.cuantil(0.99),
+            'baldes': {_formatear(limite): acumulado for limite, acumulado in self.acumulados()},
+        }
+
+
+def _formatear(limite):
+    return '+Inf' if limite == float('inf') else repr(limite)
+
+
+def _etiqueta(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Instrumentacion:
+    """
+    Métricas en memoria de una o varias calculadoras.
+
+    umbral_perfil: segundos a partir de los cuales se guarda el perfil
+    cProfile de una operación (None desactiva el perfilado)
+    carpeta_perfiles: dónde escribir los .prof; si es None los perfiles
+    sólo quedan en self.perfiles
+    """
+
+    def __init__(self, umbral_perfil=None, carpeta_perfiles=None):
+        self.umbral_perfil = umbral_perfil
+        self.carpeta_perfiles = carpeta_perfiles
+        self.operaciones = {}
+        self.tamanos = {}
+        self.etapas = {}
+        # (operacion, 'acierto' | 'fallo') -> llamadas
+        self.cache = {}
+        self.errores = {}
+        # [(operacion, segundos, ruta o pstats.Stats), ...]
+        self.perfiles = []
+        self._cerrojo = threading.Lock()
+        self._local = threading.local()
+
+    # ============= REGISTRO =============
+
+    def _observar(self, tabla, nombre, limites, valor):
+        with self._cerrojo:
+            histograma = tabla.get(nombre)
+            if histograma is None:
+                histograma = tabla[nombre] = Histograma(limites)
+            histograma.observar(valor)
+
+    def _contar(self, tabla, clave):
+        with self._cerrojo:
+            tabla[clave] = tabla.get(clave, 0) + 1
+
+    @contextlib.contextmanager
+    def operacion(self, nombre, cache=None):
+        """
+        Mide una llamada a la operación. El bloque recibe un dict donde
+        puede anotar 'tamano' (nodos de la expresión) y 'error'. Las
+        operaciones anidadas se miden pero sólo la exterior se perfila.
+        """
+        registro = {}
+        profundidad = getattr(self._local, 'profundidad', 0)
+        perfil = cProfile.Profile() if self.umbral_perfil is not None and profundidad == 0 else None
+        fallos = cache.fallos if cache is not None else 0
+        self._local.profundidad = profundidad + 1
+        inicio = time.perf_counter()
+        try:
+            if perfil is not None:
+                perfil.enable()
+            try:
+                yield registro
+            finally:
+                if perfil is not None:
+                    perfil.disable()
+        finally:
+            segundos = time.perf_counter() - inicio
+            self._local.profundidad = profundidad
+            self._observar(self.operaciones, nombre, BALDES_SEGUNDOS, segundos)
+            if 'tamano' in registro:
+                self._observar(self.tamanos, nombre, BALDES_NODOS, registro['tamano'])
+            if cache is not None:
+                # Una llamada sin fallos se resolvió entera desde la caché
+                self._contar(self.cache, (nombre, 'fallo' if cache.fallos > fallos else 'acierto'))
+            if registro.get('error'):
+                self._contar(self.errores, nombre)
+            if perfil is not None and segundos >= self.umbral_perfil:
+                self._guardar_perfil(nombre, segundos, perfil)
+
+    @contextlib.contextmanager
+    def etapa(self, nombre):
+        """Mide una etapa del cálculo (sympify, integrate, solve, texto...)"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._observar(self.etapas, nombre, BALDES_SEGUNDOS, time.perf_counter() - inicio)
+
+    def _guardar_perfil(self, nombre, segundos, perfil):
+        if self.carpeta_perfiles is None:
+            import pstats
+            destino = pstats.Stats(perfil)
+        else:
+            os.makedirs(self.carpeta_perfiles, exist_ok=True)
+            destino = os.path.join(self.carpeta_perfiles,
+                                   f"{nombre}-{time.strftime('%Y%m%d-%H%M%S')}-{len(self.perfiles)}.prof")
+            perfil.dump_stats(destino)
+        with self._cerrojo:
+            self.perfiles.append((nombre, segundos, destino))
+
+    def limpiar(self):
+        """Descarta todas las métricas y perfiles acumulados"""
+        with self._cerrojo:
+            for tabla in (self.operaciones, self.tamanos, self.etapas, self.cache, self.errores):
+                tabla.clear()
+            self.perfiles.clear()
+
+    # ============= EXPORTACIÓN =============
+
+    def a_dict(self):
+        """Métricas como diccionario serializable"""
+        with self._cerrojo:
+            return {
+                'operaciones': {
+                    nombre: {
+                        'segundos': histograma.a_dict(),
+                        'nodos': self.tamanos[nombre].a_dict() if nombre in self.tamanos else None,
+                        'cache': {resultado: self.cache.get((nombre, resultado), 0)
+                                  for resultado in ('acierto', 'fallo')},
+                        'errores': self.errores.get(nombre, 0),
+                    }
+                    for nombre, histograma in sorted(self.operaciones.items())
+                },
+                'etapas': {nombre: histograma.a_dict() for nombre, histograma in sorted(self.etapas.items())},
+                'perfiles': [{'operacion': nombre, 'segundos': segundos,
+                              'ruta': destino if isinstance(destino, str) else None}
+                             for nombre, segundos, destino in self.perfiles],
+            }
+
+    def exportar_json(self, indentacion=None):
+        return json.dumps(self.a_dict(), ensure_ascii=False, indent=indentacion)
+
+    def exportar_prometheus(self):
+        """Métricas en el formato de texto de Prometheus"""
+        lineas = []
+        with self._cerrojo:
+            self._histogramas(lineas, 'operacion_segundos', 'Duración de cada operación',
+                              'operacion', self.operaciones)
+            self._histogramas(lineas, 'expresion_nodos', 'Nodos de la expresión de entrada',
+                              'operacion', self.tamanos)
+            self._histogramas(lineas, 'etapa_segundos', 'Duración de cada etapa de cálculo',
+                              'etapa', self.etapas)
+            nombre = f'{PREFIJO}_cache_llamadas_total'
+            lineas += [f'# HELP {nombre} Llamadas resueltas desde la caché (acierto) o calculadas (fallo)',
+                       f'# TYPE {nombre} counter']
+            lineas += [f'{nombre}{{operacion="{_etiqueta(operacion)}",resultado="{resultado}"}} {cantidad}'
+                       for (operacion, resultado), cantidad in sorted(self.cache.items())]
+            nombre = f'{PREFIJO}_errores_total'
+            lineas += [f'# HELP {nombre} Operaciones que terminaron con error', f'# TYPE {nombre} counter']
+            lineas += [f'{nombre}{{operacion="{_etiqueta(operacion)}"}} {cantidad}'
+                       for operacion, cantidad in sorted(self.errores.items())]
+        return "\n".join(lineas) + "\n"
+
+    @staticmethod
+    def _histogramas(lineas, metrica, ayuda, etiqueta, tabla):
+        nombre = f'{PREFIJO}_{metrica}'
+        lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} histogram']
+        for clave, histograma in sorted(tabla.items()):
+            etiquetas = f'{etiqueta}="{_etiqueta(clave)}"'
+            for limite, acumulado in histograma.acumulados():
+                lineas.append(f'{nombre}_bucket{{{etiquetas},le="{_formatear(limite)}"}} {acumulado}')
+            lineas.append(f'{nombre}_sum{{{etiquetas}}} {histograma.suma!r}')
+            lineas.append(f'{nombre}_count{{{etiquetas}}} {histograma.cantidad}')
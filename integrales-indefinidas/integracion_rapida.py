@@ -0,0 +1,167 @@
+"""
+Vía rápida de integración para la CalculadoraAnalisisII.
+
+Reconoce en el árbol ya parseado las formas más comunes (polinomios,
+exp, sin, cos, potencias y cocientes de binomios lineales) y las integra
+término a término con una tabla, sin pasar por sp.integrate. Lo que no
+reconoce se deja para el integrador general de SymPy.
+"""
+import sympy as sp
+
+
+def _lineal(arg, x):
+    """
+    Devuelve (a, b) si arg = a*x + b con a ≠ 0, o None. Con un
+    coeficiente simbólico (exp(k*x)) hace falta que a ≠ 0 sea seguro: si
+    no, la primitiva depende del valor de k y la calcula sp.integrate.
+    """
+    b, resto = arg.as_independent(x, as_Add=True)
+    a = resto / x
+    if a.has(x) or a.is_zero is not False:
+        return None
+    return a, b
+
+
+class IntegradorRapido:
+    """
+    Integrador por tabla para formas elementales.
+
+    Attributes:
+        rapidas (int): Integrales resueltas por la vía rápida
+        generales (int): Integrales que hubo que mandar a sp.integrate
+    """
+
+    def __init__(self):
+        self.rapidas = 0
+        self.generales = 0
+
+    # ============= TABLA =============
+
+    def _primitiva_termino(self, factor, x):
+        """
+        Primitiva de un término sin coeficiente constante, o None.
+        Devuelve (primitiva, singular) donde singular es None o un par
+        (base, estricta): la base lineal no puede ser negativa en el
+        intervalo de integración y, si estricta, tampoco anularse.
+        """
+        if factor == 1:
+            return x, None
+        if factor == x:
+            return x**2 / 2, None
+
+        if isinstance(factor, sp.Pow):
+            base, exponente = factor.args
+            lineal = _lineal(base, x)
+            if lineal is None or exponente.has(x):
+                return None
+            a, _ = lineal
+            if exponente == -1:
+                return sp.log(base) / a, (base, True)
+            if (exponente + 1).is_zero is not False:
+                # x**n con n simbólico: para n = -1 la primitiva es otra
+                return None
+            primitiva = base**(exponente + 1) / (a * (exponente + 1))
+            if exponente.is_integer and exponente.is_nonnegative:
+                return primitiva, None
+            return primitiva, (base, bool(exponente.is_negative))
+
+        if isinstance(factor, (sp.exp, sp.sin, sp.cos)):
+            lineal = _lineal(factor.args[0], x)
+            if lineal is None:
+                return None
+            a, _ = lineal
+            if isinstance(factor, sp.exp):
+                return factor / a, None
+            if isinstance(factor, sp.sin):
+                return -sp.cos(factor.args[0]) / a, None
+            return sp.sin(factor.args[0]) / a, None
+
+        return None
+
+    def _primitiva(self, expr, x, expandir=True):
+        """Primitiva término a término; devuelve (primitiva, singulares) o None"""
+        if not expr.has(x):
+            return expr * x, []
+
+        primitiva = sp.S.Zero
+        singulares = []
+        for termino in sp.Add.make_args(expr):
+            coeficiente, factor = termino.as_independent(x, as_Add=False)
+            parcial = self._primitiva_termino(factor, x)
+            if parcial is None:
+                parcial = self._primitiva_compuesta(factor, x, expandir)
+                if parcial is None:
+                    return None
+                factor_primitiva, singulares_factor = parcial
+                singulares.extend(singulares_factor)
+            else:
+                factor_primitiva, singular = parcial
+                if singular is not None:
+                    singulares.append(singular)
+            primitiva += coeficiente * factor_primitiva
+        return primitiva, singulares
+
+    def _primitiva_compuesta(self, factor, x, expandir):
+        """Productos de polinomios y cocientes con denominador lineal"""
+        if not expandir:
+            return None
+        if factor.is_polynomial(x):
+            return self._primitiva(sp.expand(factor), x, expandir=False)
+        if factor.is_rational_function(x):
+            numerador, denominador = sp.fraction(sp.together(factor))
+            if not denominador.is_polynomial(x) or sp.degree(denominador, x) != 1:
+                return None
+            cociente, resto = sp.div(numerador, denominador, x)
+            return self._primitiva(sp.expand(cociente) + resto / denominador, x, expandir=False)
+        return None
+
+    # ============= INTEGRACIÓN =============
+
+    def integrar(self, expr, x):
+        """Primitiva de expr respecto de x, o None si no es una forma conocida"""
+        try:
+            resultado = self._primitiva(expr, x)
+        except (sp.PolynomialError, TypeError, ValueError):
+            resultado = None
+        if resultado is None:
+            self.generales += 1
+            return None
+        self.rapidas += 1
+        return resultado[0]
+
+    def integrar_definida(self, expr, x, a, b):
+        """
+        Integral de expr entre a y b por regla de Barrow, o None si la
+        forma no es conocida o el integrando no es continuo en [a, b].
+        """
+        a, b = sp.sympify(a), sp.sympify(b)
+        try:
+            resultado = None
+            if a.is_finite and b.is_finite and a.is_real and b.is_real:
+                resultado = self._primitiva(expr, x)
+            if resultado is not None:
+                primitiva, singulares = resultado
+                for base, estricta in singulares:
+                    # Al ser lineal, basta mirar el signo de la base en los extremos
+                    extremos = (base.subs(x, a), base.subs(x, b))
+                    if not all(v > 0 if estricta else v >= 0 for v in extremos):
+                        resultado = None
+                        break
+        except (sp.PolynomialError, TypeError, ValueError):
+            resultado = None
+        if resultado is None:
+            self.generales += 1
+            return None
+        self.rapidas += 1
+        return primitiva.subs(x, b) - primitiva.subs(x, a)
+
+    # ============= ESTADÍSTICAS =============
+
+    def estadisticas(self):
+        """Cantidad de integrales por cada vía y proporción resuelta por la rápida"""
+        total = self.rapidas + self.generales
+        return {
+            'rapidas': self.rapidas,
+            'generales': self.generales,
+            'tasa_rapida': self.rapidas / total if total else 0.0,
+        }
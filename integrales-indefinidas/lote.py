@@ -0,0 +1,188 @@
+"""
+Procesamiento en lote (sin interfaz) de la CalculadoraAnalisisII.
+
+Lee trabajos desde JSONL o CSV, los reparte en un ProcessPoolExecutor
+y devuelve los resultados estructurados a medida que están listos.
+
+Formato JSONL (una línea por trabajo):
+    {"id": "e1", "operacion": "integral_definida", "argumentos": ["x**2", 0, 2],
+     "opciones": {"modo": "auto"}}
+
+Formato CSV: columnas "operacion" e "id" (opcional); el resto de las
+columnas son los argumentos posicionales en orden de encabezado.
+
+Uso:
+    python lote.py trabajos.jsonl -o resultados.jsonl --procesos 8
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from resultados import Resultado
+
+# Operaciones de la calculadora que se pueden pedir en un lote
+OPERACIONES = (
+    'integral_indefinida', 'integral_sustitucion', 'integral_por_partes',
+    'integral_definida', 'area_entre_curvas', 'ecuacion_diferencial_separable',
+    'ecuacion_diferencial_numerica',
+    'integral_multiple', 'derivada_parcial', 'gradiente', 'jacobiano', 'hessiana',
+    'puntos_criticos', 'lagrange',
+    'limite_sucesion', 'suma_serie_geometrica', 'analizar_serie', 'serie_taylor',
+    'convergencia_taylor',
+    'excedente_consumidor', 'excedente_productor', 'interes_compuesto',
+    'excedente_consumidor_lote', 'excedente_productor_lote', 'equilibrio_mercado',
+    'cronograma_interes_compuesto',
+    'graficar_area', 'graficar_taylor',
+)
+
+# Calculadora propia de cada proceso trabajador (conserva su caché entre trabajos)
+_calculadora = None
+
+
+# ============= LECTURA DE TRABAJOS =============
+
+def _valor_csv(texto):
+    """Interpreta una celda CSV como JSON (números, null) o la deja como texto"""
+    try:
+        return json.loads(texto)
+    except ValueError:
+        return texto
+
+
+def leer_trabajos(ruta):
+    """Genera los trabajos de un archivo .jsonl o .csv ('-' lee JSONL de stdin)"""
+    if ruta == '-':
+        for linea in sys.stdin:
+            if linea.strip():
+                yield json.loads(linea)
+        return
+
+    with open(ruta, newline='', encoding='utf-8') as archivo:
+        if ruta.lower().endswith('.csv'):
+            for fila in csv.DictReader(archivo):
+                operacion = fila.pop('operacion')
+                id_trabajo = fila.pop('id', None)
+                argumentos = [_valor_csv(v) for v in fila.values() if v not in (None, '')]
+                yield {'id': id_trabajo, 'operacion': operacion, 'argumentos': argumentos}
+        else:
+            for linea in archivo:
+                if linea.strip():
+                    yield json.loads(linea)
+
+
+# ============= EJECUCIÓN =============
+
+def _inicializar(opciones):
+    """Crea la calculadora del proceso trabajador"""
+    global _calculadora
+    from calculadora_analisis import CalculadoraAnalisisII
+    _calculadora = CalculadoraAnalisisII(**opciones, salida='objeto')
+
+
+def resolver_trabajo(calc, indice, trabajo):
+    """Ejecuta un trabajo y devuelve su resultado como diccionario"""
+    operacion = trabajo.get('operacion')
+    base = {'indice': indice, 'id': trabajo.get('id')}
+    if operacion not in OPERACIONES:
+        error = f"Operación desconocida: {operacion}"
+        return {**base, **Resultado(error=error, operacion=operacion).a_dict()}
+
+    argumentos = trabajo.get('argumentos', [])
+    opciones = dict(trabajo.get('opciones', {}))
+    if isinstance(argumentos, dict):
+        argumentos, opciones = [], {**argumentos, **opciones}
+
+    try:
+        resultado = getattr(calc, operacion)(*argumentos, **opciones)
+    except Exception as e:
+        # Argumentos que no corresponden a la firma de la operación
+        resultado = Resultado(error=e, operacion=operacion)
+    return {**base, **resultado.a_dict()}
+
+
+def _resolver_bloque(bloque):
+    return [resolver_trabajo(_calculadora, indice, trabajo) for indice, trabajo in bloque]
+
+
+def _en_bloques(trabajos, tamano):
+    bloque = []
+    for item in enumerate(trabajos):
+        bloque.append(item)
+        if len(bloque) == tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def ejecutar_lote(trabajos, procesos=None, ordenado=True, tamano_bloque=8, opciones=None):
+    """
+    Resuelve los trabajos en paralelo y genera sus resultados.
+
+    trabajos: iterable de diccionarios (se consume de a poco)
+    procesos: cantidad de procesos (por defecto, todos los núcleos)
+    ordenado: si es True respeta el orden de entrada; si no, se entregan
+              a medida que terminan
+    tamano_bloque: trabajos que se envían juntos a cada proceso
+    opciones: argumentos para crear cada CalculadoraAnalisisII
+    """
+    procesos = procesos or os.cpu_count() or 1
+    en_vuelo_max = procesos * 4
+    bloques = _en_bloques(trabajos, tamano_bloque)
+
+    with ProcessPoolExecutor(procesos, initializer=_inicializar,
+                             initargs=(opciones or {},)) as ejecutor:
+        pendientes = deque()
+
+        def enviar():
+            for bloque in bloques:
+                pendientes.append(ejecutor.submit(_resolver_bloque, bloque))
+                if len(pendientes) >= en_vuelo_max:
+                    return
+
+        enviar()
+        while pendientes:
+            if ordenado:
+                listos = [pendientes.popleft()]
+            else:
+                hechos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                listos = [f for f in pendientes if f in hechos]
+                for futuro in listos:
+                    pendientes.remove(futuro)
+            for futuro in listos:
+                yield from futuro.result()
+            enviar()
+
+
+# ============= LÍNEA DE COMANDOS =============
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calculadora de Análisis II en lote")
+    parser.add_argument('entrada', help="archivo .jsonl o .csv con los trabajos ('-' para stdin)")
+    parser.add_argument('-o', '--salida', help="archivo JSONL de resultados (por defecto stdout)")
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--bloque', type=int, default=8, help="trabajos por envío a cada proceso")
+    parser.add_argument('--desordenado', action='store_true',
+                        help="entregar los resultados a medida que terminan")
+    parser.add_argument('--modo', choices=('simbolico', 'numerico', 'auto'), default='simbolico')
+    parser.add_argument('--tiempo-limite', type=float, default=None)
+    args = parser.parse_args(argv)
+
+    opciones = {'modo': args.modo, 'tiempo_limite': args.tiempo_limite}
+    salida = open(args.salida, 'w', encoding='utf-8') if args.salida else sys.stdout
+    try:
+        for resultado in ejecutar_lote(leer_trabajos(args.entrada), args.procesos,
+                                       not args.desordenado, args.bloque, opciones):
+            salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            salida.flush()
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Motor de evaluación numérica para la CalculadoraAnalisisII.
+Compila expresiones de SymPy a funciones de NumPy y calcula integrales
+definidas con cuadraturas vectorizadas, incluso en lote, y raíces y
+sistemas de ecuaciones desde muchos puntos a la vez.
+"""
+from functools import lru_cache
+
+import numpy as np
+import sympy as sp
+
+
+def compilar(expr, variables):
+    """
+    Compila una expresión de SymPy a una función vectorizada de NumPy.
+    La función devuelta siempre tiene la forma de sus argumentos, aun
+    cuando la expresión es constante.
+    """
+    variables = tuple(variables)
+    funcion = sp.lambdify(variables, expr, 'numpy')
+
+    def evaluar(*args):
+        args = [np.asarray(arg, dtype=float) for arg in args]
+        valor = np.asarray(funcion(*args), dtype=float)
+        forma = np.broadcast_shapes(*(arg.shape for arg in args)) if args else ()
+        return np.broadcast_to(valor, forma) if valor.shape != forma else valor
+
+    evaluar.expr = expr
+    evaluar.variables = variables
+    return evaluar
+
+
+# ============= GAUSS-LEGENDRE =============
+
+@lru_cache(maxsize=32)
+def nodos_gauss_legendre(n):
+    """Nodos y pesos de Gauss-Legendre de n puntos en [-1, 1]"""
+    nodos, pesos = np.polynomial.legendre.leggauss(n)
+    nodos.setflags(write=False)
+    pesos.setflags(write=False)
+    return nodos, pesos
+
+
+def gauss_legendre(f, a, b, n=32, subintervalos=8):
+    """
+    Cuadratura compuesta de Gauss-Legendre.
+    a y b pueden ser escalares o arreglos: todas las integrales se
+    evalúan en una sola llamada a f.
+    """
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    nodos, pesos = nodos_gauss_legendre(n)
+
+    # Bordes de los subintervalos: forma (..., subintervalos + 1)
+    bordes = a[..., None] + (b - a)[..., None] * np.linspace(0.0, 1.0, subintervalos + 1)
+    izq, der = bordes[..., :-1], bordes[..., 1:]
+    medio = (izq + der) / 2
+    radio = (der - izq) / 2
+
+    # Puntos de evaluación: forma (..., subintervalos, n)
+    puntos = medio[..., None] + radio[..., None] * nodos
+    valores = f(puntos)
+    return (np.sum(valores * pesos, axis=-1) * radio).sum(axis=-1)
+
+
+# ============= SIMPSON ADAPTATIVO =============
+
+def _simpson(fa, fm, fb, h):
+    return h / 6 * (fa + 4 * fm + fb)
+
+
+def simpson_adaptativo(f, a, b, tol=1e-10, max_nivel=50):
+    """
+    Simpson adaptativo vectorizado: en cada nivel se evalúan a la vez los
+    puntos medios de todos los intervalos que todavía no convergieron.
+    Devuelve (valor, error_estimado) con la forma de a y b.
+    """
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    forma = a.shape
+    a, b = a.ravel(), b.ravel()
+    total = np.zeros(a.size)
+    error = np.zeros(a.size)
+
+    indice = np.arange(a.size)
+    m = (a + b) / 2
+    fa, fm, fb = np.split(f(np.concatenate([a, m, b])), 3)
+    entero = _simpson(fa, fm, fb, b - a)
+    tol = np.full(a.size, tol)
+
+    for nivel in range(max_nivel + 1):
+        if indice.size == 0:
+            break
+        lm = (a + m) / 2
+        rm = (m + b) / 2
+        flm, frm = np.split(f(np.concatenate([lm, rm])), 2)
+        izquierda = _simpson(fa, flm, fm, m - a)
+        derecha = _simpson(fm, frm, fb, b - m)
+        diferencia = izquierda + derecha - entero
+
+        listo = (np.abs(diferencia) <= 15 * tol) | (nivel == max_nivel)
+        np.add.at(total, indice[listo], izquierda[listo] + derecha[listo] + diferencia[listo] / 15)
+        np.add.at(error, indice[listo], np.abs(diferencia[listo]) / 15)
+
+        sigue = ~listo
+        indice = np.concatenate([indice[sigue], indice[sigue]])
+        a, m, b = (np.concatenate([a[sigue], m[sigue]]),
+                   np.concatenate([lm[sigue], rm[sigue]]),
+                   np.concatenate([m[sigue], b[sigue]]))
+        fa, fm, fb = (np.concatenate([fa[sigue], fm[sigue]]),
+                      np.concatenate([flm[sigue], frm[sigue]]),
+                      np.concatenate([fm[sigue], fb[sigue]]))
+        entero = np.concatenate([izquierda[sigue], derecha[sigue]])
+        tol = np.concatenate([tol[sigue], tol[sigue]]) / 2
+
+    return total.reshape(forma)[()], error.reshape(forma)[()]
+
+
+# ============= INTEGRACIÓN =============
+
+def _sin_extremos(g):
+    """Anula los valores no finitos que aparecen en los extremos transformados"""
+    def evaluar(t):
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            valor = g(t)
+        return np.where(np.isfinite(valor), valor, 0.0)
+    return evaluar
+
+
+def _cambio_de_variable(f, a, b):
+    """
+    Transforma una integral con límites infinitos en una sobre un
+    intervalo finito. Devuelve (g, a', b') con ∫[a,b] f = ∫[a',b'] g.
+    """
+    if np.isinf(a) and np.isinf(b):
+        signo = 1.0 if b > a else -1.0
+        g = lambda t: signo * f(t / (1 - t**2)) * (1 + t**2) / (1 - t**2)**2
+    elif np.isinf(b):
+        signo = 1.0 if b > 0 else -1.0
+        g = lambda t: signo * f(a + signo * t / (1 - t)) / (1 - t)**2
+    elif np.isinf(a):
+        signo = 1.0 if a < 0 else -1.0
+        g = lambda t: signo * f(b - signo * (1 - t) / t) / t**2
+    else:
+        return f, a, b
+    return _sin_extremos(g), (-1.0 if np.isinf(a) and np.isinf(b) else 0.0), 1.0
+
+
+def integrar(f, a, b, metodo='gauss', tol=1e-10, n=32, subintervalos=8):
+    """
+    Integra numéricamente f entre a y b.
+    Devuelve (valor, error_estimado); si a o b son arreglos el resultado
+    también lo es. Los límites infinitos sólo se admiten en forma escalar.
+    """
+    a_arr = np.asarray(a, dtype=float)
+    b_arr = np.asarray(b, dtype=float)
+
+    if a_arr.ndim == 0 and b_arr.ndim == 0:
+        f, a_arr, b_arr = _cambio_de_variable(f, float(a_arr), float(b_arr))
+    elif not (np.all(np.isfinite(a_arr)) and np.all(np.isfinite(b_arr))):
+        raise ValueError("Los límites de integración en lote deben ser finitos")
+
+    if metodo == 'gauss':
+        grueso = gauss_legendre(f, a_arr, b_arr, n, subintervalos)
+        fino = gauss_legendre(f, a_arr, b_arr, n, 2 * subintervalos)
+        return fino, np.abs(fino - grueso)
+    if metodo == 'simpson':
+        return simpson_adaptativo(f, a_arr, b_arr, tol)
+    raise ValueError(f"Método de integración desconocido: {metodo}")
+
+
+# ============= RAÍCES =============
+
+def raices(f, a, b, muestras=2049, tol=1e-12, max_iter=200):
+    """
+    Raíces de f en [a, b] donde f cambia de signo: se muestrea una grilla,
+    se buscan los cambios de signo entre muestras vecinas y se refinan
+    todos a la vez por bisección. Las raíces de multiplicidad par (f toca
+    el cero sin cruzarlo) no se detectan. Devuelve un arreglo ordenado.
+    """
+    xs = np.linspace(a, b, muestras)
+    with np.errstate(all='ignore'):
+        ys = f(xs)
+    finitos = np.isfinite(ys)
+    exactas = xs[finitos & (ys == 0)]
+    cambio = finitos[:-1] & finitos[1:] & (np.sign(ys[:-1]) * np.sign(ys[1:]) < 0)
+    izq, der = xs[:-1][cambio], xs[1:][cambio]
+    f_izq, f_der = ys[:-1][cambio], ys[1:][cambio]
+    escala = max(np.max(np.abs(ys[finitos])), 1.0) if finitos.any() else 1.0
+
+    for _ in range(max_iter):
+        medio = (izq + der) / 2
+        if np.all(der - izq <= tol * (1 + np.abs(medio))):
+            break
+        with np.errstate(all='ignore'):
+            f_medio = f(medio)
+        mismo = np.sign(f_medio) == np.sign(f_izq)
+        izq, f_izq = np.where(mismo, medio, izq), np.where(mismo, f_medio, f_izq)
+        der, f_der = np.where(mismo, der, medio), np.where(mismo, f_der, f_medio)
+
+    # Paso final de la secante dentro del último intervalo
+    with np.errstate(all='ignore'):
+        medio = izq - f_izq * (der - izq) / (f_der - f_izq)
+    medio = np.where(np.isfinite(medio) & (medio >= izq) & (medio <= der), medio, (izq + der) / 2)
+    with np.errstate(all='ignore'):
+        residuo = np.abs(f(medio))
+    # Un cambio de signo a través de un polo (1/x, tan x) no es una raíz
+    genuinas = np.isfinite(residuo) & (residuo <= 1e-6 * escala)
+    return np.unique(np.concatenate([exactas, medio[genuinas]]))
+
+
+def invertir(f, objetivos, inicio=0.0, paso=1.0, tol=1e-12, max_iter=200):
+    """
+    Resuelve f(x) = y para cada y de objetivos con x ≥ inicio, suponiendo f
+    monótona: el intervalo [inicio, inicio + paso] se duplica hasta que
+    encierra la solución y después se bisecta, todo a la vez para el
+    arreglo entero. Donde no hay solución devuelve nan.
+    """
+    objetivos = np.asarray(objetivos, dtype=float)
+    y = objetivos.ravel()
+    izq = np.full(y.size, float(inicio))
+    der = izq + paso
+    with np.errstate(all='ignore'):
+        g_izq = f(izq) - y
+        for _ in range(64):
+            g_der = f(der) - y
+            abiertos = np.sign(g_der) == np.sign(g_izq)
+            if not abiertos.any():
+                break
+            izq, g_izq = np.where(abiertos, der, izq), np.where(abiertos, g_der, g_izq)
+            der = np.where(abiertos, inicio + 2 * (der - inicio), der)
+        encerrado = (np.sign(g_der) != np.sign(g_izq)) & np.isfinite(g_izq) & np.isfinite(g_der)
+
+        for _ in range(max_iter):
+            medio = (izq + der) / 2
+            if np.all(der - izq <= tol * (1 + np.abs(medio))):
+                break
+            g_medio = f(medio) - y
+            mismo = np.sign(g_medio) == np.sign(g_izq)
+            izq, g_izq = np.where(mismo, medio, izq), np.where(mismo, g_medio, g_izq)
+            der = np.where(mismo, der, medio)
+    return np.where(encerrado, (izq + der) / 2, np.nan).reshape(objetivos.shape)[()]
+
+
+# ============= SISTEMAS DE ECUACIONES =============
+
+def compilar_arreglo(exprs, variables, cse=True):
+    """
+    Compila una lista (o lista de listas) de expresiones en una única
+    función vectorizada. Para argumentos de forma (...) devuelve un
+    arreglo de forma (..., *forma_de_exprs).
+    Con cse las subexpresiones comunes (sp.cse) se calculan una sola vez
+    para todas las componentes, como pasa entre las derivadas de un
+    gradiente o una hessiana.
+    """
+    variables = tuple(variables)
+    objetos = np.empty(np.shape(np.array(exprs, dtype=object)), dtype=object)
+    objetos[...] = exprs
+    forma = objetos.shape
+    planos = list(objetos.ravel())
+    funcion = sp.lambdify(variables, planos, 'numpy', cse=cse)
+
+    def evaluar(*args):
+        args = [np.asarray(arg, dtype=float) for arg in args]
+        base = np.broadcast_shapes(*(arg.shape for arg in args)) if args else ()
+        valores = [np.broadcast_to(np.asarray(v, dtype=float), base) for v in funcion(*args)]
+        return np.stack(valores, axis=-1).reshape(base + forma)
+
+    evaluar.exprs = exprs
+    evaluar.variables = variables
+    return evaluar
+
+
+def grilla_semillas(dominio, por_eje, dimension):
+    """Semillas en una grilla regular de dominio^dimension, forma (N, dimension)"""
+    lo, hi = dominio
+    ejes = [np.linspace(lo, hi, por_eje)] * dimension
+    return np.stack([m.ravel() for m in np.meshgrid(*ejes, indexing='ij')], axis=-1)
+
+
+def resolver_sistema(F, J, semillas, tol=1e-10, max_iter=100):
+    """
+    Resuelve F(X) = 0 con Levenberg-Marquardt desde muchas semillas a la vez.
+
+    F: función compilada que para X de forma (N, d) devuelve (N, m)
+    J: su jacobiano compilado, de forma (N, m, d)
+    semillas: arreglo (N, d) de puntos iniciales
+
+    Devuelve (X, convergio): los puntos finales y una máscara booleana
+    que indica cuáles cumplen |F(X)| < tol.
+    """
+    X = np.array(semillas, dtype=float)
+    n, d = X.shape
+    identidad = np.eye(d)
+    mu = np.full(n, 1e-3)
+
+    def residuo(X):
+        with np.errstate(all='ignore'):
+            r = F(*X.T)
+        r = np.where(np.isfinite(r), r, 1e150)
+        return r, np.sum(r**2, axis=-1)
+
+    r, costo = residuo(X)
+    for _ in range(max_iter):
+        activos = costo >= tol**2
+        if not activos.any():
+            break
+        with np.errstate(all='ignore'):
+            jac = J(*X.T)
+        jac = np.where(np.isfinite(jac), jac, 0.0)
+        jt = np.swapaxes(jac, -1, -2)
+        A = jt @ jac + mu[:, None, None] * identidad
+        g = jt @ r[..., None]
+        paso = -np.linalg.solve(A, g)[..., 0]
+
+        candidato = X + np.where(activos[:, None], paso, 0.0)
+        r_nuevo, costo_nuevo = residuo(candidato)
+        mejora = activos & (costo_nuevo < costo)
+
+        X = np.where(mejora[:, None], candidato, X)
+        r = np.where(mejora[:, None], r_nuevo, r)
+        costo = np.where(mejora, costo_nuevo, costo)
+        mu = np.clip(np.where(mejora, mu / 3, mu * 2), 1e-12, 1e12)
+
+    return X, np.sqrt(costo) < tol
+
+
+def limpiar_ceros(puntos, tol=1e-9):
+    """
+    Pone en 0 las coordenadas que no se distinguen de cero. resolver_sistema
+    para cuando |F| < 1e-10, así que cada coordenada queda con un error de
+    ese orden: el umbral es tol (10 veces la tolerancia del sistema)
+    relativo a la escala del punto, nunca menor que tol.
+    """
+    puntos = np.asarray(puntos, dtype=float)
+    if len(puntos) == 0:
+        return puntos
+    escala = np.maximum(1.0, np.max(np.abs(puntos), axis=-1, keepdims=True))
+    return np.where(np.abs(puntos) < tol * escala, 0.0, puntos)
+
+
+def deduplicar(puntos, tol=1e-6):
+    """Elimina puntos repetidos (a distancia menor que tol), en orden lexicográfico"""
+    puntos = np.asarray(puntos, dtype=float)
+    if len(puntos) == 0:
+        return puntos
+    puntos = puntos[np.lexsort(puntos.T[::-1])]
+    unicos = [puntos[0]]
+    for punto in puntos[1:]:
+        if np.min(np.linalg.norm(np.array(unicos) - punto, axis=-1)) > tol:
+            unicos.append(punto)
+    return np.array(unicos)
+
+
+def clasificar_hessianas(hessianas, tol=1e-9):
+    """
+    Clasifica muchos puntos críticos a la vez por los autovalores de sus
+    hessianas (arreglo (k, d, d)). Devuelve un arreglo de textos.
+    """
+    autovalores = np.linalg.eigvalsh(np.asarray(hessianas, dtype=float))
+    positivos = np.all(autovalores > tol, axis=-1)
+    negativos = np.all(autovalores < -tol, axis=-1)
+    mixtos = np.any(autovalores > tol, axis=-1) & np.any(autovalores < -tol, axis=-1)
+    return np.select([positivos, negativos, mixtos],
+                     ["Mínimo", "Máximo", "Punto silla"], "No concluyente")
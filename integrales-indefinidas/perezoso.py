@@ -0,0 +1,30 @@
+"""
+Importación diferida de módulos pesados (sympy, numpy, matplotlib y los
+módulos de la calculadora que dependen de ellos). El módulo se importa
+recién cuando se usa el primer atributo, así el menú, el cliente del
+servidor y el proceso principal de un lote arrancan sin pagar esos imports.
+"""
+import importlib
+
+
+class ModuloPerezoso:
+    """
+    Representante de un módulo que todavía no se importó.
+    Al primer acceso importa el módulo y copia sus atributos, de modo que
+    los accesos siguientes cuestan lo mismo que con el módulo real.
+    """
+
+    def __init__(self, nombre):
+        self.__dict__['_nombre_modulo'] = nombre
+
+    def __getattr__(self, atributo):
+        # Sólo se llega acá si el atributo todavía no se copió
+        modulo = self.__dict__.get('_modulo')
+        if modulo is None:
+            modulo = importlib.import_module(self._nombre_modulo)
+            self.__dict__.update(vars(modulo))
+            self.__dict__['_modulo'] = modulo
+        return getattr(modulo, atributo)
+
+    def __repr__(self):
+        return f"<módulo perezoso {self._nombre_modulo!r}>"
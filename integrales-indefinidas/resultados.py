@@ -0,0 +1,94 @@
+"""
+Resultados estructurados de la CalculadoraAnalisisII.
+El texto en castellano se arma recién cuando se muestra el resultado,
+así quien sólo necesita el valor no paga el str() de árboles grandes.
+"""
+from perezoso import ModuloPerezoso
+
+sp = ModuloPerezoso('sympy')
+
+
+class Resultado:
+    """
+    Resultado de una operación de la calculadora.
+
+    Attributes:
+        operacion (str): Nombre de la operación que lo produjo
+        valor: Valor crudo (expresión de SymPy, número, tupla o lista)
+        expresion: Expresión de entrada ya parseada
+        datos (dict): Metadatos propios de la operación (límites, notas, etc.)
+        segundos (float): Tiempo que tardó la operación
+        error (str): Mensaje de error, o None si la operación fue exitosa
+    """
+
+    __slots__ = ('operacion', 'valor', 'expresion', 'datos', 'segundos', 'error',
+                 '_plantilla', '_texto')
+
+    def __init__(self, valor=None, plantilla=None, expresion=None, error=None,
+                 operacion=None, segundos=0.0, **datos):
+        """
+        plantilla: función sin argumentos que arma el texto del resultado;
+        sólo se llama la primera vez que se pide el texto
+        """
+        self.operacion = operacion
+        self.valor = valor
+        self.expresion = expresion
+        self.datos = datos
+        self.segundos = segundos
+        self.error = str(error) if error is not None else None
+        self._plantilla = plantilla
+        self._texto = None
+
+    @property
+    def ok(self):
+        """True si la operación terminó sin error"""
+        return self.error is None
+
+    @property
+    def valor_numerico(self):
+        """Valor como float (lista de floats si es un arreglo), o None si no es un número"""
+        if self.valor is None:
+            return None
+        if getattr(self.valor, 'ndim', 0) > 0:
+            return self.valor.astype(float).tolist()
+        try:
+            return float(sp.N(self.valor))
+        except (TypeError, ValueError, AttributeError):
+            return None
+
+    def texto(self):
+        """Texto en castellano del resultado (se arma una sola vez)"""
+        if self._texto is None:
+            if self._plantilla is not None:
+                self._texto = self._plantilla()
+            else:
+                self._texto = f"Error: {self.error}"
+        return self._texto
+
+    def srepr(self):
+        return sp.srepr(self.valor) if self.valor is not None else None
+
+    def latex(self):
+        return sp.latex(self.valor) if self.valor is not None else None
+
+    def a_dict(self):
+        """Representación serializable (JSON) del resultado"""
+        datos = {
+            'operacion': self.operacion, 'ok': self.ok, 'texto': self.texto(),
+            'srepr': None, 'latex': None, 'valor': self.valor_numerico,
+            'segundos': self.segundos, 'error': self.error,
+        }
+        if self.ok:
+            try:
+                datos['srepr'] = self.srepr()
+                datos['latex'] = self.latex()
+            except Exception:
+                pass
+        return datos
+
+    def __str__(self):
+        return self.texto()
+
+    def __repr__(self):
+        estado = "ok" if self.ok else "error"
+        return f"<Resultado {self.operacion} {estado} {self.segundos:.4f} s>"
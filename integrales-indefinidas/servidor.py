@@ -0,0 +1,229 @@
+"""
+Servidor de trabajadores pre-lanzados para la CalculadoraAnalisisII.
+
+El servidor importa sympy y numpy una sola vez, calienta la calculadora
+y recién entonces lanza (fork) los procesos trabajadores, que comparten
+ese intérprete ya cargado y atienden conexiones en un socket Unix. Así
+cada invocación del cliente sólo paga el arranque de Python, no el de
+SymPy. Los trabajos y las respuestas tienen el mismo formato JSONL que
+lote.py.
+
+Uso:
+    python servidor.py iniciar --procesos 4 &
+    echo '{"operacion": "integral_definida", "argumentos": ["x**2", 0, 2]}' | python servidor.py enviar
+    python servidor.py enviar trabajos.jsonl
+    python servidor.py detener
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+
+# Socket por defecto (se puede cambiar con la variable de entorno o --socket)
+RUTA_SOCKET = os.environ.get('CALCULADORA_SOCKET', '/tmp/calculadora_analisis.sock')
+
+
+# ============= TRABAJADORES =============
+
+def _atender(calc, conexion):
+    """Resuelve los trabajos JSONL de una conexión y responde uno por línea"""
+    from lote import resolver_trabajo
+    from resultados import Resultado
+
+    with conexion, conexion.makefile('r', encoding='utf-8') as entrada, \
+            conexion.makefile('w', encoding='utf-8') as salida:
+        for indice, linea in enumerate(entrada):
+            if not linea.strip():
+                continue
+            try:
+                respuesta = resolver_trabajo(calc, indice, json.loads(linea))
+            except (ValueError, AttributeError) as e:
+                # Línea que no es JSON o no es un trabajo
+                respuesta = {'indice': indice, 'id': None, **Resultado(error=e).a_dict()}
+            salida.write(json.dumps(respuesta, ensure_ascii=False) + "\n")
+            salida.flush()
+
+
+def _trabajador(oyente, calc):
+    """Bucle de un proceso trabajador: acepta conexiones hasta recibir SIGTERM"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        conexion, _ = oyente.accept()
+        try:
+            _atender(calc, conexion)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def _lanzar(oyente, calc):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _trabajador(oyente, calc)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def _calentar(opciones):
+    """Crea la calculadora e importa todo lo pesado antes del fork"""
+    from calculadora_analisis import CalculadoraAnalisisII
+    import lote
+
+    calc = CalculadoraAnalisisII(**opciones, salida='objeto')
+    calc.integral_definida("x**2", 0, 1)
+    calc.integral_definida_lote("x", 0, [1.0])
+    return calc
+
+
+def _archivo_pid(ruta):
+    return ruta + '.pid'
+
+
+def _pid_servidor(ruta):
+    """pid del proceso principal del servidor que escucha en ruta"""
+    try:
+        with open(_archivo_pid(ruta)) as archivo:
+            return int(archivo.read())
+    except (FileNotFoundError, ValueError) as e:
+        raise ConnectionError(f"No hay un servidor escuchando en {ruta}") from e
+
+
+def iniciar(ruta=RUTA_SOCKET, procesos=None, opciones=None):
+    """
+    Levanta el servidor en el socket Unix ruta con la cantidad de procesos
+    indicada (por defecto, todos los núcleos). Los trabajadores que mueren
+    se vuelven a lanzar; SIGTERM o SIGINT detienen todo.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    calc = _calentar(opciones or {})
+
+    if os.path.exists(ruta):
+        os.unlink(ruta)
+    oyente = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    oyente.bind(ruta)
+    oyente.listen(128)
+    with open(_archivo_pid(ruta), 'w') as archivo:
+        archivo.write(str(os.getpid()))
+
+    trabajadores = {_lanzar(oyente, calc) for _ in range(procesos)}
+    deteniendo = False
+
+    def detener(senal, marco):
+        nonlocal deteniendo
+        deteniendo = True
+        for pid in trabajadores:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, detener)
+    signal.signal(signal.SIGINT, detener)
+    print(f"Servidor con {procesos} procesos en {ruta} (pid {os.getpid()})", file=sys.stderr)
+    try:
+        while trabajadores:
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                break
+            trabajadores.discard(pid)
+            if not deteniendo:
+                trabajadores.add(_lanzar(oyente, calc))
+    finally:
+        oyente.close()
+        for archivo in (ruta, _archivo_pid(ruta)):
+            if os.path.exists(archivo):
+                os.unlink(archivo)
+
+
+# ============= CLIENTE =============
+
+def enviar(trabajos, ruta=RUTA_SOCKET):
+    """
+    Envía los trabajos (diccionarios, o líneas JSON ya armadas) al
+    servidor y genera las respuestas en orden. El envío va en un hilo aparte para que una entrada grande no
+    se trabe esperando que se lean las respuestas.
+
+    Raises:
+        ConnectionError: si no hay un servidor escuchando en ruta
+    """
+    conexion = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conexion.connect(ruta)
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        conexion.close()
+        raise ConnectionError(f"No hay un servidor escuchando en {ruta}") from e
+
+    def escribir():
+        try:
+            with conexion.makefile('w', encoding='utf-8') as salida:
+                for trabajo in trabajos:
+                    if not isinstance(trabajo, str):
+                        trabajo = json.dumps(trabajo, ensure_ascii=False)
+                    salida.write(trabajo.strip() + "\n")
+        finally:
+            conexion.shutdown(socket.SHUT_WR)
+
+    emisor = threading.Thread(target=escribir, daemon=True)
+    emisor.start()
+    with conexion, conexion.makefile('r', encoding='utf-8') as entrada:
+        for linea in entrada:
+            yield json.loads(linea)
+    emisor.join()
+
+
+def _leer(ruta):
+    if ruta == '-':
+        # Las líneas van tal cual: el servidor responde el error de las que no son JSON
+        for linea in sys.stdin:
+            if linea.strip():
+                yield linea
+    else:
+        from lote import leer_trabajos
+        yield from leer_trabajos(ruta)
+
+
+# ============= LÍNEA DE COMANDOS =============
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor pre-lanzado de la Calculadora de Análisis II")
+    parser.add_argument('--socket', default=RUTA_SOCKET)
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    iniciar_cmd = comandos.add_parser('iniciar', help="levantar el servidor")
+    iniciar_cmd.add_argument('--procesos', type=int, default=None)
+    iniciar_cmd.add_argument('--modo', choices=('simbolico', 'numerico', 'auto'), default='simbolico')
+    iniciar_cmd.add_argument('--tiempo-limite', type=float, default=None)
+
+    enviar_cmd = comandos.add_parser('enviar', help="resolver trabajos en el servidor")
+    enviar_cmd.add_argument('entrada', nargs='?', default='-',
+                            help="archivo .jsonl o .csv con los trabajos (por defecto stdin)")
+
+    comandos.add_parser('detener', help="detener el servidor")
+    args = parser.parse_args(argv)
+
+    if args.comando == 'iniciar':
+        iniciar(args.socket, args.procesos, {'modo': args.modo, 'tiempo_limite': args.tiempo_limite})
+    elif args.comando == 'enviar':
+        try:
+            for respuesta in enviar(_leer(args.entrada), args.socket):
+                print(json.dumps(respuesta, ensure_ascii=False), flush=True)
+        except ConnectionError as e:
+            print(e, file=sys.stderr)
+            return 2
+    else:
+        try:
+            os.kill(_pid_servidor(args.socket), signal.SIGTERM)
+        except (ConnectionError, ProcessLookupError) as e:
+            print(e, file=sys.stderr)
+            return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""
+Series de Taylor incrementales para la CalculadoraAnalisisII.
+
+Los coeficientes de f alrededor de un punto se generan de a uno y quedan
+guardados: pedir orden 5, después 10 y después 20 sólo calcula los
+coeficientes que faltan. Para las operaciones conocidas (suma, producto,
+potencia, exp, log, sin, cos, sinh, cosh) cada coeficiente sale de una
+recurrencia sobre los coeficientes de los argumentos; para el resto se
+derivan y se guardan las derivadas sucesivas. Las sumas parciales y las
+cotas del error se evalúan vectorizadas sobre arreglos de x.
+"""
+import math
+
+import numpy as np
+import sympy as sp
+
+import motor_numerico
+
+
+class SinSerieTaylor(ValueError):
+    """La función no tiene desarrollo de Taylor en el punto (polo, raíz, etc.)"""
+
+
+class _SinRecurrencia(Exception):
+    """La recurrencia no se aplica en este punto; se deriva directamente"""
+
+
+# ============= SERIES PEREZOSAS =============
+
+class _Serie:
+    """Serie de potencias en h = x - punto con los coeficientes memorizados"""
+
+    def __init__(self):
+        self._coeficientes = []
+
+    def coeficiente(self, k):
+        while len(self._coeficientes) <= k:
+            self._coeficientes.append(self._siguiente(len(self._coeficientes)))
+        return self._coeficientes[k]
+
+    def _siguiente(self, k):
+        raise NotImplementedError
+
+
+class _Constante(_Serie):
+    def __init__(self, valor):
+        super().__init__()
+        self.valor = valor
+
+    def _siguiente(self, k):
+        return self.valor if k == 0 else sp.S.Zero
+
+
+class _Variable(_Serie):
+    def __init__(self, punto):
+        super().__init__()
+        self.punto = punto
+
+    def _siguiente(self, k):
+        return (self.punto, sp.S.One)[k] if k < 2 else sp.S.Zero
+
+
+class _Suma(_Serie):
+    def __init__(self, terminos):
+        super().__init__()
+        self.terminos = terminos
+
+    def _siguiente(self, k):
+        return sp.Add(*(t.coeficiente(k) for t in self.terminos))
+
+
+class _Producto(_Serie):
+    def __init__(self, a, b):
+        super().__init__()
+        self.a, self.b = a, b
+
+    def _siguiente(self, k):
+        return sp.Add(*(self.a.coeficiente(j) * self.b.coeficiente(k - j) for j in range(k + 1)))
+
+
+class _Potencia(_Serie):
+    """u**alfa con u(punto) ≠ 0"""
+
+    def __init__(self, u, alfa):
+        super().__init__()
+        self.u, self.alfa = u, alfa
+        self.u0 = u.coeficiente(0)
+        if self.u0 == 0:
+            raise _SinRecurrencia
+
+    def _siguiente(self, k):
+        if k == 0:
+            return self.u0 ** self.alfa
+        suma = sp.Add(*(((self.alfa + 1) * j - k) * self.u.coeficiente(j) * self.coeficiente(k - j)
+                        for j in range(1, k + 1)))
+        return suma / (k * self.u0)
+
+
+class _Exponencial(_Serie):
+    def __init__(self, u):
+        super().__init__()
+        self.u = u
+
+    def _siguiente(self, k):
+        if k == 0:
+            return sp.exp(self.u.coeficiente(0))
+        return sp.Add(*(j * self.u.coeficiente(j) * self.coeficiente(k - j)
+                        for j in range(1, k + 1))) / k
+
+
+class _Logaritmo(_Serie):
+    def __init__(self, u):
+        super().__init__()
+        self.u = u
+        self.u0 = u.coeficiente(0)
+        if self.u0 == 0:
+            raise _SinRecurrencia
+
+    def _siguiente(self, k):
+        if k == 0:
+            return sp.log(self.u0)
+        suma = sp.Add(*(j * self.coeficiente(j) * self.u.coeficiente(k - j) for j in range(1, k)))
+        return (self.u.coeficiente(k) - suma / k) / self.u0
+
+
+class _SenoCoseno(_Serie):
+    """
+    sin(u) y cos(u) (o sinh y cosh con hiperbolica=True) se calculan
+    juntos; esta serie es el seno y .coseno la otra mitad del par.
+    """
+
+    def __init__(self, u, hiperbolica=False):
+        super().__init__()
+        self.u = u
+        self.hiperbolica = hiperbolica
+        self.signo = 1 if hiperbolica else -1
+        self._cosenos = []
+        self.coseno = _Vista(self, self._cosenos)
+
+    def _siguiente(self, k):
+        if k == 0:
+            u0 = self.u.coeficiente(0)
+            seno, coseno = (sp.sinh, sp.cosh) if self.hiperbolica else (sp.sin, sp.cos)
+            self._cosenos.append(coseno(u0))
+            return seno(u0)
+        seno = sp.Add(*(j * self.u.coeficiente(j) * self._cosenos[k - j] for j in range(1, k + 1))) / k
+        coseno = sp.Add(*(j * self.u.coeficiente(j) * self._coeficientes[k - j]
+                          for j in range(1, k + 1))) * self.signo / k
+        self._cosenos.append(coseno)
+        return seno
+
+
+class _Vista(_Serie):
+    """Segunda serie de un par que se calcula junto con otra"""
+
+    def __init__(self, par, lista):
+        super().__init__()
+        self.par = par
+        self._coeficientes = lista
+
+    def coeficiente(self, k):
+        self.par.coeficiente(k)
+        return self._coeficientes[k]
+
+
+class _Derivadas(_Serie):
+    """Coeficientes f^(k)(punto)/k! a partir de derivadas sucesivas guardadas"""
+
+    def __init__(self, expr, variable, punto):
+        super().__init__()
+        self.variable, self.punto = variable, punto
+        self.derivadas = [expr]
+
+    def derivada(self, k):
+        while len(self.derivadas) <= k:
+            self.derivadas.append(sp.diff(self.derivadas[-1], self.variable))
+        return self.derivadas[k]
+
+    def _siguiente(self, k):
+        d = self.derivada(k)
+        valor = d.subs(self.variable, self.punto)
+        if valor.has(sp.nan, sp.zoo, sp.oo, -sp.oo):
+            # Singularidad evitable (por ejemplo sin(x)/x en 0)
+            valor = sp.limit(d, self.variable, self.punto)
+        if valor.is_finite is False:
+            raise SinSerieTaylor(f"{self.derivadas[0]} no tiene serie de Taylor en "
+                                 f"{self.variable}={self.punto}")
+        return valor / sp.factorial(k)
+
+
+# ============= CONSTRUCCIÓN =============
+
+def _construir(expr, x, punto):
+    """Arma la serie perezosa de expr siguiendo su árbol"""
+    if not expr.has(x):
+        return _Constante(expr)
+    if expr == x:
+        return _Variable(punto)
+    if isinstance(expr, sp.Add):
+        return _Suma([_construir(t, x, punto) for t in expr.args])
+    if isinstance(expr, sp.Mul):
+        factores = [_construir(f, x, punto) for f in expr.args]
+        serie = factores[0]
+        for factor in factores[1:]:
+            serie = _Producto(serie, factor)
+        return serie
+    if isinstance(expr, sp.Pow) and not expr.exp.has(x):
+        base = _construir(expr.base, x, punto)
+        if expr.exp.is_Integer and expr.exp > 0 and base.coeficiente(0) == 0:
+            serie = base
+            for _ in range(int(expr.exp) - 1):
+                serie = _Producto(serie, base)
+            return serie
+        return _Potencia(base, expr.exp)
+    if isinstance(expr, sp.exp):
+        return _Exponencial(_construir(expr.args[0], x, punto))
+    if isinstance(expr, sp.log) and len(expr.args) == 1:
+        return _Logaritmo(_construir(expr.args[0], x, punto))
+    if isinstance(expr, (sp.sin, sp.cos, sp.sinh, sp.cosh)):
+        par = _SenoCoseno(_construir(expr.args[0], x, punto),
+                          hiperbolica=isinstance(expr, (sp.sinh, sp.cosh)))
+        return par if isinstance(expr, (sp.sin, sp.sinh)) else par.coseno
+    if isinstance(expr, sp.tan):
+        argumento = _construir(expr.args[0], x, punto)
+        par = _SenoCoseno(argumento)
+        return _Producto(par, _Potencia(par.coseno, sp.S.NegativeOne))
+    return _Derivadas(expr, x, punto)
+
+
+# ============= SERIE DE TAYLOR =============
+
+class SerieTaylor:
+    """
+    Desarrollo de Taylor de f alrededor de punto que crece a pedido.
+
+    Attributes:
+        funcion: Expresión de SymPy desarrollada
+        variable: Símbolo respecto del cual se desarrolla
+        punto: Punto de desarrollo
+    """
+
+    def __init__(self, funcion, variable, punto=0):
+        self.funcion = funcion
+        self.variable = variable
+        self.punto = sp.sympify(punto)
+        try:
+            self._serie = _construir(funcion, variable, self.punto)
+        except _SinRecurrencia:
+            self._serie = _Derivadas(funcion, variable, self.punto)
+        # Derivadas (para las cotas del error) y funciones compiladas
+        self._derivadas = _Derivadas(funcion, variable, self.punto)
+        self._compiladas = {}
+
+    @property
+    def orden_calculado(self):
+        """Mayor orden cuyos coeficientes ya están calculados"""
+        return len(self._serie._coeficientes) - 1
+
+    def coeficiente(self, k):
+        """Coeficiente k-ésimo: f^(k)(punto) / k!"""
+        return self._serie.coeficiente(k)
+
+    def coeficientes(self, orden):
+        """Coeficientes de orden 0 a orden"""
+        return [self.coeficiente(k) for k in range(orden + 1)]
+
+    def polinomio(self, orden):
+        """Polinomio de Taylor de grado orden en (x - punto)"""
+        h = self.variable - self.punto
+        return sp.Add(*(c * h**k for k, c in enumerate(self.coeficientes(orden))))
+
+    def derivada(self, k):
+        """Derivada k-ésima de f (se guardan todas las intermedias)"""
+        return self._derivadas.derivada(k)
+
+    def _compilada(self, clave, expr):
+        if clave not in self._compiladas:
+            self._compiladas[clave] = motor_numerico.compilar(expr, (self.variable,))
+        return self._compiladas[clave]
+
+    # ============= EVALUACIÓN VECTORIZADA =============
+
+    def sumas_parciales(self, xs, orden):
+        """
+        Sumas parciales S_0(x), ..., S_orden(x) evaluadas sobre el arreglo
+        xs; devuelve un arreglo de forma (orden + 1, *xs.shape).
+        """
+        xs = np.asarray(xs, dtype=float)
+        coeficientes = np.array([float(c) for c in self.coeficientes(orden)])
+        h = xs - float(self.punto)
+        potencias = h[None, ...] ** np.arange(orden + 1).reshape((-1,) + (1,) * h.ndim)
+        return np.cumsum(coeficientes.reshape((-1,) + (1,) * h.ndim) * potencias, axis=0)
+
+    def errores(self, xs, orden):
+        """|f(x) - S_n(x)| para n = 0..orden; forma (orden + 1, *xs.shape)"""
+        xs = np.asarray(xs, dtype=float)
+        with np.errstate(all='ignore'):
+            valores = self._compilada('f', self.funcion)(xs)
+        return np.abs(valores[None, ...] - self.sumas_parciales(xs, orden))
+
+    def cota_error(self, xs, orden, muestras=2049):
+        """
+        Cota de Lagrange del resto de orden n en cada x:
+        max |f^(n+1)| entre punto y x · |x - punto|^(n+1) / (n+1)!.
+        El máximo se estima muestreando f^(n+1) en una grilla que cubre
+        todos los x, y se acumula desde el punto hacia cada lado.
+        """
+        xs = np.asarray(xs, dtype=float)
+        a = float(self.punto)
+        derivada = self._compilada(orden + 1, self.derivada(orden + 1))
+        izquierda, derecha = min(a, xs.min()), max(a, xs.max())
+        grilla = np.linspace(izquierda, derecha, muestras)
+        with np.errstate(all='ignore'):
+            modulo = np.abs(derivada(grilla))
+        modulo[~np.isfinite(modulo)] = np.inf
+
+        # Máximo acumulado desde el punto de desarrollo hacia cada extremo
+        centro = np.searchsorted(grilla, a)
+        maximo = np.empty_like(modulo)
+        maximo[centro:] = np.maximum.accumulate(modulo[centro:])
+        maximo[:centro] = np.maximum.accumulate(modulo[:centro][::-1])[::-1]
+        if centro < len(grilla):
+            maximo[:centro] = np.maximum(maximo[:centro], modulo[centro])
+
+        # Índice de la grilla del lado de afuera de cada x (cota conservadora)
+        indices = np.where(xs >= a, np.searchsorted(grilla, xs, 'left'),
+                           np.searchsorted(grilla, xs, 'right') - 1)
+        indices = np.clip(indices, 0, len(grilla) - 1)
+        h = np.abs(xs - a)
+        with np.errstate(invalid='ignore'):
+            cota = maximo[indices] * h ** (orden + 1) / math.factorial(orden + 1)
+        return np.where(h == 0, 0.0, cota)
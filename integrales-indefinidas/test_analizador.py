@@ -0,0 +1,45 @@
+"""
+Pruebas del analizador seguro de expresiones.
+
+Uso:
+    python -m pytest test_analizador.py
+"""
+import pytest
+import sympy as sp
+
+import analizador
+from analizador import ExpresionInvalida, analizar
+from calculadora_analisis import CalculadoraAnalisisII
+
+x = sp.Symbol('x')
+
+
+@pytest.mark.parametrize('texto', [
+    'x**2 + 3*x', 'x^2+1', 'exp(x)*sin(x)', '(-1)**n/n', '2**n/factorial(n)',
+    'Eq(y(x).diff(x), x*y(x))', 'pi/4 + E', '0.5*x + 1e-3', 'gamma(5)',
+])
+def test_igual_que_sympify(texto):
+    assert analizar(texto) == sp.sympify(texto)
+
+
+@pytest.mark.parametrize('texto', [
+    '9**9**9**9', 'x**100000', 'factorial(10**6)', 'gamma(10**7)', 'loggamma(10**7)',
+    'diff(exp(x)*sin(x)*tan(x), x, 600)', 'diff(diff(sin(x), x, 6), x, 6)',
+    'sin(x).diff(x, x, x, x, x, x, x, x, x, x, x)', 'x.diff(x, 2*300)',
+    'sin(' * 200 + 'x' + ')' * 200, 'x + ' * 10_000 + 'x',
+    '__import__("os")', 'x.__class__', 'open("f")', 'lambda: 1', '"texto"',
+])
+def test_rechaza_expresiones_peligrosas(texto):
+    with pytest.raises(ExpresionInvalida):
+        analizar(texto)
+
+
+def test_diff_no_deriva_al_parsear():
+    assert analizar('diff(sin(x), x)') == sp.Derivative(sp.sin(x), x)
+    assert analizador.derivadas_pendientes(analizar('diff(sin(x), x)'))
+    assert not analizador.derivadas_pendientes(analizar('Eq(y(x).diff(x), y(x))'))
+
+
+def test_la_calculadora_deriva_con_tiempo_limite():
+    calc = CalculadoraAnalisisII(tiempo_limite=5)
+    assert calc.integral_indefinida('diff(x**3*sin(x), x)').valor == x**3 * sp.sin(x)
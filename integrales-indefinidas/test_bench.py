@@ -0,0 +1,45 @@
+"""
+Pruebas del benchmark: los corpus chicos corren sin errores y la
+comparación con la línea de base detecta las regresiones.
+
+Uso:
+    python -m pytest test_bench.py
+"""
+import pytest
+
+import bench_calculadora
+from bench_calculadora import CORPUS, comparar, ejecutar_caso, percentil
+
+
+@pytest.mark.parametrize('familia', sorted(CORPUS))
+def test_corpus_chico_sin_errores(familia):
+    for caso in CORPUS[familia]['chico']:
+        segundos, error = ejecutar_caso(caso, None)
+        assert error is None, f"{caso[0]}{caso[1]}: {error}"
+        assert segundos >= 0
+
+
+def test_percentil_interpola():
+    assert percentil([4, 1, 3, 2], 50) == 2.5
+    assert percentil([1, 2, 3], 0) == 1
+    assert percentil([1, 2, 3], 100) == 3
+
+
+def _medidas(p50, memoria=1000):
+    return {'p50': p50, 'p90': p50, 'memoria_pico': memoria}
+
+
+def test_comparar_detecta_regresiones():
+    base = {'a': _medidas(0.1), 'b': _medidas(0.1), 'c': _medidas(0.001), 'd': _medidas(0.1, None)}
+    actual = {'a': _medidas(0.2), 'b': _medidas(0.11, 2000), 'c': _medidas(0.004),
+              'd': _medidas(0.1, 5000), 'nuevo': _medidas(9)}
+    regresiones = comparar(actual, base, tolerancia=0.25)
+    # 'c' empeora 4 veces pero por debajo del ruido; 'd' no tenía memoria medida
+    assert [r.split()[:2] for r in regresiones] == [['a', 'p50:'], ['a', 'p90:'], ['b', 'memoria:']]
+
+
+def test_main_compara_contra_la_linea_de_base(tmp_path):
+    ruta = str(tmp_path / 'base.json')
+    opciones = ['--familias', 'economia', '--niveles', 'chico', '--repeticiones', '1']
+    assert bench_calculadora.main(opciones + ['--guardar', ruta]) == 0
+    assert bench_calculadora.main(opciones + ['--comparar', ruta, '--tolerancia', '100']) == 0
@@ -0,0 +1,94 @@
+"""
+Pruebas de la CalculadoraAnalisisII: caché, tiempos límite y cálculos numéricos.
+
+Uso:
+    python -m pytest test_calculadora.py
+"""
+import math
+import time
+
+import pytest
+import sympy as sp
+
+import calculadora_analisis
+import convergencia
+import motor_numerico
+from cache_expresiones import CacheExpresiones
+from calculadora_analisis import CalculadoraAnalisisII
+from tiempo_limite import TiempoAgotado
+
+
+def _lento():
+    time.sleep(2)
+    return 'lento'
+
+
+def test_tiempo_agotado_no_se_cachea(tmp_path):
+    ruta = str(tmp_path / 'cache.pkl')
+    calc = CalculadoraAnalisisII(cache=CacheExpresiones(ruta=ruta), tiempo_limite=0.1)
+    with pytest.raises(TiempoAgotado):
+        calc._memo('operacion', ('x',), _lento)
+    assert calc.cache.clave('operacion', 'x') not in calc.cache
+    calc.cache.guardar()
+
+    # Con más tiempo (o después de reiniciar) el cálculo se vuelve a intentar
+    otra = CalculadoraAnalisisII(cache=CacheExpresiones(ruta=ruta), tiempo_limite=5)
+    assert otra._memo('operacion', ('x',), lambda: 'listo') == 'listo'
+
+
+def test_clave_distingue_enteros_de_flotantes():
+    cache = CacheExpresiones()
+    assert cache.clave('op', 0, 2) != cache.clave('op', 0.0, 2.0)
+    assert cache.clave('op', [1, 2]) != cache.clave('op', [1.0, 2])
+    assert cache.clave('op', 'x ** 2') == cache.clave('op', 'x**2')
+
+
+def test_integral_definida_exacta_y_flotante_no_comparten_entrada():
+    calc = CalculadoraAnalisisII()
+    flotante = calc.integral_definida("x**2", 0.0, 2.0).valor
+    exacta = calc.integral_definida("x**2", 0, 2).valor
+    assert exacta == sp.Rational(8, 3)
+    assert flotante.is_Float
+
+
+def test_puntos_criticos_numericos_limpian_los_ceros():
+    calc = CalculadoraAnalisisII()
+    assert calc.puntos_criticos("x**2 + y**2", modo='numerico').valor == [(0.0, 0.0, 'Mínimo')]
+    (x_val, y_val, tipo), = calc.puntos_criticos("(x - 1)**2*(y + 2)**2 + x**2", modo='numerico').valor
+    assert x_val == 0.0 and y_val == pytest.approx(-2) and tipo == 'Mínimo'
+
+
+def test_limpiar_ceros_es_relativo_a_la_escala():
+    puntos = motor_numerico.limpiar_ceros([[-7.7e-12, 3.0], [5e-10, 1e6], [1e-3, 0.0]])
+    assert puntos.tolist() == [[0.0, 3.0], [0.0, 1e6], [1e-3, 0.0]]
+
+
+def test_criterios_sin_tiempo_limite_usan_el_de_cada_criterio(monkeypatch):
+    def colgado(an, n):
+        time.sleep(30)
+
+    monkeypatch.setattr(calculadora_analisis, 'TIEMPO_CRITERIO', 0.2)
+    monkeypatch.setitem(convergencia.CRITERIOS, 'cociente', colgado)
+    inicio = time.perf_counter()
+    resultado = CalculadoraAnalisisII(cache=CacheExpresiones(), tiempo_limite=None).analizar_serie("1/n**2")
+    assert time.perf_counter() - inicio < 10
+    assert resultado.datos['criterios']['cociente'] == (convergencia.NO_CONCLUYE, str(TiempoAgotado(0.2)))
+    assert resultado.datos['veredicto'] == convergencia.CONVERGE
+
+
+def test_suma_por_wynn_informa_un_error_que_cubre_el_real():
+    resultado = CalculadoraAnalisisII(cache=CacheExpresiones()).analizar_serie("(-1)**n/n")
+    error = resultado.datos['error_estimado']
+    assert resultado.datos['metodo'] == 'wynn'
+    assert 0 < error < 1e-9
+    assert abs(resultado.valor + math.log(2)) <= error
+    assert "± 0.0e+00" not in resultado.texto()
+
+
+@pytest.mark.parametrize('termino, suma', [("(9/10)**n", 9.0), ("2**(-n)", 1.0),
+                                           ("(-1)**n/factorial(n)", math.exp(-1) - 1)])
+def test_wynn_converge_antes_del_ultimo_termino(termino, suma):
+    n = sp.Symbol('n', positive=True, integer=True)
+    resultado = convergencia.sumar(sp.sympify(termino, locals={'n': n}), n, metodo='wynn')
+    assert 0 < resultado['error'] < 1e-9
+    assert abs(resultado['valor'] - suma) <= resultado['error']
@@ -0,0 +1,45 @@
+"""
+Pruebas de la vía rápida de integración contra sp.integrate.
+
+Uso:
+    python -m pytest test_integracion_rapida.py
+"""
+import pytest
+import sympy as sp
+
+from integracion_rapida import IntegradorRapido
+
+x, n, k = sp.symbols('x n k')
+p = sp.Symbol('p', positive=True)
+
+RAPIDAS = ['x**3 + 2*x - 7', '3*exp(2*x)', 'sin(3*x) - cos(x/2)', '1/(2*x + 1)', '(x + 1)**(-2)',
+           'sqrt(x)', '(3*x - 1)**5', 'x/(x + 1)', '(x**2 + 1)*(x - 2)', 'x**p', 'exp(p*x)']
+
+
+@pytest.mark.parametrize('texto', RAPIDAS)
+def test_primitiva_correcta(texto):
+    expr = sp.sympify(texto, locals={'p': p})
+    primitiva = IntegradorRapido().integrar(expr, x)
+    assert primitiva is not None
+    assert sp.simplify(sp.diff(primitiva, x) - expr) == 0
+
+
+@pytest.mark.parametrize('expr', [x**n, sp.exp(k*x), sp.sin(k*x), sp.cos(k*x), 1/(k*x + 1),
+                                  (2*x + 1)**n, x/(k*x + 1)])
+def test_parametros_simbolicos_van_a_sympy(expr):
+    # La primitiva depende del valor del parámetro (n = -1, k = 0): no es de tabla
+    assert IntegradorRapido().integrar(expr, x) is None
+
+
+@pytest.mark.parametrize('texto, a, b', [('x**2', 0, 2), ('1/(2*x + 1)', 0, 3), ('exp(-x)', 0, 1),
+                                         ('sin(x)', 0, 'pi'), ('(x + 1)**(-2)', 0, 1)])
+def test_definida_igual_que_sympy(texto, a, b):
+    expr = sp.sympify(texto)
+    rapida = IntegradorRapido().integrar_definida(expr, x, a, b)
+    assert rapida is not None
+    assert sp.simplify(rapida - sp.integrate(expr, (x, sp.sympify(a), sp.sympify(b)))) == 0
+
+
+@pytest.mark.parametrize('texto, a, b', [('1/x', -1, 1), ('(x - 1)**(-2)', 0, 2), ('sqrt(x)', -1, 1)])
+def test_definida_con_singularidad_va_a_sympy(texto, a, b):
+    assert IntegradorRapido().integrar_definida(sp.sympify(texto), x, a, b) is None
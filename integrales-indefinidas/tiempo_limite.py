@@ -0,0 +1,76 @@
+"""
+Ejecución de cálculos de SymPy con tiempo límite.
+El trabajo corre en un subproceso que se mata si se excede el plazo,
+porque sp.integrate, sp.solve y sp.dsolve no se pueden interrumpir.
+"""
+import pickle
+
+
+class TiempoAgotado(Exception):
+    """Se excedió el tiempo límite de un cálculo"""
+
+    def __init__(self, segundos):
+        super().__init__(f"Se agotó el tiempo límite ({segundos} s)")
+        self.segundos = segundos
+
+    def __reduce__(self):
+        return (TiempoAgotado, (self.segundos,))
+
+
+def _contexto():
+    """Contexto 'fork', necesario para ejecutar closures sin serializarlos"""
+    import multiprocessing
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def _trabajador(conexion, funcion, args, kwargs):
+    """Ejecuta la función en el subproceso y envía (ok, valor) al padre"""
+    try:
+        respuesta = (True, funcion(*args, **kwargs))
+    except Exception as e:
+        respuesta = (False, e)
+    try:
+        conexion.send(respuesta)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        if respuesta[0]:
+            conexion.send((False, RuntimeError(f"Resultado no serializable: {e}")))
+        else:
+            conexion.send((False, RuntimeError(str(respuesta[1]))))
+    finally:
+        conexion.close()
+
+
+def ejecutar_con_limite(funcion, args=(), kwargs=None, segundos=None):
+    """
+    Ejecuta funcion(*args, **kwargs) con un tiempo límite en segundos.
+    Sin límite (o sin soporte de 'fork') se ejecuta en el mismo proceso.
+
+    Raises:
+        TiempoAgotado: si el cálculo no terminó a tiempo
+    """
+    kwargs = kwargs or {}
+    contexto = _contexto()
+    if segundos is None or contexto is None:
+        return funcion(*args, **kwargs)
+
+    receptor, emisor = contexto.Pipe(duplex=False)
+    proceso = contexto.Process(target=_trabajador, args=(emisor, funcion, args, kwargs), daemon=True)
+    proceso.start()
+    emisor.close()
+    try:
+        if not receptor.poll(segundos):
+            proceso.kill()
+            raise TiempoAgotado(segundos)
+        try:
+            ok, valor = receptor.recv()
+        except EOFError:
+            raise RuntimeError("El subproceso de cálculo terminó inesperadamente")
+    finally:
+        receptor.close()
+        proceso.join()
+
+    if ok:
+        return valor
+    raise valor